@@ -0,0 +1,38 @@
+from __future__ import annotations
+import argparse
+import random
+import time
+import numpy as np
+from src.constants import HUMAN
+from src.board import Board
+from src.patterns import threat_maps, batch_scores
+from benchmarks.board_probes import build_position
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Per-board threat maps against batched move scoring")
+    parser.add_argument("--positions", type=int, default=2000)
+    parser.add_argument("--max-moves", type=int, default=80)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    grids = np.stack([build_position(Board(), rng.randint(1, args.max_moves), args.seed + i).grid
+                      for i in range(args.positions)])
+
+    start = time.perf_counter()
+    reference = [threat_maps(grid)[HUMAN]["score"] for grid in grids]
+    single = args.positions / (time.perf_counter() - start)
+    print(f"{'single':<10} {single:>12,.0f} boards/s")
+
+    for size in (1, 16, 256, args.positions):
+        start = time.perf_counter()
+        scores = np.concatenate([batch_scores(grids[i:i + size], HUMAN) for i in range(0, args.positions, size)])
+        rate = args.positions / (time.perf_counter() - start)
+        print(f"batch {size:<4} {rate:>12,.0f} boards/s {rate / single:>8.2f}x")
+    if not np.array_equal(scores, np.stack(reference)):
+        raise SystemExit("batched scores differ from threat_maps")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+from __future__ import annotations
+import argparse
+import random
+import time
+from typing import List, Tuple
+from src.constants import HUMAN, AI_PLAYER
+from src.board import Board
+from src.bitboard import BitBoard
+
+
+def build_position(board: Board, moves: int, seed: int) -> Board:
+    rng = random.Random(seed)
+    board.make_move(7, 7, HUMAN)
+    player = AI_PLAYER
+    for _ in range(moves - 1):
+        r, c = rng.choice(sorted(board.get_near_empty_cells()))
+        board.make_move(r, c, player)
+        player = HUMAN if player == AI_PLAYER else AI_PLAYER
+    return board
+
+
+def probes_per_second(board: Board, cells: List[Tuple[int, int]], duration: float) -> float:
+    probes = 0
+    start = time.perf_counter()
+    deadline = start + duration
+    while time.perf_counter() < deadline:
+        for player in (HUMAN, AI_PLAYER):
+            for r, c in cells:
+                board.make_move(r, c, player)
+                board.check_win(player)
+                board.undo_move(r, c)
+        probes += 2 * len(cells)
+    return probes / (time.perf_counter() - start)
+
+
+def scans_per_second(board: Board, duration: float) -> float:
+    scans = 0
+    start = time.perf_counter()
+    deadline = start + duration
+    while time.perf_counter() < deadline:
+        board.winning_cells(HUMAN)
+        board.winning_cells(AI_PLAYER)
+        scans += 2
+    return scans / (time.perf_counter() - start)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="make_move/check_win/undo_move probe and win-scan throughput")
+    parser.add_argument("--moves", type=int, default=30)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--duration", type=float, default=1.0)
+    args = parser.parse_args()
+
+    probes, scans = {}, {}
+    for cls in (Board, BitBoard):
+        board = build_position(cls(), args.moves, args.seed)
+        cells = sorted(board.get_near_empty_cells())
+        probes[cls.__name__] = probes_per_second(board, cells, args.duration)
+        scans[cls.__name__] = scans_per_second(board, args.duration)
+        print(f"{cls.__name__:<10} {probes[cls.__name__]:>12,.0f} probes/s {scans[cls.__name__]:>12,.0f} win scans/s")
+    print(f"speedup    {probes['BitBoard'] / probes['Board']:>12.2f}x {scans['BitBoard'] / scans['Board']:>12.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+from __future__ import annotations
+import argparse
+import asyncio
+import json
+import random
+import sys
+import time
+from typing import Any, Dict, List
+from src.constants import BOARD_SIZE, HUMAN, AI_PLAYER
+from src.server import GameServer, new_board, percentile
+
+
+class Client:
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self.reader = reader
+        self.writer = writer
+
+    async def request(self, **request) -> Dict[str, Any]:
+        self.writer.write(json.dumps(request).encode() + b"\n")
+        await self.writer.drain()
+        line = await self.reader.readline()
+        if not line:
+            raise ConnectionError("server closed the connection")
+        return json.loads(line)
+
+    async def close(self) -> None:
+        self.writer.close()
+        await self.writer.wait_closed()
+
+
+async def connect(args: argparse.Namespace) -> Client:
+    if args.unix:
+        return Client(*await asyncio.open_unix_connection(args.unix))
+    return Client(*await asyncio.open_connection(args.host, args.port))
+
+
+async def play(client: Client, args: argparse.Namespace, rng: random.Random, stats: Dict[str, Any]) -> None:
+    reply = await client.request(op="new", difficulty=args.difficulty, size=args.size)
+    if not reply["ok"]:
+        stats["errors"].append(reply["error"])
+        return
+    game = reply["game"]
+    board = new_board(args.size)
+    result = None
+    while result is None:
+        cells = board.winning_cells(HUMAN) or board.get_near_empty_cells()
+        row, col = rng.choice(cells)
+        board.make_move(row, col, HUMAN)
+        start = time.perf_counter()
+        reply = await client.request(op="move", game=game, row=row, col=col)
+        stats["latency_ms"].append((time.perf_counter() - start) * 1000)
+        if not reply["ok"]:
+            stats["errors"].append(reply["error"])
+            break
+        if reply["move"] is not None:
+            board.make_move(*reply["move"], AI_PLAYER)
+        result = reply["result"]
+    await client.request(op="close", game=game)
+    if result is not None:
+        stats["results"][result] = stats["results"].get(result, 0) + 1
+
+
+async def worker(args: argparse.Namespace, seed: int, remaining: List[int], stats: Dict[str, Any]) -> None:
+    client = await connect(args)
+    rng = random.Random(seed)
+    try:
+        while remaining[0] > 0:
+            remaining[0] -= 1
+            await play(client, args, rng, stats)
+    finally:
+        await client.close()
+
+
+async def run(args: argparse.Namespace) -> Dict[str, Any]:
+    server = None
+    if args.spawn:
+        server = GameServer(args.workers, move_timeout=args.move_timeout)
+        listener = await server.start_tcp("127.0.0.1", 0)
+        args.host, args.port = listener.sockets[0].getsockname()[:2]
+    stats: Dict[str, Any] = {"latency_ms": [], "errors": [], "results": {}}
+    remaining = [args.games]
+    start = time.perf_counter()
+    try:
+        await asyncio.gather(*(worker(args, args.seed + i, remaining, stats) for i in range(args.clients)))
+        elapsed = time.perf_counter() - start
+        client = await connect(args)
+        metrics = (await client.request(op="metrics"))["metrics"]
+        await client.close()
+    finally:
+        if server is not None:
+            await server.close()
+    latency = stats["latency_ms"]
+    return {
+        "clients": args.clients,
+        "games": args.games,
+        "elapsed_s": elapsed,
+        "games_per_second": args.games / elapsed if elapsed else 0.0,
+        "moves_per_second": len(latency) / elapsed if elapsed else 0.0,
+        "move_latency_ms": {"p50": percentile(latency, 50), "p95": percentile(latency, 95),
+                            "p99": percentile(latency, 99)},
+        "results": stats["results"],
+        "errors": len(stats["errors"]),
+        "server": metrics,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Load generator for the game server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=7015)
+    parser.add_argument("--unix", metavar="PATH", help="connect to a Unix socket instead of TCP")
+    parser.add_argument("--spawn", action="store_true", help="start a server in-process on a free port")
+    parser.add_argument("--workers", type=int, default=0, help="AI processes of the spawned server")
+    parser.add_argument("--move-timeout", type=float, default=5.0, help="move timeout of the spawned server")
+    parser.add_argument("--clients", type=int, default=50, help="concurrent connections")
+    parser.add_argument("--games", type=int, default=200, help="games played in total")
+    parser.add_argument("--difficulty", default="medium")
+    parser.add_argument("--size", type=int, default=BOARD_SIZE, help="board size, 0 for an unbounded board")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+    report = asyncio.run(run(args))
+    print(json.dumps(report, indent=2))
+    if report["errors"]:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,298 @@
+from __future__ import annotations
+import argparse
+import gc
+import importlib.util
+import json
+import math
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from typing import Any, Callable, Dict, List, Tuple
+from src.constants import BOARD_SIZE, EMPTY, HUMAN, AI_PLAYER, AI_THINK_TIME_MS, Difficulty
+from src.board import Board
+from src.bitboard import BitBoard
+from src.book import load_book
+from src.learning import MemoryStore
+from src.players import AIStrategy, EasyStrategy, MediumStrategy, HardStrategy, SearchStrategy
+from benchmarks.board_probes import build_position
+
+POSITIONS = {"empty": 0, "midgame": 40, "near_full": 200}
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+STRATEGY_PROBE = """
+import json, sys, time
+start = time.perf_counter()
+from src.constants import AI_PLAYER, Difficulty
+from src.players import AIPlayer
+imported = time.perf_counter()
+player = AIPlayer(AI_PLAYER, Difficulty[sys.argv[1]])
+created = time.perf_counter()
+player.strategy.wait_ready()
+ready = time.perf_counter()
+print(json.dumps({"import_ms": (imported - start) * 1000, "create_ms": (created - imported) * 1000,
+                  "ready_ms": (ready - imported) * 1000}))
+"""
+
+GAME_PROBE = """
+import json, os, time
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+start = time.perf_counter()
+from src.constants import Difficulty
+from src.game import Game
+imported = time.perf_counter()
+game = Game()
+created = time.perf_counter()
+game.renderer.open()
+game.renderer.draw_menu(game.menu.state)
+game.renderer.update()
+drawn = time.perf_counter()
+switches = []
+for difficulty in (Difficulty.HARD, Difficulty.MEDIUM, Difficulty.HARD):
+    begin = time.perf_counter()
+    game.player_for(difficulty)
+    switches.append((time.perf_counter() - begin) * 1000)
+print(json.dumps({"import_ms": (imported - start) * 1000, "init_ms": (created - imported) * 1000,
+                  "first_frame_ms": (drawn - created) * 1000, "select_hard_ms": switches[0],
+                  "reselect_hard_ms": switches[2]}))
+game.worker.shutdown()
+game.recorder.close()
+"""
+
+
+def fill_position(board: Board, stones: int, seed: int) -> Board:
+    rng = random.Random(seed)
+    cells = [(r, c) for r in range(BOARD_SIZE) for c in range(BOARD_SIZE)]
+    rng.shuffle(cells)
+    for i, (r, c) in enumerate(cells[:stones]):
+        board.make_move(r, c, HUMAN if i % 2 == 0 else AI_PLAYER)
+    return board
+
+
+def make_position(cls: type, stones: int, seed: int) -> Board:
+    if stones == 0:
+        return cls()
+    if stones <= 80:
+        return build_position(cls(), stones, seed)
+    return fill_position(cls(), stones, seed)
+
+
+def time_op(op: Callable[[], Any], min_time: float, repeat: int = 3) -> float:
+    loops = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(loops):
+            op()
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_time / 10:
+            break
+        loops *= 10
+    best = elapsed
+    for _ in range(repeat - 1):
+        start = time.perf_counter()
+        for _ in range(loops):
+            op()
+        best = min(best, time.perf_counter() - start)
+    return best / loops * 1e9
+
+
+def board_ops(board: Board) -> Dict[str, Callable[[], Any]]:
+    r, c = next(divmod(idx, BOARD_SIZE) for idx, cell in enumerate(board.cells) if cell == EMPTY)
+
+    def make_undo() -> None:
+        board.make_move(r, c, HUMAN)
+        board.undo_move(r, c)
+
+    return {
+        "make_undo_move": make_undo,
+        "check_win": lambda: board.check_win(HUMAN),
+        "is_full": board.is_full,
+        "get_empty_cells": board.get_empty_cells,
+        "get_near_empty_cells": board.get_near_empty_cells,
+        "winning_cells": lambda: board.winning_cells(HUMAN),
+        "near_count": lambda: board.near_count(r, c),
+        "get_hash": board.get_hash,
+        "canonical_key": board.canonical_key,
+        "copy": board.copy,
+    }
+
+
+def bench_board(min_time: float, seed: int) -> Dict[str, Dict[str, Dict[str, float]]]:
+    results = {}
+    for cls in (Board, BitBoard):
+        results[cls.__name__] = {}
+        for name, stones in POSITIONS.items():
+            board = make_position(cls, stones, seed)
+            results[cls.__name__][name] = {op: time_op(fn, min_time) for op, fn in board_ops(board).items()}
+    return results
+
+
+def make_strategy(difficulty: Difficulty, budget_ms: int) -> AIStrategy:
+    match difficulty:
+        case Difficulty.EASY:
+            return EasyStrategy()
+        case Difficulty.MEDIUM:
+            return MediumStrategy()
+        case Difficulty.HARD:
+            return HardStrategy(MemoryStore(), MemoryStore(), book=load_book())
+        case Difficulty.EXPERT:
+            return SearchStrategy(budget_ms=budget_ms, book=load_book())
+
+
+def corpus(count: int, seed: int) -> List[Tuple[BitBoard, int]]:
+    positions = []
+    rng = random.Random(seed)
+    while len(positions) < count:
+        stones = rng.randint(1, 60)
+        board = build_position(BitBoard(), stones, rng.getrandbits(32))
+        if board.winning_cells(HUMAN) or board.winning_cells(AI_PLAYER):
+            continue
+        positions.append((board, HUMAN if stones % 2 == 0 else AI_PLAYER))
+    return positions
+
+
+def percentile(samples: List[float], p: float) -> float:
+    ordered = sorted(samples)
+    return ordered[max(0, math.ceil(p / 100 * len(ordered)) - 1)]
+
+
+def bench_find_move(positions: int, seed: int, budget_ms: int) -> Dict[str, Dict[str, float]]:
+    results = {}
+    boards = corpus(positions, seed)
+    for difficulty in Difficulty:
+        strategy = make_strategy(difficulty, budget_ms)
+        samples = []
+        for i, (board, player) in enumerate(boards):
+            opponent = HUMAN if player == AI_PLAYER else AI_PLAYER
+            strategy.rng = random.Random(seed + i)
+            start = time.perf_counter()
+            strategy.find_move(board, player, opponent)
+            samples.append((time.perf_counter() - start) * 1000)
+        results[difficulty.name.lower()] = {
+            "p50_ms": percentile(samples, 50),
+            "p95_ms": percentile(samples, 95),
+            "p99_ms": percentile(samples, 99),
+            "mean_ms": sum(samples) / len(samples),
+        }
+    return results
+
+
+def bench_memory(seed: int, budget_ms: int) -> Dict[str, Dict[str, int]]:
+    results = {}
+    board, player = corpus(1, seed)[0]
+    opponent = HUMAN if player == AI_PLAYER else AI_PLAYER
+    for difficulty in Difficulty:
+        gc.collect()
+        tracemalloc.start()
+        before = tracemalloc.get_traced_memory()[0]
+        strategy = make_strategy(difficulty, budget_ms)
+        instance = tracemalloc.get_traced_memory()[0] - before
+        tracemalloc.reset_peak()
+        strategy.find_move(board, player, opponent)
+        current, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        results[difficulty.name.lower()] = {"instance_bytes": instance, "after_move_bytes": current - before,
+                                            "peak_bytes": peak - before}
+        del strategy
+    return results
+
+
+def probe(code: str, *argv: str, repeat: int = 3) -> Dict[str, float]:
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, [ROOT, os.environ.get("PYTHONPATH")])))
+    runs = []
+    for _ in range(repeat):
+        with tempfile.TemporaryDirectory() as cwd:
+            output = subprocess.run([sys.executable, "-c", code, *argv], cwd=cwd, env=env, check=True,
+                                    capture_output=True, text=True).stdout
+        runs.append(json.loads(output.strip().splitlines()[-1]))
+    return {key: min(run[key] for run in runs) for key in runs[0]}
+
+
+def bench_startup(repeat: int) -> Dict[str, Dict[str, float]]:
+    results = {difficulty.name.lower(): probe(STRATEGY_PROBE, difficulty.name, repeat=repeat)
+               for difficulty in Difficulty}
+    if importlib.util.find_spec("pygame") is not None:
+        results["game"] = probe(GAME_PROBE, repeat=repeat)
+    return results
+
+
+def run(args: argparse.Namespace) -> Dict[str, Any]:
+    return {
+        "meta": {
+            "python": sys.version.split()[0],
+            "platform": platform.platform(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "positions": args.positions,
+            "seed": args.seed,
+            "budget_ms": args.budget_ms,
+        },
+        "board": bench_board(args.min_time, args.seed),
+        "find_move": bench_find_move(args.positions, args.seed, args.budget_ms),
+        "memory": bench_memory(args.seed, args.budget_ms),
+        "startup": bench_startup(args.startup_runs),
+    }
+
+
+def flatten(results: Dict[str, Any], prefix: str = "") -> Dict[str, float]:
+    flat = {}
+    for key, value in results.items():
+        if key == "meta":
+            continue
+        path = f"{prefix}.{key}" if prefix else key
+        if isinstance(value, dict):
+            flat.update(flatten(value, path))
+        elif isinstance(value, (int, float)):
+            flat[path] = value
+    return flat
+
+
+def compare(baseline: Dict[str, Any], current: Dict[str, Any], threshold: float) -> List[Tuple[str, float, float]]:
+    old, new = flatten(baseline), flatten(current)
+    regressions = []
+    for key in sorted(old.keys() & new.keys()):
+        change = (new[key] - old[key]) / old[key] if old[key] else 0.0
+        flag = " REGRESSION" if change > threshold else ""
+        print(f"{key:<55} {old[key]:>14.2f} {new[key]:>14.2f} {change:>+8.1%}{flag}")
+        if flag:
+            regressions.append((key, old[key], new[key]))
+    return regressions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Board and strategy benchmarks (no pygame required)")
+    parser.add_argument("--out", help="write results as JSON to this file")
+    parser.add_argument("--baseline", help="saved results to compare against")
+    parser.add_argument("--results", help="compare these saved results instead of running the benchmarks")
+    parser.add_argument("--threshold", type=float, default=0.10, help="relative slowdown flagged as a regression")
+    parser.add_argument("--positions", type=int, default=10, help="corpus size for find_move latency")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--budget-ms", type=int, default=AI_THINK_TIME_MS, help="think time of the Expert strategy")
+    parser.add_argument("--min-time", type=float, default=0.2, help="seconds per board microbenchmark")
+    parser.add_argument("--startup-runs", type=int, default=3, help="fresh interpreters per startup probe")
+    args = parser.parse_args()
+
+    if args.results:
+        with open(args.results) as f:
+            results = json.load(f)
+    else:
+        results = run(args)
+        if args.out:
+            with open(args.out, "w") as f:
+                json.dump(results, f, indent=2)
+        else:
+            print(json.dumps(results, indent=2))
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        regressions = compare(baseline, results, args.threshold)
+        print(f"{len(regressions)} regression(s) beyond {args.threshold:.0%}")
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,8 +1,13 @@
+import argparse
+from src.constants import BOARD_SIZE
 from src.game import Game
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Пять в ряд")
+    parser.add_argument("--size", type=int, default=BOARD_SIZE, help="board size, 0 for an unbounded board")
+    args = parser.parse_args()
     try:
-        game = Game()
+        game = Game(args.size)
         game.run()
     except Exception as e:
         print(f"Ошибка: {e}")
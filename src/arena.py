@@ -0,0 +1,138 @@
+from __future__ import annotations
+import argparse
+import math
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Tuple, Dict, List, Optional
+from src.constants import EMPTY, HUMAN, AI_PLAYER, Difficulty
+from src.bitboard import BitBoard
+from src.learning import MemoryStore
+from src.book import load_book
+from src.players import AIPlayer, HardStrategy, MCTSStrategy
+from src.records import GameRecord, RecordWriter
+
+MCTS_CODE = 0x10
+STRATEGIES = {**{difficulty.name.lower(): int(difficulty) for difficulty in Difficulty}, "mcts": MCTS_CODE}
+
+
+def make_player(symbol: int, name: str, rng: random.Random) -> AIPlayer:
+    if STRATEGIES[name] == MCTS_CODE:
+        return AIPlayer(symbol, Difficulty.EXPERT, MCTSStrategy(seed=rng.getrandbits(64)), rng)
+    if STRATEGIES[name] == Difficulty.HARD:
+        return AIPlayer(symbol, Difficulty.HARD, HardStrategy(MemoryStore(), MemoryStore(), load_book()), rng)
+    return AIPlayer(symbol, Difficulty(STRATEGIES[name]), rng=rng)
+
+
+def play_game(job: Tuple[str, str, int, bool]) -> Dict[str, Any]:
+    first, second, seed, swapped = job
+    names = (second, first) if swapped else (first, second)
+    rng = random.Random(seed)
+    players = {HUMAN: make_player(HUMAN, names[0], rng), AI_PLAYER: make_player(AI_PLAYER, names[1], rng)}
+    sides = {HUMAN: "b" if swapped else "a", AI_PLAYER: "a" if swapped else "b"}
+    think = {"a": 0.0, "b": 0.0}
+    moves = {"a": 0, "b": 0}
+    record = []
+    think_ms = []
+    board = BitBoard()
+    player = HUMAN
+    winner = None
+    result = EMPTY
+    try:
+        while not board.is_full():
+            side = sides[player]
+            start = time.perf_counter()
+            move = players[player].get_move(board)
+            elapsed = time.perf_counter() - start
+            think[side] += elapsed
+            moves[side] += 1
+            if move is None or not board.make_move(move[0], move[1], player):
+                winner = "b" if side == "a" else "a"
+                result = AI_PLAYER if player == HUMAN else HUMAN
+                break
+            record.append((move[0], move[1], player))
+            think_ms.append(elapsed * 1000)
+            if board.check_win(player):
+                winner = side
+                result = player
+                break
+            player = AI_PLAYER if player == HUMAN else HUMAN
+    finally:
+        for ai in players.values():
+            ai.close()
+    return {"seed": seed, "a_first": not swapped, "winner": winner, "result": result, "moves": record, "think_ms": think_ms,
+            "players": (STRATEGIES[names[0]], STRATEGIES[names[1]]),
+            "a_ms": think["a"] * 1000, "a_moves": moves["a"], "b_ms": think["b"] * 1000, "b_moves": moves["b"]}
+
+
+def elo_estimate(wins: int, draws: int, losses: int) -> Tuple[float, float]:
+    games = wins + draws + losses
+    if not games:
+        return 0.0, 0.0
+    score = (wins + draws / 2) / games
+    variance = (wins * (1 - score) ** 2 + draws * (0.5 - score) ** 2 + losses * score ** 2) / games
+    deviation = math.sqrt(variance / games)
+
+    def elo(s: float) -> float:
+        s = min(max(s, 0.5 / games), 1 - 0.5 / games)
+        return -400 * math.log10(1 / s - 1)
+
+    return elo(score), (elo(score + 1.96 * deviation) - elo(score - 1.96 * deviation)) / 2
+
+
+def run_match(first: str, second: str, games: int, seed: int = 1, workers: int = 0,
+              record_dir: Optional[str] = None) -> Dict[str, float]:
+    jobs = [(first, second, seed + i, i % 2 == 1) for i in range(games)]
+    start = time.perf_counter()
+    if workers == 1:
+        results: List[Dict[str, Any]] = [play_game(job) for job in jobs]
+    else:
+        with ProcessPoolExecutor(max_workers=workers or None) as pool:
+            results = list(pool.map(play_game, jobs))
+    elapsed = time.perf_counter() - start
+    if record_dir:
+        with RecordWriter(record_dir) as writer:
+            for result in results:
+                writer.append(GameRecord.from_moves(result["moves"], result["result"], result["players"],
+                                                    result["seed"], result["think_ms"]))
+
+    wins = sum(1 for result in results if result["winner"] == "a")
+    losses = sum(1 for result in results if result["winner"] == "b")
+    draws = games - wins - losses
+    elo, margin = elo_estimate(wins, draws, losses)
+    a_moves = sum(result["a_moves"] for result in results)
+    b_moves = sum(result["b_moves"] for result in results)
+    return {
+        "games": games,
+        "wins": wins,
+        "draws": draws,
+        "losses": losses,
+        "elo": elo,
+        "elo_margin": margin,
+        "a_ms_per_move": sum(result["a_ms"] for result in results) / a_moves if a_moves else 0.0,
+        "b_ms_per_move": sum(result["b_ms"] for result in results) / b_moves if b_moves else 0.0,
+        "games_per_second": games / elapsed if elapsed else 0.0,
+        "elapsed": elapsed,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Headless self-play arena between two AI strategies")
+    parser.add_argument("first", choices=sorted(STRATEGIES))
+    parser.add_argument("second", choices=sorted(STRATEGIES))
+    parser.add_argument("--games", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=1, help="seed of the first game; game i uses seed + i")
+    parser.add_argument("--workers", type=int, default=0, help="process count (0 = one per CPU, 1 = in-process)")
+    parser.add_argument("--record", metavar="DIR", help="append the games as binary records to DIR")
+    args = parser.parse_args()
+
+    report = run_match(args.first, args.second, args.games, args.seed, args.workers, args.record)
+    print(f"{args.first} vs {args.second}: {report['games']} games, first player alternates")
+    print(f"W/D/L      {report['wins']}/{report['draws']}/{report['losses']}")
+    print(f"Elo        {report['elo']:+.0f} ± {report['elo_margin']:.0f}")
+    print(f"ms/move    {args.first} {report['a_ms_per_move']:.2f}, {args.second} {report['b_ms_per_move']:.2f}")
+    print(f"games/sec  {report['games_per_second']:.2f} ({report['elapsed']:.1f} s)")
+
+
+if __name__ == "__main__":
+    main()
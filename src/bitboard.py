@@ -0,0 +1,315 @@
+from __future__ import annotations
+from functools import lru_cache
+from typing import Tuple, List, Dict
+import numpy as np
+from src.constants import BOARD_SIZE, HUMAN, AI_PLAYER
+from src.board import Board
+from src.evaluation import (NONE, TWO, OPEN_TWO, THREE, OPEN_THREE, FOUR, OPEN_FOUR, FIVE, PATTERN_NAMES,
+                            PATTERN_SCORES, run_pattern)
+from src.patterns import pattern_maps
+
+ROW, COL, DIAG, ANTI = 0, 1, 2, 3
+PATTERN_SHIFT = 12
+
+_N = BOARD_SIZE
+_LINE_OFFSETS = (0, _N, 2 * _N, 4 * _N - 1)
+LINE_COUNT = 6 * _N - 2
+
+
+def _line_of(kind: int, row: int, col: int) -> Tuple[int, int]:
+    if kind == ROW:
+        return _LINE_OFFSETS[ROW] + row, col
+    if kind == COL:
+        return _LINE_OFFSETS[COL] + col, row
+    if kind == DIAG:
+        return _LINE_OFFSETS[DIAG] + row - col + _N - 1, col
+    return _LINE_OFFSETS[ANTI] + row + col, col
+
+
+def _cell_of(line_id: int, pos: int) -> Tuple[int, int]:
+    if line_id < _LINE_OFFSETS[COL]:
+        return line_id, pos
+    if line_id < _LINE_OFFSETS[DIAG]:
+        return pos, line_id - _LINE_OFFSETS[COL]
+    if line_id < _LINE_OFFSETS[ANTI]:
+        return line_id - _LINE_OFFSETS[DIAG] - (_N - 1) + pos, pos
+    return line_id - _LINE_OFFSETS[ANTI] - pos, pos
+
+
+def _line_spans() -> Tuple[Tuple[int, int], ...]:
+    spans = {}
+    for r in range(_N):
+        for c in range(_N):
+            for kind in (ROW, COL, DIAG, ANTI):
+                lid, pos = _line_of(kind, r, c)
+                lo, hi = spans.get(lid, (pos, pos))
+                spans[lid] = (min(lo, pos), max(hi, pos))
+    return tuple(spans[lid] for lid in range(LINE_COUNT))
+
+
+LINE_SPANS = _line_spans()
+
+CELL_LINES = tuple(
+    tuple((lid, pos, 1 << pos) for lid, pos in (_line_of(kind, r, c) for kind in (ROW, COL, DIAG, ANTI)))
+    for r in range(_N) for c in range(_N)
+)
+_CELL_BITS = tuple(tuple(x for lid, _, bit in cell for x in (lid, bit)) for cell in CELL_LINES)
+_CELL_SPANS = tuple(
+    tuple((lid, LINE_SPANS[lid][0], LINE_SPANS[lid][1] - LINE_SPANS[lid][0] + 1) for lid, _, _ in cell)
+    for cell in CELL_LINES
+)
+_CELL_WINDOWS = tuple(
+    tuple((lid, pos, (0b11111 << (pos - 4)) if pos >= 4 else (1 << (pos + 1)) - 1) for lid, pos, _ in cell)
+    for cell in CELL_LINES
+)
+
+
+LINE_CELLS = tuple(
+    tuple(r * _N + c if lo <= pos <= hi else -1 for pos, (r, c) in ((p, _cell_of(lid, p)) for p in range(_N)))
+    for lid, (lo, hi) in enumerate(LINE_SPANS)
+)
+_LINE_TARGETS = (
+    np.array([sum(lid >= offset for offset in _LINE_OFFSETS[1:]) for lid, (lo, hi) in enumerate(LINE_SPANS)
+              for _ in range(lo, hi + 1)], dtype=np.intp),
+    np.array([LINE_CELLS[lid][pos] for lid, (lo, hi) in enumerate(LINE_SPANS) for pos in range(lo, hi + 1)],
+             dtype=np.intp),
+)
+
+
+def five_mask(bits: int) -> int:
+    runs = bits & (bits >> 1)
+    runs &= runs >> 2
+    return runs & (bits >> 4)
+
+
+@lru_cache(maxsize=1 << 16)
+def completion_mask(mine: int, theirs: int, length: int) -> int:
+    result = 0
+    for start in range(length - 4):
+        window = 0b11111 << start
+        if not theirs & window and bin(mine & window).count("1") == 4:
+            result |= window & ~mine
+    return result
+
+
+@lru_cache(maxsize=1 << 16)
+def line_threats(mine: int, theirs: int, length: int) -> Tuple[int, int, int]:
+    fives = completion_mask(mine, theirs, length)
+    fours = straight_fours = 0
+    empties = ~(mine | theirs) & ((1 << length) - 1) & ~fives
+    while empties:
+        bit = empties & -empties
+        empties ^= bit
+        gains = completion_mask(mine | bit, theirs, length)
+        if gains:
+            fours |= bit
+            if gains & (gains - 1):
+                straight_fours |= bit
+    return fives, fours, straight_fours
+
+
+@lru_cache(maxsize=1 << 16)
+def three_mask(mine: int, theirs: int, length: int) -> int:
+    result = 0
+    empties = ~(mine | theirs) & ((1 << length) - 1)
+    while empties:
+        bit = empties & -empties
+        empties ^= bit
+        if line_threats(mine | bit, theirs, length)[2]:
+            result |= bit
+    return result & ~line_threats(mine, theirs, length)[1]
+
+
+@lru_cache(maxsize=1 << 16)
+def line_summary(human: int, ai: int, length: int) -> Tuple[int, int, int, int, int, int]:
+    packed = [0, 0]
+    scores = [0, 0]
+    for side, (own, other) in enumerate(((human, ai), (ai, human))):
+        pos = 0
+        while pos < length:
+            if not own >> pos & 1:
+                pos += 1
+                continue
+            start = pos
+            while pos < length and own >> pos & 1:
+                pos += 1
+            open_ends = (start > 0 and not other >> (start - 1) & 1) + (pos < length and not other >> pos & 1)
+            pattern = run_pattern(pos - start, open_ends)
+            if pattern:
+                packed[side] += 1 << (PATTERN_SHIFT * pattern)
+                scores[side] += PATTERN_SCORES[pattern]
+    return (packed[0], packed[1], scores[0], scores[1],
+            completion_mask(human, ai, length), completion_mask(ai, human, length))
+
+
+_WINDOW_PATTERNS = {5: {5: FIVE, 4: FOUR, 3: THREE, 2: TWO}, 6: {4: OPEN_FOUR, 3: OPEN_THREE, 2: OPEN_TWO}}
+
+
+def _window_pattern(mine: int, theirs: int, start: int, width: int) -> int:
+    window = ((1 << width) - 1) << start
+    if width == 6:
+        ends = 1 << start | 1 << (start + 5)
+        if (mine | theirs) & ends:
+            return NONE
+        window ^= ends
+    if theirs & window:
+        return NONE
+    return _WINDOW_PATTERNS[width].get(bin(mine & window).count("1"), NONE)
+
+
+@lru_cache(maxsize=1 << 16)
+def line_patterns(human: int, ai: int, length: int) -> Tuple[Tuple[int, ...], Tuple[int, ...]]:
+    result = []
+    occupied = human | ai
+    for own, other in ((human, ai), (ai, human)):
+        best = [NONE] * length
+        for pos in range(length):
+            if occupied >> pos & 1:
+                continue
+            mine = own | 1 << pos
+            for width in (5, 6):
+                for start in range(max(0, pos - width + 1), min(pos, length - width) + 1):
+                    best[pos] = max(best[pos], _window_pattern(mine, other, start, width))
+        result.append(tuple(best))
+    return result[0], result[1]
+
+
+_EMPTY_SUMMARY = (0, 0, 0, 0, 0, 0)
+
+
+class BitBoard(Board):
+    def __init__(self, size: int = BOARD_SIZE) -> None:
+        if size != BOARD_SIZE:
+            raise ValueError(f"BitBoard only supports {BOARD_SIZE}x{BOARD_SIZE}, got {size}")
+        super().__init__(size)
+        self.lines = {HUMAN: [0] * LINE_COUNT, AI_PLAYER: [0] * LINE_COUNT}
+        self.line_cache = [_EMPTY_SUMMARY] * LINE_COUNT
+        self._scores = [0, 0, 0]
+        self._five_cells = [None, {}, {}]
+        self._packed = [0, 0, 0]
+        self._dirty = set()
+
+    def _place(self, idx: int, row: int, col: int, player: int) -> None:
+        super()._place(idx, row, col, player)
+        lines = self.lines[player]
+        l0, b0, l1, b1, l2, b2, l3, b3 = _CELL_BITS[idx]
+        lines[l0] |= b0
+        lines[l1] |= b1
+        lines[l2] |= b2
+        lines[l3] |= b3
+        self._dirty.add(idx)
+
+    def _remove(self, idx: int, row: int, col: int, player: int) -> None:
+        super()._remove(idx, row, col, player)
+        lines = self.lines[player]
+        l0, b0, l1, b1, l2, b2, l3, b3 = _CELL_BITS[idx]
+        lines[l0] ^= b0
+        lines[l1] ^= b1
+        lines[l2] ^= b2
+        lines[l3] ^= b3
+        self._dirty.add(idx)
+
+    @property
+    def scores(self) -> List[int]:
+        if self._dirty:
+            self._refresh_lines()
+        return self._scores
+
+    @property
+    def five_cells(self) -> List[Dict[int, int]]:
+        if self._dirty:
+            self._refresh_lines()
+        return self._five_cells
+
+    def _refresh_lines(self) -> None:
+        dirty = self._dirty
+        if len(dirty) == 1:
+            spans = _CELL_SPANS[dirty.pop()]
+        else:
+            spans = {span for idx in dirty for span in _CELL_SPANS[idx]}
+            dirty.clear()
+        human_lines = self.lines[HUMAN]
+        ai_lines = self.lines[AI_PLAYER]
+        cache = self.line_cache
+        packed = self._packed
+        scores = self._scores
+        for lid, lo, length in spans:
+            new = line_summary(human_lines[lid] >> lo, ai_lines[lid] >> lo, length)
+            old = cache[lid]
+            cache[lid] = new
+            packed_h, packed_a, score_h, score_a, fives_h, fives_a = new
+            old_h, old_a, old_score_h, old_score_a, old_fives_h, old_fives_a = old
+            packed[HUMAN] += packed_h - old_h
+            packed[AI_PLAYER] += packed_a - old_a
+            scores[HUMAN] += score_h - old_score_h
+            scores[AI_PLAYER] += score_a - old_score_a
+            if fives_h != old_fives_h:
+                self._update_fives(HUMAN, lid, lo, old_fives_h, fives_h)
+            if fives_a != old_fives_a:
+                self._update_fives(AI_PLAYER, lid, lo, old_fives_a, fives_a)
+
+    def _update_fives(self, player: int, line_id: int, lo: int, old: int, new: int) -> None:
+        cells = LINE_CELLS[line_id]
+        fives = self._five_cells[player]
+        for bits, delta in ((old & ~new, -1), (new & ~old, 1)):
+            while bits:
+                bit = bits & -bits
+                bits ^= bit
+                cell = cells[lo + bit.bit_length() - 1]
+                count = fives.get(cell, 0) + delta
+                if count:
+                    fives[cell] = count
+                else:
+                    del fives[cell]
+
+    def check_win(self, player: int) -> bool:
+        if self.last_move is None:
+            return False
+        r, c, last_player = self.last_move
+        if last_player != player:
+            return False
+        lines = self.lines[player]
+        for lid, pos, window in _CELL_WINDOWS[r * _N + c]:
+            bits = lines[lid]
+            runs = bits & (bits >> 1)
+            runs &= runs >> 2
+            if runs & (bits >> 4) & window:
+                self.win_line = self._run_through(lid, pos, bits)
+                return True
+        self.win_line = None
+        return False
+
+    def _run_through(self, line_id: int, pos: int, bits: int) -> List[Tuple[int, int]]:
+        lo = hi = pos
+        while lo > 0 and bits >> (lo - 1) & 1:
+            lo -= 1
+        while bits >> (hi + 1) & 1:
+            hi += 1
+        return [_cell_of(line_id, p) for p in range(lo, hi + 1)]
+
+    def get_line(self, line_id: int, player: int) -> int:
+        return self.lines[player][line_id]
+
+    def pattern_counts(self, player: int) -> Dict[str, int]:
+        if self._dirty:
+            self._refresh_lines()
+        packed = self._packed[player]
+        mask = (1 << PATTERN_SHIFT) - 1
+        return {name: packed >> (PATTERN_SHIFT * pattern) & mask for pattern, name in PATTERN_NAMES.items()}
+
+    def threat_maps(self) -> Dict[int, Dict[str, np.ndarray]]:
+        human_lines = self.lines[HUMAN]
+        ai_lines = self.lines[AI_PLAYER]
+        found = {HUMAN: [], AI_PLAYER: []}
+        for lid, (lo, hi) in enumerate(LINE_SPANS):
+            human, ai = line_patterns(human_lines[lid] >> lo, ai_lines[lid] >> lo, hi - lo + 1)
+            found[HUMAN].extend(human)
+            found[AI_PLAYER].extend(ai)
+        scanned = {}
+        for player, values in found.items():
+            best = scanned[player] = np.zeros((4, _N * _N), dtype=np.int8)
+            best[_LINE_TARGETS] = values
+        return pattern_maps(scanned, _N)
+
+    def winning_cells(self, player: int) -> List[Tuple[int, int]]:
+        return [divmod(idx, _N) for idx in sorted(self.five_cells[player])]
@@ -1,36 +1,185 @@
 from __future__ import annotations
 import numpy as np
-from typing import Tuple, Optional, List
-from src.constants import BOARD_SIZE, EMPTY
-import json
-import hashlib
+from operator import xor
+import math
+import random
+from functools import lru_cache
+from typing import Callable, Tuple, Optional, List, Sequence
+from src.constants import BOARD_SIZE, EMPTY, HUMAN, AI_PLAYER
+
+
+def _symmetries(size: int) -> Tuple[Callable[[int, int], Tuple[int, int]], ...]:
+    last = size - 1
+    return (
+        lambda r, c: (r, c),
+        lambda r, c: (c, last - r),
+        lambda r, c: (last - r, last - c),
+        lambda r, c: (last - c, r),
+        lambda r, c: (r, last - c),
+        lambda r, c: (c, r),
+        lambda r, c: (last - c, last - r),
+        lambda r, c: (last - r, c),
+    )
+
+
+class BoardTables:
+    NEAR_RADIUS = 2
+
+    def __init__(self, size: int):
+        self.size = size
+        area = size * size
+        rng = random.Random(0x5F1A7E)
+        self.zobrist = {player: [rng.getrandbits(64) for _ in range(area)] for player in (HUMAN, AI_PLAYER)}
+        self.symmetries = _symmetries(size)
+        self.transforms = tuple(
+            tuple(tr * size + tc for tr, tc in (symmetry(r, c) for r in range(size) for c in range(size)))
+            for symmetry in self.symmetries
+        )
+        self.inverse_transforms = tuple(tuple(sorted(range(area), key=perm.__getitem__)) for perm in self.transforms)
+        self.symmetry_zobrist = {
+            player: tuple(tuple(keys[perm[idx]] for perm in self.transforms) for idx in range(area))
+            for player, keys in self.zobrist.items()
+        }
+        radius = self.NEAR_RADIUS
+        self.neighbours = tuple(
+            tuple((r + dr) * size + c + dc
+                  for dr in range(-radius, radius + 1) for dc in range(-radius, radius + 1)
+                  if (dr or dc) and 0 <= r + dr < size and 0 <= c + dc < size)
+            for r in range(size) for c in range(size)
+        )
+
+
+@lru_cache(maxsize=None)
+def board_tables(size: int) -> BoardTables:
+    if size < 5:
+        raise ValueError(f"board size must be at least 5, got {size}")
+    return BoardTables(size)
+
+
+_TABLES = board_tables(BOARD_SIZE)
+ZOBRIST = _TABLES.zobrist
+SYMMETRIES = _TABLES.symmetries
+TRANSFORMS = _TABLES.transforms
+SYMMETRY_ZOBRIST = _TABLES.symmetry_zobrist
+INVERSE_TRANSFORMS = _TABLES.inverse_transforms
+
+
+def transform_cell(transform: int, row: int, col: int) -> Tuple[int, int]:
+    return divmod(TRANSFORMS[transform][row * BOARD_SIZE + col], BOARD_SIZE)
+
+
+def inverse_transform_cell(transform: int, row: int, col: int) -> Tuple[int, int]:
+    return divmod(INVERSE_TRANSFORMS[transform][row * BOARD_SIZE + col], BOARD_SIZE)
+
+
+NEAR_RADIUS = BoardTables.NEAR_RADIUS
+NEIGHBOURS = _TABLES.neighbours
 
 
 class Board:
-    def __init__(self) -> None:
-        self.grid = np.zeros((BOARD_SIZE, BOARD_SIZE), dtype=np.int8)
+    move_counter: Optional[List[int]] = None
+
+    def __init__(self, size: int = BOARD_SIZE) -> None:
+        tables = board_tables(size)
+        self.size = size
+        self.area = size * size
+        self._zobrist = tables.zobrist
+        self._symmetry_zobrist = tables.symmetry_zobrist
+        self._neighbours = tables.neighbours
+        self.grid = np.zeros((size, size), dtype=np.int8)
         self.last_move = None
         self.win_line = None
-        self._near_cache = []
+        self.hash = 0
+        self.sym_hashes = (0,) * len(tables.transforms)
+        self.stones = 0
+        self.cells = [EMPTY] * self.area
+        self._near_count = [0] * self.area
+        self._frontier = set()
+        self._frontier_order = None
+        self._order_history = []
 
     def make_move(self, row: int, col: int, player: int) -> bool:
-        if not (0 <= row < BOARD_SIZE and 0 <= col < BOARD_SIZE):
+        size = self.size
+        if not (0 <= row < size and 0 <= col < size):
             return False
-        if self.grid[row, col] != EMPTY:
+        idx = row * size + col
+        if self.cells[idx] != EMPTY:
             return False
-        self.grid[row, col] = player
+        if self.move_counter is not None:
+            self.move_counter[0] += 1
+        self._place(idx, row, col, player)
         self.last_move = (row, col, player)
-        self._near_cache = []
         return True
 
     def undo_move(self, row: int, col: int) -> None:
-        if 0 <= row < BOARD_SIZE and 0 <= col < BOARD_SIZE and self.grid[row, col] != EMPTY:
-            self.grid[row, col] = EMPTY
+        size = self.size
+        if not (0 <= row < size and 0 <= col < size):
+            return
+        idx = row * size + col
+        player = self.cells[idx]
+        if player != EMPTY:
+            if self.move_counter is not None:
+                self.move_counter[1] += 1
+            self._remove(idx, row, col, player)
             self.win_line = None
-            self._near_cache = []
+
+    def _place(self, idx: int, row: int, col: int, player: int) -> None:
+        self.cells[idx] = player
+        self.grid[row, col] = player
+        self.hash ^= self._zobrist[player][idx]
+        self.sym_hashes = tuple(map(xor, self.sym_hashes, self._symmetry_zobrist[player][idx]))
+        self.stones += 1
+        counts = self._near_count
+        neighbours = self._neighbours[idx]
+        for n in neighbours:
+            counts[n] += 1
+        self._frontier.update(neighbours)
+        self._order_history.append((idx, self._frontier_order))
+        self._frontier_order = None
+
+    def _remove(self, idx: int, row: int, col: int, player: int) -> None:
+        self.cells[idx] = EMPTY
+        self.grid[row, col] = EMPTY
+        self.hash ^= self._zobrist[player][idx]
+        self.sym_hashes = tuple(map(xor, self.sym_hashes, self._symmetry_zobrist[player][idx]))
+        self.stones -= 1
+        counts = self._near_count
+        frontier = self._frontier
+        for n in self._neighbours[idx]:
+            counts[n] -= 1
+            if not counts[n]:
+                frontier.discard(n)
+        history = self._order_history
+        if history and history[-1][0] == idx:
+            self._frontier_order = history.pop()[1]
+        else:
+            history.clear()
+            self._frontier_order = None
+
+    @classmethod
+    def from_board(cls, other: Board) -> Board:
+        board = cls.from_bytes(other.cells)
+        board.last_move = other.last_move
+        board.move_counter = other.move_counter
+        return board
+
+    @classmethod
+    def from_bytes(cls, cells: Sequence[int]) -> Board:
+        size = math.isqrt(len(cells))
+        board = cls(size)
+        for idx, player in enumerate(cells):
+            if player != EMPTY:
+                board._place(idx, idx // size, idx % size, player)
+        return board
+
+    def to_bytes(self) -> bytes:
+        return bytes(self.cells)
+
+    def copy(self) -> Board:
+        return type(self).from_board(self)
 
     def is_full(self) -> bool:
-        return np.all(self.grid != EMPTY)
+        return self.stones == self.area
 
     def check_win(self, player: int) -> bool:
         if self.last_move is None:
@@ -38,6 +187,7 @@ class Board:
         r, c, last_player = self.last_move
         if last_player != player:
             return False
+        size = self.size
         directions = [(0, 1), (1, 0), (1, 1), (1, -1)]
         self.win_line = [(r, c)]
         for dr, dc in directions:
@@ -45,7 +195,7 @@ class Board:
             line = [(r, c)]
             for sign in (1, -1):
                 nr, nc = r + dr * sign, c + dc * sign
-                while (0 <= nr < BOARD_SIZE and 0 <= nc < BOARD_SIZE and
+                while (0 <= nr < size and 0 <= nc < size and
                        self.grid[nr, nc] == player):
                     count += 1
                     line.append((nr, nc))
@@ -58,27 +208,36 @@ class Board:
         return False
 
     def get_empty_cells(self) -> List[Tuple[int, int]]:
-        return [(r, c) for r in range(BOARD_SIZE) for c in range(BOARD_SIZE) if self.grid[r, c] == EMPTY]
+        cells = self.cells
+        return [divmod(i, self.size) for i in range(self.area) if cells[i] == EMPTY]
 
     def get_near_empty_cells(self) -> List[Tuple[int, int]]:
-        if self._near_cache:
-            return self._near_cache
-
-        seen = set()
-        for r in range(BOARD_SIZE):
-            for c in range(BOARD_SIZE):
-                if self.grid[r, c] != EMPTY:
-                    for dr in range(-2, 3):
-                        for dc in range(-2, 3):
-                            if dr == 0 and dc == 0:
-                                continue
-                            nr = r + dr
-                            nc = c + dc
-                            if 0 <= nr < BOARD_SIZE and 0 <= nc < BOARD_SIZE and self.grid[nr, nc] == EMPTY:
-                                seen.add((nr, nc))
-
-        self._near_cache = list(seen)
-        return self._near_cache if self._near_cache else self.get_empty_cells()
-
-    def get_hash(self) -> str:
-        return hashlib.sha256(json.dumps(self.grid.tolist()).encode()).hexdigest()
+        if self._frontier_order is None:
+            cells = self.cells
+            self._frontier_order = [divmod(i, self.size) for i in sorted(self._frontier) if cells[i] == EMPTY]
+        return self._frontier_order if self._frontier_order else self.get_empty_cells()
+
+    def winning_cells(self, player: int) -> List[Tuple[int, int]]:
+        cells = []
+        last_move = self.last_move
+        for r, c in self.get_near_empty_cells():
+            if self.make_move(r, c, player):
+                if self.check_win(player):
+                    cells.append((r, c))
+                self.undo_move(r, c)
+        self.last_move = last_move
+        return cells
+
+    def get(self, row: int, col: int) -> int:
+        return self.cells[row * self.size + col]
+
+    def near_count(self, row: int, col: int) -> int:
+        return self._near_count[row * self.size + col]
+
+    def get_hash(self) -> int:
+        return self.hash
+
+    def canonical_key(self) -> Tuple[int, int]:
+        hashes = self.sym_hashes
+        key = min(hashes)
+        return key, hashes.index(key)
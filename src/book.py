@@ -0,0 +1,137 @@
+from __future__ import annotations
+import argparse
+import mmap
+import os
+import struct
+import time
+from typing import Dict, Optional, Tuple
+from src.constants import BOARD_SIZE, EMPTY, HUMAN, AI_PLAYER, OPENING_BOOK_PATH, AI_TT_SIZE_MB
+from src.board import Board, TRANSFORMS, inverse_transform_cell
+from src.bitboard import BitBoard
+
+MAGIC = b"GMKB"
+VERSION = 1
+HEADER = struct.Struct("<4sBBxxI")
+ENTRY = struct.Struct("<QHh")
+SCORE_LIMIT = 0x7FFF
+
+
+class OpeningBook:
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, "rb") as f:
+            self._data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, board_size, self.count = HEADER.unpack_from(self._data, 0)
+        if magic != MAGIC or version != VERSION or board_size != BOARD_SIZE:
+            self._data.close()
+            raise ValueError(f"{path}: not an opening book for a {BOARD_SIZE}x{BOARD_SIZE} board")
+        if len(self._data) < HEADER.size + self.count * ENTRY.size:
+            self._data.close()
+            raise ValueError(f"{path}: truncated opening book")
+
+    def __len__(self) -> int:
+        return self.count
+
+    def probe(self, key: int) -> Optional[Tuple[int, int]]:
+        data = self._data
+        unpack = ENTRY.unpack_from
+        lo, hi = 0, self.count
+        while lo < hi:
+            mid = (lo + hi) >> 1
+            if unpack(data, HEADER.size + mid * ENTRY.size)[0] < key:
+                lo = mid + 1
+            else:
+                hi = mid
+        if lo < self.count:
+            entry_key, cell, score = unpack(data, HEADER.size + lo * ENTRY.size)
+            if entry_key == key:
+                return cell, score
+        return None
+
+    def lookup(self, board: Board) -> Optional[Tuple[int, int]]:
+        key, transform = board.canonical_key()
+        entry = self.probe(key)
+        if entry is None:
+            return None
+        row, col = inverse_transform_cell(transform, *divmod(entry[0], BOARD_SIZE))
+        if board.cells[row * BOARD_SIZE + col] != EMPTY:
+            return None
+        return row, col
+
+    def close(self) -> None:
+        self._data.close()
+
+
+def write_book(path: str, entries: Dict[int, Tuple[int, int]]) -> None:
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    temp = path + ".tmp"
+    with open(temp, "wb") as f:
+        f.write(HEADER.pack(MAGIC, VERSION, BOARD_SIZE, len(entries)))
+        for key in sorted(entries):
+            cell, score = entries[key]
+            f.write(ENTRY.pack(key, cell, max(-SCORE_LIMIT, min(SCORE_LIMIT, score))))
+    os.replace(temp, path)
+
+
+_books: Dict[str, Optional[OpeningBook]] = {}
+
+
+def load_book(path: str = OPENING_BOOK_PATH) -> Optional[OpeningBook]:
+    if path not in _books:
+        try:
+            _books[path] = OpeningBook(path)
+        except (OSError, ValueError, struct.error):
+            _books[path] = None
+    return _books[path]
+
+
+def build_book(depth: int, width: int, budget_ms: int, verbose: bool = False) -> Dict[int, Tuple[int, int]]:
+    from src.players import SearchStrategy
+
+    strategy = SearchStrategy(budget_ms=budget_ms, tt_size_mb=AI_TT_SIZE_MB)
+    entries: Dict[int, Tuple[int, int]] = {}
+    start = time.perf_counter()
+
+    def visit(board: BitBoard, ply: int) -> None:
+        key, transform = board.canonical_key()
+        if key in entries:
+            return
+        player = HUMAN if ply % 2 == 0 else AI_PLAYER
+        opponent = AI_PLAYER if player == HUMAN else HUMAN
+        row, col = strategy.find_move(board, player, opponent)
+        best = row * BOARD_SIZE + col
+        score = strategy.engine.best_score // 100 if strategy.engine.completed_depth else 0
+        entries[key] = (TRANSFORMS[transform][best], score)
+        if verbose:
+            print(f"{len(entries):>6} positions  ply {ply}  {time.perf_counter() - start:7.1f} s")
+        if ply + 1 >= depth:
+            return
+        children = [best] + [idx for idx in strategy.engine.root_moves(board, player) if idx != best][:width - 1]
+        for idx in children:
+            r, c = divmod(idx, BOARD_SIZE)
+            board.make_move(r, c, player)
+            if not board.check_win(player):
+                visit(board, ply + 1)
+            board.undo_move(r, c)
+
+    visit(BitBoard(), 0)
+    return entries
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Build an opening book with the search strategy")
+    parser.add_argument("--depth", type=int, default=4, help="plies from the empty board covered by the book")
+    parser.add_argument("--width", type=int, default=4, help="moves expanded per position (best move first)")
+    parser.add_argument("--budget-ms", type=int, default=500, help="search time per book position")
+    parser.add_argument("--out", default=OPENING_BOOK_PATH)
+    parser.add_argument("--quiet", action="store_true")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    entries = build_book(args.depth, args.width, args.budget_ms, verbose=not args.quiet)
+    write_book(args.out, entries)
+    print(f"{len(entries)} positions written to {args.out} in {time.perf_counter() - start:.1f} s")
+
+
+if __name__ == "__main__":
+    main()
@@ -5,22 +5,38 @@ CELL_SIZE = 36
 GRID_OFFSET_X = 20
 GRID_OFFSET_Y = 20
 UI_PANEL_HEIGHT = 180
+VIEWPORT_CELLS = 19
 WINDOW_WIDTH = BOARD_SIZE * CELL_SIZE + GRID_OFFSET_X * 2
 WINDOW_HEIGHT = BOARD_SIZE * CELL_SIZE + GRID_OFFSET_Y + UI_PANEL_HEIGHT
 
+INFINITE_BOARD = 0
+
 EMPTY = 0
 HUMAN = 1
 AI_PLAYER = 2
 
 FONT_SIZE_STATUS = 26
 FONT_SIZE_BTN = 22
-AI_THINKING_DELAY = 700
+FONT_SIZE_DETAIL = 18
+IDLE_WAIT_MS = 500
+AI_THINK_TIME_MS = 1500
+AI_TT_SIZE_MB = 32
+AI_SEARCH_WORKERS = 1
+AI_SEARCH_MODE = "split"
+AI_LEARNING_MAX_ENTRIES = 3000
+AI_LEARNING_MAX_BYTES = 0
+AI_LEARNING_POLICY = "lru"
+AI_STATS_LOG = ""
+AI_PROFILE_DIR = ""
+GAME_RECORDS_DIR = "data/games"
+OPENING_BOOK_PATH = "data/opening.book"
 
 
 class Difficulty(IntEnum):
     EASY = auto()
     MEDIUM = auto()
     HARD = auto()
+    EXPERT = auto()
 
 
 class VisualStyle(IntEnum):
@@ -0,0 +1,66 @@
+from __future__ import annotations
+from src.constants import BOARD_SIZE, EMPTY
+from src.board import Board
+
+DIRECTIONS = ((0, 1), (1, 0), (1, 1), (1, -1))
+
+FIVE_SCORE = 1000000
+OPEN_FOUR_SCORE = 60000
+FOUR_SCORE = 12000
+OPEN_THREE_SCORE = 10000
+THREE_SCORE = 1200
+OPEN_TWO_SCORE = 600
+TWO_SCORE = 80
+
+NONE, TWO, OPEN_TWO, THREE, OPEN_THREE, FOUR, OPEN_FOUR, FIVE = range(8)
+PATTERN_NAMES = {TWO: "two", OPEN_TWO: "open_two", THREE: "three", OPEN_THREE: "open_three",
+                 FOUR: "four", OPEN_FOUR: "open_four", FIVE: "five"}
+PATTERN_SCORES = (0, TWO_SCORE, OPEN_TWO_SCORE, THREE_SCORE, OPEN_THREE_SCORE,
+                  FOUR_SCORE, OPEN_FOUR_SCORE, FIVE_SCORE)
+
+
+def run_score(stones: int, open_ends: int) -> int:
+    if stones >= 5:
+        return FIVE_SCORE
+    if stones == 4:
+        return OPEN_FOUR_SCORE if open_ends >= 2 else FOUR_SCORE
+    if stones == 3:
+        return OPEN_THREE_SCORE if open_ends >= 2 else THREE_SCORE
+    if stones == 2:
+        return OPEN_TWO_SCORE if open_ends == 2 else TWO_SCORE
+    return 0
+
+
+def run_pattern(stones: int, open_ends: int) -> int:
+    if stones >= 5:
+        return FIVE
+    if stones < 2 or not open_ends:
+        return NONE
+    return (TWO, THREE, FOUR)[stones - 2] + (open_ends == 2)
+
+
+def pattern_score(board: Board, r: int, c: int, symbol: int) -> int:
+    cells = board.cells
+    score = 0
+    for dr, dc in DIRECTIONS:
+        stones = 1
+        open_ends = 0
+        for sign in (1, -1):
+            nr, nc = r + dr * sign, c + dc * sign
+            while 0 <= nr < BOARD_SIZE and 0 <= nc < BOARD_SIZE:
+                cell = cells[nr * BOARD_SIZE + nc]
+                if cell == symbol:
+                    stones += 1
+                elif cell == EMPTY:
+                    open_ends += 1
+                    break
+                else:
+                    break
+                nr += dr * sign
+                nc += dc * sign
+        score += run_score(stones, open_ends)
+    return score
+
+
+def evaluate(board: Board, player: int, opponent: int) -> int:
+    return board.scores[player] - board.scores[opponent]
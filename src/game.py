@@ -1,41 +1,76 @@
 from __future__ import annotations
 import pygame
+import random
 import time
 from typing import Optional, Tuple, Dict
 from src.constants import *
 from src.board import Board
-from src.players import HumanPlayer, AIPlayer, HardStrategy
+from src.bitboard import BitBoard
+from src.sparse import SparseBoard
+from src.players import HumanPlayer, AIPlayer, AIStrategy, HardStrategy
 from src.renderer import Renderer
 from src.menu import Menu
 from src.settings import Settings
+from src.worker import MoveWorker
+from src.records import GameRecord, RecordWriter, HUMAN_CODE
+from src.instrumentation import JsonlSink, MoveProfiler
+
+
+PAN_KEYS = {pygame.K_UP: (-1, 0), pygame.K_DOWN: (1, 0), pygame.K_LEFT: (0, -1), pygame.K_RIGHT: (0, 1)}
 
 
 class Game:
-    def __init__(self):
-        self.board = Board()
-        self.renderer = Renderer()
-        self.menu = Menu()
-        self.settings = Settings(Difficulty.MEDIUM, VisualStyle.CLASSIC)
+    def __init__(self, board_size: int = BOARD_SIZE):
+        self.board_size = board_size
+        self.board = self.new_board()
+        self.renderer = Renderer(board_size)
+        self.menu = Menu(self.renderer.width)
+        self.settings = Settings(Difficulty.MEDIUM, VisualStyle.CLASSIC, self.renderer.width)
         self.renderer.set_style(self.settings.get_style())
         self.human = HumanPlayer()
-        self.ai = AIPlayer(AI_PLAYER, self.settings.get_difficulty())
+        self._players: Dict[Difficulty, AIPlayer] = {}
+        self.rng = random.Random()
+        self.ai = self.player_for(self.settings.get_difficulty())
         self.current_player = HUMAN
         self.game_over = False
         self.winner = None
-        self.ai_thinking = False
-        self.ai_move_time = 0
+        if AI_STATS_LOG:
+            AIStrategy.stats_sink = JsonlSink(AI_STATS_LOG)
+        if AI_PROFILE_DIR:
+            AIStrategy.profiler = MoveProfiler(AI_PROFILE_DIR)
+        self.worker = MoveWorker()
+        self.recorder = RecordWriter(GAME_RECORDS_DIR)
         self.moves = []
+        self._new_record()
+
+    def new_board(self):
+        if self.board_size == INFINITE_BOARD:
+            return SparseBoard()
+        if self.board_size == BOARD_SIZE:
+            return BitBoard()
+        return Board(self.board_size)
+
+    def player_for(self, difficulty: Difficulty) -> AIPlayer:
+        ai = self._players.get(difficulty)
+        if ai is None:
+            ai = self._players[difficulty] = AIPlayer(AI_PLAYER, difficulty, rng=self.rng)
+        return ai
 
     def run(self) -> None:
+        self.renderer.open()
         running = True
         hovered = None
-        last_move_time = 0
         while running:
-            current_time = pygame.time.get_ticks()
+            events = pygame.event.get()
+            if not events and self._idle():
+                events = [pygame.event.wait(IDLE_WAIT_MS)]
             mouse_pos = pygame.mouse.get_pos()
-            for event in pygame.event.get():
+            for event in events:
                 if event.type == pygame.QUIT:
                     running = False
+                elif event.type == pygame.KEYDOWN and event.key in PAN_KEYS:
+                    self.renderer.pan(*PAN_KEYS[event.key])
+                    hovered = self._get_hovered_cell(mouse_pos)
                 elif event.type == pygame.MOUSEMOTION:
                     hovered = self._get_hovered_cell(mouse_pos)
                     if self.menu.state["active"]:
@@ -60,7 +95,8 @@ class Game:
                             self.menu.show()
                         elif action == "setting_changed":
                             self.renderer.set_style(self.settings.get_style())
-                            self.ai = AIPlayer(AI_PLAYER, self.settings.get_difficulty())
+                            self.worker.cancel()
+                            self.ai = self.player_for(self.settings.get_difficulty())
                     else:
                         hovered = self._get_hovered_cell(mouse_pos)
                         if hovered:
@@ -68,24 +104,21 @@ class Game:
                                 if self.board.make_move(hovered[0], hovered[1], HUMAN):
                                     self.moves.append((hovered[0], hovered[1], HUMAN))
                                     self._after_move(HUMAN)
-                        ui_btn_rect = pygame.Rect(WINDOW_WIDTH // 2 - 70,
-                                                  GRID_OFFSET_Y + BOARD_SIZE * CELL_SIZE + 50,
-                                                  140, 40)
-                        if ui_btn_rect.collidepoint(mouse_pos):
+                        if self.renderer.menu_button_rect.collidepoint(mouse_pos):
+                            self.worker.cancel()
                             self.menu.show()
-            if not self.game_over and self.current_player == AI_PLAYER and not self.ai_thinking:
-                if current_time - last_move_time > AI_THINKING_DELAY:
-                    self.ai_thinking = True
-                    self.ai_move_time = current_time
-            if self.ai_thinking and current_time - self.ai_move_time > 500:
-                move = self.ai.get_move(self.board)
-                if move:
-                    r, c = move
-                    if self.board.make_move(r, c, AI_PLAYER):
-                        self.moves.append((r, c, AI_PLAYER))
-                        last_move_time = current_time
-                        self._after_move(AI_PLAYER)
-                self.ai_thinking = False
+            if self.worker.busy:
+                if self.worker.done():
+                    move = self.worker.result()
+                    if move:
+                        r, c = move
+                        if self.board.make_move(r, c, AI_PLAYER):
+                            self.renderer.reveal(r, c)
+                            self.moves.append((r, c, AI_PLAYER))
+                            self._after_move(AI_PLAYER)
+            elif (not self.game_over and self.current_player == AI_PLAYER
+                  and not self.menu.state["active"] and not self.settings.state["active"]):
+                self.worker.start(self.ai, self.board)
             self.renderer.draw_board(self.board, hovered)
             if self.menu.state["active"]:
                 self.renderer.draw_menu(self.menu.state)
@@ -93,22 +126,34 @@ class Game:
                 self.renderer.draw_settings(self.settings.state)
             else:
                 status = self._get_status_text()
-                self.renderer.draw_ui(status, self.settings.get_difficulty(), mouse_pos, self.game_over)
+                self.renderer.draw_ui(status, self.settings.get_difficulty(), mouse_pos, self.game_over,
+                                      self._get_status_detail(), self.ai.playing_difficulty(self.board))
             self.renderer.update()
-            pygame.time.delay(10)
+        self.worker.shutdown()
+        self.recorder.close()
+        if AIStrategy.stats_sink is not None:
+            AIStrategy.stats_sink.close()
         self.renderer.close()
 
+    def _idle(self) -> bool:
+        if self.worker.busy:
+            return False
+        return (self.game_over or self.current_player != AI_PLAYER
+                or self.menu.state["active"] or self.settings.state["active"])
+
     def _get_hovered_cell(self, mouse_pos) -> Optional[Tuple[int, int]]:
-        mx, my = mouse_pos
-        if (GRID_OFFSET_X <= mx < GRID_OFFSET_X + BOARD_SIZE * CELL_SIZE and
-                GRID_OFFSET_Y <= my < GRID_OFFSET_Y + BOARD_SIZE * CELL_SIZE):
-            col = (mx - GRID_OFFSET_X) // CELL_SIZE
-            row = (my - GRID_OFFSET_Y) // CELL_SIZE
-            if 0 <= row < BOARD_SIZE and 0 <= col < BOARD_SIZE:
-                return (row, col)
-        return None
+        return self.renderer.cell_at(mouse_pos)
+
+    def _new_record(self) -> None:
+        self.seed = random.randrange(1 << 32)
+        self.rng.seed(self.seed)
+        self.think_ms = []
+        self._turn_started = time.perf_counter()
 
     def _after_move(self, player: int) -> None:
+        now = time.perf_counter()
+        self.think_ms.append((now - self._turn_started) * 1000)
+        self._turn_started = now
         if self.board.check_win(player):
             self.game_over = True
             self.winner = player
@@ -118,13 +163,18 @@ class Game:
         else:
             self.current_player = AI_PLAYER if player == HUMAN else HUMAN
 
-        if self.game_over and self.settings.get_difficulty() == Difficulty.HARD:
+        if self.game_over and 0 < self.board_size <= 16:
+            self.recorder.append(GameRecord.from_moves(self.moves, self.winner or EMPTY,
+                                                       (HUMAN_CODE, int(self.settings.get_difficulty())),
+                                                       self.seed, self.think_ms, self.board_size))
+        if (self.game_over and self.settings.get_difficulty() == Difficulty.HARD
+                and self.board_size == BOARD_SIZE):
             if isinstance(self.ai.strategy, HardStrategy):
                 self.ai.strategy.save_learning_data(self.moves, self.winner)
 
     def _get_status_text(self) -> str:
-        if self.ai_thinking:
-            return "Компьютер думает..."
+        if self.worker.busy:
+            return f"Компьютер думает... {self.worker.elapsed:.1f} с"
         if self.game_over:
             if self.winner == HUMAN:
                 return "Вы победили!"
@@ -133,10 +183,24 @@ class Game:
             return "Ничья!"
         return "Ваш ход" if self.current_player == HUMAN else "Ход компьютера..."
 
+    def _get_status_detail(self) -> str:
+        if not self.worker.busy:
+            return ""
+        progress = self.worker.progress()
+        parts = []
+        if progress.get("depth"):
+            parts.append(f"глубина {progress['depth']}")
+        if progress.get("nodes"):
+            parts.append(f"{progress['nodes']:,} позиций".replace(",", " "))
+        return ", ".join(parts)
+
     def reset_game(self):
-        self.board = Board()
+        self.worker.cancel()
+        for ai in self._players.values():
+            ai.new_game()
+        self.board = self.new_board()
         self.current_player = HUMAN
         self.game_over = False
         self.winner = None
-        self.ai_thinking = False
         self.moves = []
+        self._new_record()
@@ -0,0 +1,167 @@
+from __future__ import annotations
+import cProfile
+import io
+import json
+import os
+import pstats
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import deque
+from typing import Any, Callable, Dict, Iterator, Optional, Tuple
+from src.bitboard import line_summary
+
+
+class MoveStats:
+    def __init__(self, order: Tuple[str, ...] = ()):
+        self.phases: Dict[str, float] = {}
+        self.candidates: Optional[int] = None
+        self.score: Optional[float] = None
+        self._order = order
+        self._next = 0
+        self._lap = time.perf_counter()
+        self._nested = 0.0
+
+    def mark(self, phase: str) -> None:
+        now = time.perf_counter()
+        self.phases[phase] = self.phases.get(phase, 0.0) + now - self._lap - self._nested
+        self._lap = now
+        self._nested = 0.0
+        if phase in self._order:
+            self._next = self._order.index(phase) + 1
+
+    def close(self) -> None:
+        if self._next < len(self._order):
+            self.mark(self._order[self._next])
+
+    def add(self, phase: str, seconds: float) -> None:
+        self.phases[phase] = self.phases.get(phase, 0.0) + seconds
+        self._nested += seconds
+
+    def note(self, candidates: Optional[int] = None, score: Optional[float] = None) -> None:
+        if candidates is not None:
+            self.candidates = candidates
+        if score is not None:
+            self.score = score
+
+
+class StatsSink(ABC):
+    @abstractmethod
+    def emit(self, record: Dict[str, Any]) -> None:
+        pass
+
+    def close(self) -> None:
+        pass
+
+
+class JsonlSink(StatsSink):
+    def __init__(self, path: str):
+        self.path = path
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._file = open(path, "a")
+        self._lock = threading.Lock()
+
+    def emit(self, record: Dict[str, Any]) -> None:
+        line = json.dumps(record) + "\n"
+        with self._lock:
+            self._file.write(line)
+            self._file.flush()
+
+    def close(self) -> None:
+        self._file.close()
+
+
+class RingBufferSink(StatsSink):
+    def __init__(self, capacity: int = 256):
+        self.records: deque = deque(maxlen=capacity)
+
+    def emit(self, record: Dict[str, Any]) -> None:
+        self.records.append(record)
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        return iter(list(self.records))
+
+
+class MoveProfiler:
+    def __init__(self, directory: Optional[str] = None, sort: str = "cumulative", limit: int = 25):
+        self.directory = directory
+        self.sort = sort
+        self.limit = limit
+        self.moves = 0
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    def run(self, function: Callable, *args) -> Tuple[Any, Dict[str, str]]:
+        profile = cProfile.Profile()
+        result = profile.runcall(function, *args)
+        self.moves += 1
+        if self.directory:
+            path = os.path.join(self.directory, f"move-{os.getpid()}-{self.moves:05d}.prof")
+            profile.dump_stats(path)
+            return result, {"profile": path}
+        stream = io.StringIO()
+        pstats.Stats(profile, stream=stream).sort_stats(self.sort).print_stats(self.limit)
+        return result, {"profile_text": stream.getvalue()}
+
+
+def _counters(strategy) -> Dict[str, int]:
+    cache = line_summary.cache_info()
+    counts = {"line_cache_hits": cache.hits, "line_cache_misses": cache.misses}
+    counts.update(strategy.counters())
+    return counts
+
+
+def hit_rates(deltas: Dict[str, int]) -> Dict[str, Optional[float]]:
+    rates = {}
+    for key, hits in deltas.items():
+        if key.endswith("_hits"):
+            name = key[:-len("_hits")]
+            lookups = hits + deltas.get(f"{name}_misses", 0)
+            rates[name] = hits / lookups if lookups else None
+    return rates
+
+
+def instrumented_move(strategy, board, symbol: int, opponent: int) -> Tuple[int, int]:
+    before = _counters(strategy)
+    moves = board.move_counter = [0, 0]
+    stats = strategy.stats = MoveStats(strategy.PHASES)
+
+    def find_move(*args) -> Tuple[int, int]:
+        try:
+            return strategy.find_move(*args)
+        finally:
+            stats.close()
+
+    start = time.perf_counter()
+    try:
+        if strategy.profiler is not None:
+            move, extra = strategy.profiler.run(find_move, board, symbol, opponent)
+        else:
+            move, extra = find_move(board, symbol, opponent), {}
+    finally:
+        strategy.stats = None
+        board.move_counter = None
+    elapsed = time.perf_counter() - start
+    after = _counters(strategy)
+    deltas = {key: value - before.get(key, 0) for key, value in after.items()}
+    if strategy.stats_sink is not None:
+        strategy.stats_sink.emit({
+            "time": time.time(),
+            "strategy": type(strategy).__name__,
+            "player": symbol,
+            "stones": board.stones,
+            "move": list(move) if move is not None else None,
+            "elapsed_ms": elapsed * 1000,
+            "nodes": strategy.progress().get("nodes", 0),
+            "make_move": moves[0],
+            "undo_move": moves[1],
+            "hit_rates": hit_rates(deltas),
+            "phases_ms": {phase: seconds * 1000 for phase, seconds in stats.phases.items()},
+            "candidates": stats.candidates,
+            "score": stats.score,
+            **extra,
+        })
+    return move
@@ -0,0 +1,360 @@
+from __future__ import annotations
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+import json
+import os
+import sqlite3
+import threading
+from typing import Dict, Callable, Optional, List, Set, Tuple
+
+SCHEMA_VERSION = 2
+LRU, LFU = "lru", "lfu"
+_KEY_OFFSET = 1 << 63
+
+
+def _size(moves: Dict[str, int]) -> int:
+    return len(json.dumps(moves))
+
+
+class EvictionIndex:
+    def __init__(self, policy: str = LRU):
+        if policy not in (LRU, LFU):
+            raise ValueError(f"unknown eviction policy: {policy}")
+        self.policy = policy
+        self._recency: OrderedDict = OrderedDict()
+        self._counts: Dict[int, int] = {}
+        self._buckets: Dict[int, OrderedDict] = {}
+        self._min = 0
+
+    def __len__(self) -> int:
+        return len(self._recency) if self.policy == LRU else len(self._counts)
+
+    def touch(self, key: int) -> None:
+        if self.policy == LRU:
+            self._recency[key] = None
+            self._recency.move_to_end(key)
+            return
+        count = self._counts.get(key, 0)
+        if count:
+            bucket = self._buckets[count]
+            del bucket[key]
+            if not bucket:
+                del self._buckets[count]
+                if self._min == count:
+                    self._min = count + 1
+        else:
+            self._min = 1
+        self._counts[key] = count + 1
+        self._buckets.setdefault(count + 1, OrderedDict())[key] = None
+
+    def remove(self, key: int) -> None:
+        if self.policy == LRU:
+            self._recency.pop(key, None)
+            return
+        count = self._counts.pop(key, 0)
+        if count:
+            bucket = self._buckets[count]
+            del bucket[key]
+            if not bucket:
+                del self._buckets[count]
+
+    def victim(self) -> Optional[int]:
+        if self.policy == LRU:
+            return next(iter(self._recency), None)
+        if not self._counts:
+            return None
+        while self._min not in self._buckets:
+            self._min += 1
+        return next(iter(self._buckets[self._min]))
+
+
+class LearningStore(ABC):
+    def __init__(self, max_entries: int = 0, max_bytes: int = 0, policy: str = LRU):
+        if policy not in (LRU, LFU):
+            raise ValueError(f"unknown eviction policy: {policy}")
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.policy = policy
+        self.entries = 0
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.evicted_entries = 0
+        self.evicted_bytes = 0
+
+    @abstractmethod
+    def get(self, key: int) -> Dict[str, int]:
+        pass
+
+    @abstractmethod
+    def update(self, deltas: Dict[int, Dict[str, int]]) -> None:
+        pass
+
+    def __len__(self) -> int:
+        return self.entries
+
+    @property
+    def has_legacy(self) -> bool:
+        return False
+
+    def legacy_keys(self) -> Set[str]:
+        return set()
+
+    def rekey_legacy(self, old_key: str, key: int, remap: Optional[Callable[[str], str]] = None) -> Dict[str, int]:
+        return {}
+
+    def drop_legacy(self) -> None:
+        pass
+
+    def close(self) -> None:
+        pass
+
+    def _over_budget(self, entries: int, size: int) -> bool:
+        return bool((self.max_entries and entries > self.max_entries) or (self.max_bytes and size > self.max_bytes))
+
+    def _record_eviction(self, sizes: List[int]) -> None:
+        if sizes:
+            self.evictions += 1
+            self.evicted_entries += len(sizes)
+            self.evicted_bytes += sum(sizes)
+
+    def stats(self) -> Dict[str, float]:
+        lookups = self.hits + self.misses
+        return {
+            "policy": self.policy,
+            "entries": self.entries,
+            "bytes": self.bytes,
+            "max_entries": self.max_entries,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+            "evicted_entries": self.evicted_entries,
+            "evicted_bytes": self.evicted_bytes,
+        }
+
+
+class MemoryStore(LearningStore):
+    def __init__(self, max_entries: int = 0, max_bytes: int = 0, policy: str = LRU):
+        super().__init__(max_entries, max_bytes, policy)
+        self.data: Dict[int, Dict[str, int]] = {}
+        self._sizes: Dict[int, int] = {}
+        self._index = EvictionIndex(policy)
+
+    def get(self, key: int) -> Dict[str, int]:
+        moves = self.data.get(key)
+        if moves is None:
+            self.misses += 1
+            return {}
+        self.hits += 1
+        self._index.touch(key)
+        return moves
+
+    def update(self, deltas: Dict[int, Dict[str, int]]) -> None:
+        for key, changes in deltas.items():
+            moves = self.data.setdefault(key, {})
+            for move_key, delta in changes.items():
+                moves[move_key] = moves.get(move_key, 0) + delta
+            size = _size(moves)
+            old = self._sizes.get(key)
+            if old is None:
+                self.entries += 1
+                old = 0
+            self.bytes += size - old
+            self._sizes[key] = size
+            self._index.touch(key)
+        self._evict()
+
+    def _evict(self) -> None:
+        sizes = []
+        while self._over_budget(self.entries, self.bytes):
+            key = self._index.victim()
+            if key is None:
+                break
+            self._index.remove(key)
+            del self.data[key]
+            size = self._sizes.pop(key)
+            self.entries -= 1
+            self.bytes -= size
+            sizes.append(size)
+        self._record_eviction(sizes)
+
+
+class SQLiteStore(LearningStore):
+    CACHE_ENTRIES = 4096
+
+    def __init__(self, path: str, table: str, max_entries: int = 0, max_bytes: int = 0, policy: str = LRU):
+        super().__init__(max_entries, max_bytes, policy)
+        self.path = path
+        self.table = table
+        self._cache: OrderedDict = OrderedDict()
+        self._cache_size = min(max_entries or self.CACHE_ENTRIES, self.CACHE_ENTRIES)
+        self._touched: Dict[int, Tuple[int, int]] = {}
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        with self._conn:
+            self._conn.execute(f"CREATE TABLE IF NOT EXISTS {table} (key INTEGER PRIMARY KEY, moves TEXT NOT NULL)")
+            self._conn.execute(f"CREATE TABLE IF NOT EXISTS {table}_legacy "
+                               f"(key TEXT PRIMARY KEY, moves TEXT NOT NULL) WITHOUT ROWID")
+            self._conn.execute("CREATE TABLE IF NOT EXISTS learning_schema (name TEXT PRIMARY KEY, version INTEGER)")
+        self._upgrade()
+        self._legacy = self._conn.execute(f"SELECT EXISTS (SELECT 1 FROM {table}_legacy)").fetchone()[0] == 1
+        self.entries, self.bytes, self._clock = self._conn.execute(
+            f"SELECT COUNT(*), COALESCE(SUM(LENGTH(moves)), 0), COALESCE(MAX(used), 0) FROM {table}").fetchone()
+        with self._conn:
+            self._evict()
+
+    def _upgrade(self) -> None:
+        row = self._conn.execute("SELECT version FROM learning_schema WHERE name = ?", (self.table,)).fetchone()
+        version = row[0] if row is not None else 0
+        if version >= SCHEMA_VERSION:
+            return
+        with self._conn:
+            if version < 1:
+                rows = self._conn.execute(f"SELECT key, moves FROM {self.table}").fetchall()
+                self._conn.executemany(f"INSERT OR REPLACE INTO {self.table}_legacy (key, moves) VALUES (?, ?)",
+                                       [(f"{key + _KEY_OFFSET:016x}", moves) for key, moves in rows])
+                self._conn.execute(f"DELETE FROM {self.table}")
+            if version < 2:
+                self._conn.execute(f"ALTER TABLE {self.table} ADD COLUMN visits INTEGER NOT NULL DEFAULT 0")
+                self._conn.execute(f"ALTER TABLE {self.table} ADD COLUMN used INTEGER NOT NULL DEFAULT 0")
+                self._conn.execute(f"CREATE INDEX {self.table}_lru ON {self.table} (used)")
+                self._conn.execute(f"CREATE INDEX {self.table}_lfu ON {self.table} (visits, used)")
+            self._conn.execute("INSERT OR REPLACE INTO learning_schema (name, version) VALUES (?, ?)",
+                               (self.table, SCHEMA_VERSION))
+
+    def _load(self, key: int) -> Dict[str, int]:
+        moves = self._cache.get(key)
+        if moves is None:
+            row = self._conn.execute(f"SELECT moves FROM {self.table} WHERE key = ?",
+                                     (key - _KEY_OFFSET,)).fetchone()
+            moves = json.loads(row[0]) if row else {}
+        self._remember(key, moves)
+        return moves
+
+    def _remember(self, key: int, moves: Dict[str, int]) -> None:
+        cache = self._cache
+        cache[key] = moves
+        cache.move_to_end(key)
+        if len(cache) > self._cache_size:
+            cache.popitem(last=False)
+
+    def get(self, key: int) -> Dict[str, int]:
+        with self._lock:
+            moves = self._load(key)
+            if moves:
+                self.hits += 1
+                self._clock += 1
+                self._touched[key] = (self._touched.get(key, (0, 0))[0] + 1, self._clock)
+            else:
+                self.misses += 1
+        return moves
+
+    def update(self, deltas: Dict[int, Dict[str, int]]) -> None:
+        with self._lock, self._conn:
+            self._write(self._merge(deltas))
+            self._evict()
+
+    def _merge(self, deltas: Dict[int, Dict[str, int]]) -> Dict[int, Tuple[Dict[str, int], int]]:
+        merged = {}
+        for key, changes in deltas.items():
+            old = self._load(key)
+            moves = dict(old)
+            for move_key, delta in changes.items():
+                moves[move_key] = moves.get(move_key, 0) + delta
+            merged[key] = (moves, _size(old) if old else -1)
+        return merged
+
+    def _write(self, merged: Dict[int, Tuple[Dict[str, int], int]]) -> None:
+        self._flush_touches()
+        rows = []
+        for key, (moves, old_size) in merged.items():
+            text = json.dumps(moves)
+            if old_size < 0:
+                self.entries += 1
+                old_size = 0
+            self.bytes += len(text) - old_size
+            self._clock += 1
+            rows.append((key - _KEY_OFFSET, text, self._clock))
+            self._remember(key, moves)
+        self._conn.executemany(f"INSERT INTO {self.table} (key, moves, visits, used) VALUES (?, ?, 1, ?) "
+                               f"ON CONFLICT (key) DO UPDATE SET moves = excluded.moves, "
+                               f"visits = visits + 1, used = excluded.used", rows)
+
+    def _flush_touches(self) -> None:
+        if self._touched:
+            self._conn.executemany(f"UPDATE {self.table} SET visits = visits + ?, used = ? WHERE key = ?",
+                                   [(visits, used, key - _KEY_OFFSET)
+                                    for key, (visits, used) in self._touched.items()])
+            self._touched.clear()
+
+    def _evict(self) -> None:
+        entries, size = self.entries, self.bytes
+        if not self._over_budget(entries, size):
+            return
+        self._flush_touches()
+        order = "used" if self.policy == LRU else "visits, used"
+        victims, sizes = [], []
+        for key, length in self._conn.execute(f"SELECT key, LENGTH(moves) FROM {self.table} ORDER BY {order}"):
+            if not self._over_budget(entries, size):
+                break
+            victims.append((key,))
+            sizes.append(length)
+            entries -= 1
+            size -= length
+        self._conn.executemany(f"DELETE FROM {self.table} WHERE key = ?", victims)
+        for (key,) in victims:
+            self._cache.pop(key + _KEY_OFFSET, None)
+        self.entries, self.bytes = entries, size
+        self._record_eviction(sizes)
+
+    @property
+    def has_legacy(self) -> bool:
+        return self._legacy
+
+    def legacy_keys(self) -> Set[str]:
+        with self._lock:
+            return {key for key, in self._conn.execute(f"SELECT key FROM {self.table}_legacy")}
+
+    def rekey_legacy(self, old_key: str, key: int, remap: Optional[Callable[[str], str]] = None) -> Dict[str, int]:
+        with self._lock:
+            row = self._conn.execute(f"SELECT moves FROM {self.table}_legacy WHERE key = ?", (old_key,)).fetchone()
+            if row is None:
+                return {}
+            legacy = moves = json.loads(row[0])
+            if remap is not None:
+                moves = {remap(move_key): score for move_key, score in moves.items()}
+            merged = self._merge({key: moves})
+            with self._conn:
+                self._conn.execute(f"DELETE FROM {self.table}_legacy WHERE key = ?", (old_key,))
+                self._write(merged)
+                self._evict()
+        return legacy
+
+    def drop_legacy(self) -> None:
+        with self._lock, self._conn:
+            self._conn.execute(f"DELETE FROM {self.table}_legacy")
+            self._legacy = False
+
+    def import_json(self, filepath: str) -> int:
+        if not os.path.exists(filepath):
+            return 0
+        with open(filepath, 'r') as f:
+            payload = json.load(f)
+        legacy = [(key.lower(), json.dumps(moves)) for key, moves in payload.items()]
+        with self._lock, self._conn:
+            self._conn.executemany(f"INSERT OR REPLACE INTO {self.table}_legacy (key, moves) VALUES (?, ?)", legacy)
+            self._legacy = self._legacy or bool(legacy)
+        os.replace(filepath, filepath + ".bak")
+        return len(payload)
+
+    def close(self) -> None:
+        with self._lock:
+            if self._touched:
+                with self._conn:
+                    self._flush_touches()
+            self._conn.close()
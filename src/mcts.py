@@ -0,0 +1,199 @@
+from __future__ import annotations
+import math
+import random
+import threading
+import time
+from typing import List, Optional, Tuple
+from src.constants import BOARD_SIZE, EMPTY, HUMAN, AI_PLAYER
+from src.board import Board, ZOBRIST, NEIGHBOURS
+
+_N = BOARD_SIZE
+_STEPS = ((0, 1), (1, 0), (1, 1), (1, -1))
+
+
+def _ray(r: int, c: int, dr: int, dc: int) -> Tuple[int, ...]:
+    cells = []
+    for step in range(1, 5):
+        nr, nc = r + dr * step, c + dc * step
+        if not (0 <= nr < _N and 0 <= nc < _N):
+            break
+        cells.append(nr * _N + nc)
+    return tuple(cells)
+
+
+RAYS = tuple(
+    tuple((_ray(r, c, dr, dc), _ray(r, c, -dr, -dc)) for dr, dc in _STEPS)
+    for r in range(_N) for c in range(_N)
+)
+
+
+def _wins(cells: List[int], idx: int, player: int) -> bool:
+    for forward, backward in RAYS[idx]:
+        count = 1
+        for n in forward:
+            if cells[n] != player:
+                break
+            count += 1
+        for n in backward:
+            if cells[n] != player:
+                break
+            count += 1
+        if count >= 5:
+            return True
+    return False
+
+
+class Node:
+    __slots__ = ("move", "player", "key", "parent", "children", "untried", "visits", "wins", "terminal")
+
+    def __init__(self, move: int, player: int, key: int, parent: Optional[Node]):
+        self.move = move
+        self.player = player
+        self.key = key
+        self.parent = parent
+        self.children: List[Node] = []
+        self.untried: Optional[List[int]] = None
+        self.visits = 0
+        self.wins = 0.0
+        self.terminal = False
+
+
+class MCTS:
+    CHECK_INTERVAL = 16
+
+    def __init__(self, exploration: float = 1.4, seed: Optional[int] = None, stop: Optional[threading.Event] = None):
+        self.exploration = exploration
+        self.rng = random.Random(seed)
+        self.stop = stop
+        self.root: Optional[Node] = None
+        self.playouts = 0
+        self.playouts_per_second = 0.0
+        size = _N * _N
+        self._cells = [EMPTY] * size
+        self._cand = [0] * size
+        self._pos = [-1] * size
+        self._count = 0
+        self._root_cells = [EMPTY] * size
+        self._root_cand = [0] * size
+        self._root_pos = [-1] * size
+        self._root_count = 0
+
+    def _place(self, idx: int, player: int) -> None:
+        cells, cand, pos = self._cells, self._cand, self._pos
+        cells[idx] = player
+        i = pos[idx]
+        if i >= 0:
+            self._count -= 1
+            last = cand[self._count]
+            cand[i] = last
+            pos[last] = i
+            pos[idx] = -1
+        count = self._count
+        for n in NEIGHBOURS[idx]:
+            if cells[n] == EMPTY and pos[n] < 0:
+                cand[count] = n
+                pos[n] = count
+                count += 1
+        self._count = count
+
+    def _load_root(self, board: Board) -> None:
+        size = _N * _N
+        self._cells[:] = [EMPTY] * size
+        self._pos[:] = [-1] * size
+        self._count = 0
+        for idx in range(size):
+            if board.cells[idx] != EMPTY:
+                self._place(idx, board.cells[idx])
+        self._root_cells[:] = self._cells
+        self._root_cand[:] = self._cand
+        self._root_pos[:] = self._pos
+        self._root_count = self._count
+
+    def _reuse_root(self, board: Board, player: int) -> Node:
+        root = self.root
+        if root is not None:
+            for node in [root] + root.children + [grandchild for child in root.children for grandchild in child.children]:
+                if node.key == board.hash and node.player != player:
+                    node.parent = None
+                    return node
+        opponent = AI_PLAYER if player == HUMAN else HUMAN
+        return Node(-1, opponent, board.hash, None)
+
+    def search(self, board: Board, player: int, budget_ms: int = 0, max_playouts: int = 0) -> Optional[Tuple[int, int]]:
+        self._load_root(board)
+        if not self._root_count and board.stones:
+            return None
+        root = self.root = self._reuse_root(board, player)
+        self.playouts = 0
+        deadline = time.perf_counter() + budget_ms / 1000 if budget_ms else math.inf
+        start = time.perf_counter()
+        while True:
+            if max_playouts and self.playouts >= max_playouts:
+                break
+            if self.playouts % self.CHECK_INTERVAL == 0 and (
+                    time.perf_counter() > deadline or self.stop is not None and self.stop.is_set()):
+                break
+            self._iterate(root)
+            self.playouts += 1
+        elapsed = time.perf_counter() - start
+        self.playouts_per_second = self.playouts / elapsed if elapsed else 0.0
+        if not root.children:
+            return divmod(self._root_cand[0], _N) if self._root_count else (_N // 2, _N // 2)
+        best = max(root.children, key=lambda node: node.visits)
+        return divmod(best.move, _N)
+
+    def _iterate(self, root: Node) -> None:
+        cells, cand = self._cells, self._cand
+        cells[:] = self._root_cells
+        cand[:] = self._root_cand
+        self._pos[:] = self._root_pos
+        self._count = self._root_count
+
+        node = root
+        log = math.log
+        sqrt = math.sqrt
+        c = self.exploration
+        while not node.terminal and node.untried is not None and not node.untried and node.children:
+            scale = log(node.visits)
+            node = max(node.children, key=lambda child: child.wins / child.visits
+                       + c * sqrt(scale / child.visits))
+            self._place(node.move, node.player)
+
+        if node.terminal:
+            winner = node.player
+        else:
+            if node.untried is None:
+                node.untried = cand[:self._count]
+            if node.untried:
+                untried = node.untried
+                i = int(self.rng.random() * len(untried))
+                move = untried[i]
+                untried[i] = untried[-1]
+                untried.pop()
+                player = HUMAN if node.player == AI_PLAYER else AI_PLAYER
+                child = Node(move, player, node.key ^ ZOBRIST[player][move], node)
+                node.children.append(child)
+                self._place(move, player)
+                node = child
+                child.terminal = _wins(cells, move, player)
+            winner = node.player if node.terminal else self._playout(node.player)
+
+        while node is not None:
+            node.visits += 1
+            if winner == node.player:
+                node.wins += 1.0
+            elif winner == EMPTY:
+                node.wins += 0.5
+            node = node.parent
+
+    def _playout(self, last_player: int) -> int:
+        cells, cand = self._cells, self._cand
+        rand = self.rng.random
+        player = last_player
+        while self._count:
+            player = HUMAN if player == AI_PLAYER else AI_PLAYER
+            idx = cand[int(rand() * self._count)]
+            self._place(idx, player)
+            if _wins(cells, idx, player):
+                return player
+        return EMPTY
@@ -1,17 +1,17 @@
 from __future__ import annotations
 import pygame
 from typing import Dict, Any
-from src.constants import WINDOW_WIDTH, WINDOW_HEIGHT, Difficulty, VisualStyle
+from src.constants import WINDOW_WIDTH, Difficulty, VisualStyle
 
 
 class Menu:
-    def __init__(self):
+    def __init__(self, width: int = WINDOW_WIDTH):
         self.state = {
             "active": True,
             "buttons": {
-                "new_game": {"text": "НОВАЯ ИГРА", "pos": (WINDOW_WIDTH // 2 - 110, 180)},
-                "settings": {"text": "НАСТРОЙКИ", "pos": (WINDOW_WIDTH // 2 - 110, 250)},
-                "exit": {"text": "ВЫХОД", "pos": (WINDOW_WIDTH // 2 - 110, 320)}
+                "new_game": {"text": "НОВАЯ ИГРА", "pos": (width // 2 - 110, 180)},
+                "settings": {"text": "НАСТРОЙКИ", "pos": (width // 2 - 110, 250)},
+                "exit": {"text": "ВЫХОД", "pos": (width // 2 - 110, 320)}
             }
         }
 
@@ -0,0 +1,157 @@
+from __future__ import annotations
+import math
+import multiprocessing
+import os
+import random
+import threading
+import time
+import weakref
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from multiprocessing import shared_memory
+from typing import Any, Dict, List, Optional, Tuple
+from src.constants import BOARD_SIZE, AI_TT_SIZE_MB
+from src.bitboard import BitBoard
+from src.search import AlphaBetaSearch, INFINITY, is_mate
+from src.transposition import TranspositionTable
+
+ROOT_SPLIT, LAZY_SMP = "split", "smp"
+
+_engine: Optional[AlphaBetaSearch] = None
+_shm: Optional[shared_memory.SharedMemory] = None
+_epoch = None
+_seen_epoch = 0
+
+
+def _init_worker(tt_size_mb: float, shm_name: Optional[str], cancel, epoch, max_depth: int, beam_width: int) -> None:
+    global _engine, _epoch, _shm
+    buffer = None
+    if shm_name is not None:
+        _shm = shared_memory.SharedMemory(name=shm_name)
+        buffer = _shm.buf
+    _engine = AlphaBetaSearch(max_depth, beam_width, TranspositionTable(tt_size_mb, buffer), stop=cancel)
+    _epoch = epoch
+
+
+def _search_job(job: Tuple[bytes, int, Optional[List[int]], int, int, int]) -> Dict[str, Any]:
+    global _seen_epoch
+    snapshot, player, moves, budget_ms, start_depth, helper = job
+    if _epoch.value != _seen_epoch:
+        _seen_epoch = _epoch.value
+        if _shm is None:
+            _engine.clear()
+    board = BitBoard.from_bytes(snapshot)
+    if moves is None and helper:
+        moves = _engine.root_moves(board, player)
+        head, tail = moves[:helper % 3 + 1], moves[helper % 3 + 1:]
+        random.Random(helper).shuffle(head)
+        moves = head + tail
+    move = _engine.search(board, player, budget_ms, moves, start_depth)
+    best = move[0] * BOARD_SIZE + move[1] if move is not None else None
+    return {"move": best, "score": _engine.best_score, "depth": _engine.completed_depth, "nodes": _engine.nodes,
+            "iterations": _engine.iterations,
+            "pv": _engine.principal_variation(board, player, best) if best is not None else []}
+
+
+def _score_at(result: Dict[str, Any], depth: int) -> int:
+    if is_mate(result["score"]):
+        return result["score"]
+    for completed, _, score in result["iterations"]:
+        if completed == depth:
+            return score
+    return -INFINITY
+
+
+def merge_results(results: List[Dict[str, Any]], mode: str) -> Tuple[Dict[str, Any], int]:
+    wins = [result for result in results if result["score"] > 0 and is_mate(result["score"])]
+    if wins:
+        best = max(wins, key=lambda result: result["score"])
+        return best, best["depth"]
+    if mode == LAZY_SMP:
+        best = max(results, key=lambda result: (math.inf if is_mate(result["score"]) else result["depth"],
+                                                result["score"]))
+        return best, best["depth"]
+    searched = [result for result in results if result["depth"] and not is_mate(result["score"])]
+    depth = min((result["depth"] for result in searched), default=0)
+    return max(results, key=lambda result: _score_at(result, depth)), depth
+
+
+def _shutdown(pool: ProcessPoolExecutor, shm: Optional[shared_memory.SharedMemory]) -> None:
+    pool.shutdown(wait=True, cancel_futures=True)
+    if shm is not None:
+        shm.close()
+        shm.unlink()
+
+
+class ParallelSearch:
+    POLL_SECONDS = 0.02
+
+    def __init__(self, workers: int = 0, mode: str = ROOT_SPLIT, tt_size_mb: float = AI_TT_SIZE_MB,
+                 max_depth: int = 12, beam_width: int = 12, stop: Optional[threading.Event] = None):
+        if mode not in (ROOT_SPLIT, LAZY_SMP):
+            raise ValueError(f"unknown parallel search mode: {mode}")
+        self.workers = workers or os.cpu_count() or 1
+        self.mode = mode
+        self.stop = stop
+        self.nodes = 0
+        self.completed_depth = 0
+        self.best_score = 0
+        self.pv: List[int] = []
+        self.nodes_per_second = 0.0
+        self._local = AlphaBetaSearch(max_depth, beam_width, TranspositionTable(1))
+        context = multiprocessing.get_context()
+        self._cancel = context.Event()
+        self._epoch = context.Value("i", 0)
+        self._shm = None
+        if mode == LAZY_SMP:
+            self._shm = shared_memory.SharedMemory(create=True, size=TranspositionTable.buffer_size(tt_size_mb))
+        self._pool = ProcessPoolExecutor(
+            self.workers, mp_context=context, initializer=_init_worker,
+            initargs=(tt_size_mb, self._shm.name if self._shm else None, self._cancel, self._epoch,
+                      max_depth, beam_width))
+        self._finalizer = weakref.finalize(self, _shutdown, self._pool, self._shm)
+
+    def clear(self) -> None:
+        if self._shm is not None:
+            self._shm.buf[:] = bytes(self._shm.size)
+        with self._epoch.get_lock():
+            self._epoch.value += 1
+
+    def close(self) -> None:
+        self._finalizer()
+
+    def root_moves(self, board: BitBoard, player: int) -> List[int]:
+        return self._local.root_moves(board, player)
+
+    def _jobs(self, board: BitBoard, player: int, budget_ms: int) -> List[Tuple]:
+        snapshot = board.to_bytes()
+        if self.mode == LAZY_SMP:
+            return [(snapshot, player, None, budget_ms, 1 + i % 2, i) for i in range(self.workers)]
+        moves = self.root_moves(board, player)
+        return [(snapshot, player, moves[i::self.workers], budget_ms, 1, 0)
+                for i in range(min(self.workers, len(moves)))]
+
+    def search(self, board: BitBoard, player: int, budget_ms: int) -> Optional[Tuple[int, int]]:
+        self.nodes = self.completed_depth = self.best_score = 0
+        self.pv = []
+        moves = self.root_moves(board, player)
+        if len(moves) <= 1:
+            return divmod(moves[0], BOARD_SIZE) if moves else None
+        self._cancel.clear()
+        start = time.perf_counter()
+        pending = {self._pool.submit(_search_job, job) for job in self._jobs(board, player, budget_ms)}
+        results = []
+        while pending:
+            done, pending = wait(pending, timeout=self.POLL_SECONDS, return_when=FIRST_COMPLETED)
+            results.extend(future.result() for future in done)
+            if self.stop is not None and self.stop.is_set():
+                self._cancel.set()
+        elapsed = time.perf_counter() - start
+        self.nodes = sum(result["nodes"] for result in results)
+        self.nodes_per_second = self.nodes / elapsed if elapsed else 0.0
+        results = [result for result in results if result["move"] is not None]
+        if not results:
+            return divmod(moves[0], BOARD_SIZE)
+        best, self.completed_depth = merge_results(results, self.mode)
+        self.best_score = best["score"]
+        self.pv = best["pv"]
+        return divmod(best["move"], BOARD_SIZE)
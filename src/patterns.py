@@ -0,0 +1,111 @@
+from __future__ import annotations
+import numpy as np
+from functools import lru_cache
+from numpy.lib.stride_tricks import as_strided, sliding_window_view
+from typing import Dict, Tuple
+from src.constants import EMPTY, HUMAN, AI_PLAYER
+from src.evaluation import (NONE, TWO, OPEN_TWO, THREE, OPEN_THREE, FOUR, OPEN_FOUR, FIVE, PATTERN_NAMES,
+                            PATTERN_SCORES)
+
+PATTERN_WEIGHTS = np.array(PATTERN_SCORES, dtype=np.int64)
+
+
+def line_windows(grid: np.ndarray, width: int) -> Tuple[np.ndarray, np.ndarray]:
+    n = grid.shape[0]
+    s0, s1 = grid.strides
+    span = n - width + 1
+    views = (
+        sliding_window_view(grid, width, axis=1),
+        sliding_window_view(grid, width, axis=0),
+        as_strided(grid, shape=(span, span, width), strides=(s0, s1, s0 + s1)),
+        as_strided(grid[:, width - 1:], shape=(span, span, width), strides=(s0, s1, s0 - s1)),
+    )
+    windows = np.concatenate([view.reshape(-1, width) for view in views])
+    directions = np.concatenate([np.full(view.shape[0] * view.shape[1], d, dtype=np.intp)
+                                 for d, view in enumerate(views)])
+    return windows, directions
+
+
+def _classify(width: int, player: int) -> np.ndarray:
+    digits = (np.arange(3 ** width)[:, None] // 3 ** np.arange(width)) % 3
+    opponent = HUMAN if player == AI_PLAYER else AI_PLAYER
+    table = np.full(3 ** width, NONE, dtype=np.int8)
+    if width == 5:
+        clean = ~(digits == opponent).any(axis=1)
+        stones = (digits == player).sum(axis=1)
+        for count, pattern in ((5, FIVE), (4, FOUR), (3, THREE), (2, TWO)):
+            table[clean & (stones == count)] = pattern
+    else:
+        inner = digits[:, 1:5]
+        clean = (digits[:, 0] == EMPTY) & (digits[:, 5] == EMPTY) & ~(inner == opponent).any(axis=1)
+        stones = (inner == player).sum(axis=1)
+        for count, pattern in ((4, OPEN_FOUR), (3, OPEN_THREE), (2, OPEN_TWO)):
+            table[clean & (stones == count)] = pattern
+    return table
+
+
+_TABLES = {width: {player: _classify(width, player) for player in (HUMAN, AI_PLAYER)} for width in (5, 6)}
+
+
+@lru_cache(maxsize=None)
+def _layout(size: int) -> Dict[int, Tuple[np.ndarray, np.ndarray, np.ndarray, Dict[int, np.ndarray]]]:
+    index = np.arange(size * size, dtype=np.intp).reshape(size, size)
+    layout = {}
+    for width, tables in _TABLES.items():
+        cells, directions = line_windows(index, width)
+        layout[width] = (cells, directions, 3 ** np.arange(width), tables)
+    return layout
+
+
+def scan(grid: np.ndarray) -> Dict[int, np.ndarray]:
+    best = {player: np.zeros((4, grid.size), dtype=np.int8) for player in (HUMAN, AI_PLAYER)}
+    for width, (cells, directions, powers, tables) in _layout(grid.shape[0]).items():
+        windows, _ = line_windows(grid, width)
+        codes = windows.astype(np.intp) @ powers
+        for i in range(width):
+            empty = windows[:, i] == EMPTY
+            target = (directions[empty], cells[empty, i])
+            empty_codes = codes[empty]
+            for player, table in tables.items():
+                np.maximum.at(best[player], target, table[empty_codes + player * powers[i]])
+    return best
+
+
+def pattern_maps(scanned: Dict[int, np.ndarray], size: int) -> Dict[int, Dict[str, np.ndarray]]:
+    maps = {}
+    for player, best in scanned.items():
+        maps[player] = {name: (best == pattern).sum(axis=0).reshape(size, size)
+                        for pattern, name in PATTERN_NAMES.items()}
+        maps[player]["score"] = PATTERN_WEIGHTS[best].sum(axis=0).reshape(size, size)
+    return maps
+
+
+def threat_maps(grid: np.ndarray) -> Dict[int, Dict[str, np.ndarray]]:
+    return pattern_maps(scan(grid), grid.shape[0])
+
+
+def scan_batch(grids: np.ndarray, players: Tuple[int, ...] = (HUMAN, AI_PLAYER)) -> Dict[int, np.ndarray]:
+    count = grids.shape[0]
+    flat = grids.reshape(count, -1)
+    size = flat.shape[1]
+    best = {player: np.zeros((count, 4 * size), dtype=np.int8) for player in players}
+    for width, (cells, directions, powers, tables) in _layout(grids.shape[1]).items():
+        windows = flat[:, cells]
+        codes = windows.astype(np.int32) @ powers.astype(np.int32)
+        for i in range(width):
+            empty = windows[:, :, i] == EMPTY
+            target = directions * size + cells[:, i]
+            for player in players:
+                found = tables[player][np.where(empty, codes + player * powers[i], 0)]
+                best[player][:, target] = np.maximum(best[player][:, target], found)
+    return {player: found.reshape(count, 4, size) for player, found in best.items()}
+
+
+def batch_scores(grids: np.ndarray, player: int, chunk: int = 64) -> np.ndarray:
+    grids = np.asarray(grids, dtype=np.int8)
+    count, size = grids.shape[0], grids.shape[1]
+    scores = np.empty((count, size, size), dtype=np.int64)
+    for start in range(0, count, chunk):
+        best = scan_batch(grids[start:start + chunk], (player,))[player]
+        scores[start:start + chunk] = PATTERN_WEIGHTS[best].sum(axis=1).reshape(-1, size, size)
+    return scores
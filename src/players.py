@@ -2,11 +2,26 @@ from __future__ import annotations
 from abc import ABC, abstractmethod
 import random
 import os
+import threading
+import time
 import json
 import hashlib
-from typing import Tuple, Optional, List, Dict
-from src.constants import BOARD_SIZE, HUMAN, AI_PLAYER, EMPTY, Difficulty
-from src.board import Board
+import numpy as np
+from typing import Tuple, Optional, List, Dict, Set
+from src.constants import (BOARD_SIZE, HUMAN, AI_PLAYER, EMPTY, AI_THINK_TIME_MS, AI_TT_SIZE_MB, AI_SEARCH_WORKERS,
+                           AI_SEARCH_MODE, AI_LEARNING_MAX_ENTRIES, AI_LEARNING_MAX_BYTES, AI_LEARNING_POLICY,
+                           Difficulty)
+from src.board import Board, board_tables, transform_cell
+from src.bitboard import BitBoard
+from src.patterns import threat_maps
+from src.search import AlphaBetaSearch
+from src.parallel import ParallelSearch
+from src.transposition import TranspositionTable
+from src.vcf import ThreatSolver
+from src.mcts import MCTS
+from src.learning import LearningStore, SQLiteStore
+from src.book import OpeningBook, load_book
+from src.instrumentation import MoveStats, MoveProfiler, StatsSink, instrumented_move
 
 
 class Player(ABC):
@@ -21,255 +36,420 @@ class HumanPlayer(Player):
 
 
 class AIStrategy(ABC):
+    PHASES: Tuple[str, ...] = ()
+    stop_event: Optional[threading.Event] = None
+    stats_sink: Optional[StatsSink] = None
+    profiler: Optional[MoveProfiler] = None
+    stats: Optional[MoveStats] = None
+    rng: random.Random = random.Random()
+
     @abstractmethod
     def find_move(self, board: Board, symbol: int, opponent: int) -> Tuple[int, int]:
         pass
 
+    def new_game(self) -> None:
+        pass
+
+    def supports(self, board: Board) -> bool:
+        return True
+
+    def wait_ready(self, stop: Optional[threading.Event] = None) -> bool:
+        return True
+
+    def progress(self) -> Dict[str, int]:
+        return {}
+
+    def counters(self) -> Dict[str, int]:
+        return {}
+
+    def close(self) -> None:
+        pass
+
+    def _mark(self, phase: str) -> None:
+        if self.stats is not None:
+            self.stats.mark(phase)
+
 
 class EasyStrategy(AIStrategy):
+    PHASES = ("random_move",)
+
     def find_move(self, board: Board, symbol: int, opponent: int) -> Tuple[int, int]:
         empties = board.get_empty_cells()
-        return random.choice(empties) if empties else (7, 7)
+        return self.rng.choice(empties) if empties else (7, 7)
 
 
 class MediumStrategy(AIStrategy):
+    PHASES = ("win_check", "near_move")
+
     def find_move(self, board: Board, symbol: int, opponent: int) -> Tuple[int, int]:
         if move := self._find_winning_move(board, symbol):
             return move
         if move := self._find_winning_move(board, opponent):
             return move
+        self._mark("win_check")
         return self._find_near_move(board)
 
     def _find_winning_move(self, board: Board, player: int) -> Optional[Tuple[int, int]]:
-        for r, c in board.get_near_empty_cells():
-            if board.make_move(r, c, player):
-                if board.check_win(player):
-                    board.undo_move(r, c)
-                    return (r, c)
-                board.undo_move(r, c)
-        return None
+        cells = board.winning_cells(player)
+        return cells[0] if cells else None
 
     def _find_near_move(self, board: Board) -> Tuple[int, int]:
         near = board.get_near_empty_cells()
-        return random.choice(near) if near else random.choice(board.get_empty_cells())
+        return self.rng.choice(near) if near else self.rng.choice(board.get_empty_cells())
 
 
 class HardStrategy(AIStrategy):
-    def __init__(self):
-        os.makedirs('data', exist_ok=True)
-        self.good_moves = self._load_data('data/good_moves.json')
-        self.bad_moves = self._load_data('data/bad_moves.json')
-        self.eval_cache = {}
-        self._limit_data_size(self.good_moves)
-        self._limit_data_size(self.bad_moves)
-
-    def _limit_data_size(self, data: Dict):
-        if len(data) > 5000:
-            keys = sorted(data.keys())[:len(data) - 3000]
-            for key in keys:
-                del data[key]
-
-    def _load_data(self, filepath: str) -> Dict[str, Dict[str, int]]:
-        if os.path.exists(filepath):
-            with open(filepath, 'r') as f:
-                return json.load(f)
-        return {}
+    LEARNING_DB = 'data/learning.db'
+    POLL_SECONDS = 0.02
+    PHASES = ("win_check", "vcf", "threat_scan", "book", "candidate_scoring")
 
-    def save_learning_data(self, moves: List[Tuple[int, int, int]], winner: int):
-        if winner not in (AI_PLAYER, HUMAN):
+    def __init__(self, good_moves: Optional[LearningStore] = None, bad_moves: Optional[LearningStore] = None,
+                 book: Optional[OpeningBook] = None):
+        self.book = book
+        self.eval_cache = {}
+        self.solver = ThreatSolver(time_ms=100)
+        self._good_moves = good_moves
+        self._bad_moves = bad_moves
+        self._load_error: Optional[Exception] = None
+        self._ready = threading.Event()
+        if good_moves is None or bad_moves is None:
+            threading.Thread(target=self._load_stores, name="learning-load", daemon=True).start()
+        else:
+            self._ready.set()
+
+    def _load_stores(self) -> None:
+        try:
+            os.makedirs('data', exist_ok=True)
+            if self._good_moves is None:
+                self._good_moves = self._open_store('good_moves')
+            if self._bad_moves is None:
+                self._bad_moves = self._open_store('bad_moves')
+            self._migrate_legacy()
+        except Exception as e:
+            self._load_error = e
+        finally:
+            self._ready.set()
+
+    def wait_ready(self, stop: Optional[threading.Event] = None) -> bool:
+        while not self._ready.wait(self.POLL_SECONDS if stop is not None else None):
+            if stop.is_set():
+                return False
+        if self._load_error is not None:
+            raise self._load_error
+        return True
+
+    @property
+    def good_moves(self) -> LearningStore:
+        self.wait_ready()
+        return self._good_moves
+
+    @property
+    def bad_moves(self) -> LearningStore:
+        self.wait_ready()
+        return self._bad_moves
+
+    def supports(self, board: Board) -> bool:
+        return board.size is not None
+
+    def progress(self) -> Dict[str, int]:
+        return {"nodes": self.solver.nodes}
+
+    def counters(self) -> Dict[str, int]:
+        return {"learning_hits": self.good_moves.hits + self.bad_moves.hits,
+                "learning_misses": self.good_moves.misses + self.bad_moves.misses}
+
+    def learning_stats(self) -> Dict[str, Dict[str, float]]:
+        return {"good_moves": self.good_moves.stats(), "bad_moves": self.bad_moves.stats()}
+
+    def close(self) -> None:
+        self._ready.wait()
+        for store in (self._good_moves, self._bad_moves):
+            if store is not None:
+                store.close()
+
+    def _open_store(self, name: str) -> LearningStore:
+        store = SQLiteStore(self.LEARNING_DB, name, AI_LEARNING_MAX_ENTRIES, AI_LEARNING_MAX_BYTES, AI_LEARNING_POLICY)
+        store.import_json(f'data/{name}.json')
+        return store
+
+    @staticmethod
+    def _legacy_hash(board: Board) -> str:
+        return hashlib.sha256(json.dumps(board.grid.tolist()).encode()).hexdigest()
+
+    @staticmethod
+    def _move_key(transform: int, row: int, col: int) -> str:
+        return "%d,%d" % transform_cell(transform, row, col)
+
+    def _migrate_legacy(self) -> None:
+        stores = [store for store in (self._good_moves, self._bad_moves) if store.has_legacy]
+        if not stores:
             return
-
-        data = self.good_moves if winner == AI_PLAYER else self.bad_moves
+        pending = set().union(*(store.legacy_keys() for store in stores))
+        zobrist = board_tables(BOARD_SIZE).zobrist[HUMAN]
+        stack = [()] + [((idx, HUMAN),) for idx in range(BOARD_SIZE * BOARD_SIZE)]
+        while stack and pending:
+            moves = stack.pop()
+            board = Board()
+            for idx, player in moves:
+                board.make_move(*divmod(idx, BOARD_SIZE), player)
+            for move_key in self._rekey_position(board, stores, pending):
+                row, col = map(int, move_key.split(","))
+                if not board.make_move(row, col, AI_PLAYER):
+                    continue
+                rows = [json.dumps(line) for line in board.grid.tolist()]
+                for idx, cell in enumerate(board.cells):
+                    if cell != EMPTY:
+                        continue
+                    r, c = divmod(idx, BOARD_SIZE)
+                    line = board.grid[r].tolist()
+                    line[c] = HUMAN
+                    grid = "[" + ", ".join(rows[:r] + [json.dumps(line)] + rows[r + 1:]) + "]"
+                    if (hashlib.sha256(grid.encode()).hexdigest() in pending
+                            or f"{board.hash ^ zobrist[idx]:016x}" in pending):
+                        stack.append(moves + ((row * BOARD_SIZE + col, AI_PLAYER), (idx, HUMAN)))
+                board.undo_move(row, col)
+        for store in stores:
+            store.drop_legacy()
+
+    def _rekey_position(self, board: Board, stores: List[LearningStore], pending: Set[str]) -> Dict[str, int]:
+        key, transform = board.canonical_key()
+
+        def remap(move_key: str) -> str:
+            row, col = move_key.split(",")
+            return self._move_key(transform, int(row), int(col))
+
+        learned = {}
+        for old_key in (self._legacy_hash(board), f"{board.get_hash():016x}"):
+            if old_key in pending:
+                pending.discard(old_key)
+                for store in stores:
+                    learned.update(store.rekey_legacy(old_key, key, remap))
+        return learned
+
+    @classmethod
+    def game_deltas(cls, moves: List[Tuple[int, int, int]], winner: int) -> Dict[int, Dict[str, int]]:
         bonus = 10 if winner == AI_PLAYER else -10
-
         temp_board = Board()
         seen_hashes = set()
+        deltas = {}
 
-        for i, (row, col, player) in enumerate(moves):
-            current_hash = temp_board.get_hash()
+        for row, col, player in moves:
+            current_hash, transform = temp_board.canonical_key()
             if current_hash in seen_hashes:
                 continue
             seen_hashes.add(current_hash)
 
-            move_key = f"{row},{col}"
+            move_key = cls._move_key(transform, row, col)
             if player == AI_PLAYER:
-                if current_hash not in data:
-                    data[current_hash] = {}
-                data[current_hash][move_key] = data[current_hash].get(move_key, 0) + bonus
+                changes = deltas.setdefault(current_hash, {})
+                changes[move_key] = changes.get(move_key, 0) + bonus
 
             temp_board.make_move(row, col, player)
+        return deltas
 
-        if len(data) > 3000:
-            oldest_keys = sorted(data.keys())[:len(data) - 2000]
-            for key in oldest_keys:
-                del data[key]
+    def save_learning_data(self, moves: List[Tuple[int, int, int]], winner: int):
+        if winner not in (AI_PLAYER, HUMAN):
+            return
 
-        filepath = 'data/good_moves.json' if winner == AI_PLAYER else 'data/bad_moves.json'
-        with open(filepath, 'w') as f:
-            json.dump(data, f)
+        store = self.good_moves if winner == AI_PLAYER else self.bad_moves
+        store.update(self.game_deltas(moves, winner))
 
     def find_move(self, board: Board, symbol: int, opponent: int) -> Tuple[int, int]:
         self.eval_cache.clear()
+        self.solver.stop = self.stop_event
+        standard = board.size == BOARD_SIZE
 
         if move := self._find_winning_move(board, symbol):
             return move
         if move := self._find_winning_move(board, opponent):
             return move
-        if move := self._find_double_open_four_threat(board, opponent):
+        self._mark("win_check")
+        if standard and (line := self.solver.solve_vcf(board, symbol)):
+            return line[0]
+        self._mark("vcf")
+        maps = board.threat_maps() if isinstance(board, BitBoard) else threat_maps(board.grid)
+        if move := self._find_double_open_four_threat(maps, opponent):
             return move
-        if move := self._find_double_open_three_threat(board, opponent):
+        if move := self._find_double_open_three_threat(maps, opponent):
             return move
+        self._mark("threat_scan")
 
-        total_moves = BOARD_SIZE * BOARD_SIZE - len(board.get_empty_cells())
-
-        if total_moves < 8:
-            cx, cy = BOARD_SIZE // 2, BOARD_SIZE // 2
-            zone = [(cy + dr, cx + dc) for dr in range(-5, 6) for dc in range(-5, 6)
-                    if
-                    0 <= cy + dr < BOARD_SIZE and 0 <= cx + dc < BOARD_SIZE and board.grid[cy + dr, cx + dc] == EMPTY]
-            return random.choice(zone) if zone else self._find_near_move(board)
+        if board.stones == 0:
+            return (board.size // 2, board.size // 2)
+        if standard and self.book is not None and (move := self.book.lookup(board)):
+            return move
+        self._mark("book")
 
-        candidates = board.get_near_empty_cells()[:40]
-        if not candidates:
-            candidates = board.get_empty_cells()[:60]
+        candidates = board.get_near_empty_cells()
+        stop = self.stop_event
+        learned = standard and self.wait_ready(stop)
 
         scored = []
         for r, c in candidates:
-            score = self._evaluate_position(board, r, c, symbol)
+            if scored and stop is not None and stop.is_set():
+                break
+            score = self._evaluate_position(board, r, c, symbol, maps[symbol]["score"], learned)
             scored.append(((r, c), score))
 
         scored.sort(key=lambda x: x[1], reverse=True)
         top_score = scored[0][1]
         good_moves = [pos for pos, sc in scored if sc >= top_score - 4000][:8]
-        return random.choice(good_moves) if good_moves else scored[0][0]
+        move = self.rng.choice(good_moves) if good_moves else scored[0][0]
+        if self.stats is not None:
+            self.stats.mark("candidate_scoring")
+            self.stats.note(len(candidates), dict(scored)[move])
+        return move
 
     def _find_winning_move(self, board: Board, player: int) -> Optional[Tuple[int, int]]:
-        for r, c in board.get_near_empty_cells():
-            if board.make_move(r, c, player):
-                if board.check_win(player):
-                    board.undo_move(r, c)
-                    return (r, c)
-                board.undo_move(r, c)
-        return None
+        cells = board.winning_cells(player)
+        return cells[0] if cells else None
 
-    def _find_double_open_four_threat(self, board: Board, player: int) -> Optional[Tuple[int, int]]:
-        for r, c in board.get_near_empty_cells():
-            if board.make_move(r, c, player):
-                if self._count_open_fours(board, player) >= 2:
-                    board.undo_move(r, c)
-                    return (r, c)
-                board.undo_move(r, c)
-        return None
+    def _find_double_open_four_threat(self, maps: Dict, player: int) -> Optional[Tuple[int, int]]:
+        return self._best_threat_cell(maps[player]["open_four"])
+
+    def _find_double_open_three_threat(self, maps: Dict, player: int) -> Optional[Tuple[int, int]]:
+        return self._best_threat_cell(maps[player]["open_three"])
 
-    def _find_double_open_three_threat(self, board: Board, player: int) -> Optional[Tuple[int, int]]:
-        threats = []
-        for r, c in board.get_near_empty_cells():
-            if board.make_move(r, c, player):
-                count = self._count_open_threes(board, player)
-                board.undo_move(r, c)
-                if count >= 2:
-                    threats.append((r, c))
-        return random.choice(threats) if threats else None
-
-    def _count_open_fours(self, board: Board, player: int) -> int:
-        count = 0
-        directions = [(0, 1), (1, 0), (1, 1), (1, -1)]
-        for r in range(BOARD_SIZE):
-            for c in range(BOARD_SIZE):
-                if board.grid[r, c] == player:
-                    for dr, dc in directions:
-                        stones, open_ends = self._count_in_direction(board, r, c, dr, dc, player)
-                        if stones == 4 and open_ends >= 2:
-                            count += 1
-        return count
-
-    def _count_open_threes(self, board: Board, player: int) -> int:
-        count = 0
-        directions = [(0, 1), (1, 0), (1, 1), (1, -1)]
-        for r in range(BOARD_SIZE):
-            for c in range(BOARD_SIZE):
-                if board.grid[r, c] == player:
-                    for dr, dc in directions:
-                        stones, open_ends = self._count_in_direction(board, r, c, dr, dc, player)
-                        if stones == 3 and open_ends >= 2:
-                            count += 1
-        return count
-
-    def _count_in_direction(self, board: Board, r: int, c: int, dr: int, dc: int, player: int) -> Tuple[int, int]:
-        count = 1
-        open_ends = 0
-        for sign in (1, -1):
-            nr, nc = r + dr * sign, c + dc * sign
-            while 0 <= nr < BOARD_SIZE and 0 <= nc < BOARD_SIZE:
-                if board.grid[nr, nc] == player:
-                    count += 1
-                elif board.grid[nr, nc] == EMPTY:
-                    open_ends += 1
-                    break
-                else:
-                    break
-                nr += dr * sign
-                nc += dc * sign
-        return count, open_ends
+    def _best_threat_cell(self, counts: np.ndarray) -> Optional[Tuple[int, int]]:
+        top = counts.max()
+        if top < 2:
+            return None
+        return self.rng.choice([(int(r), int(c)) for r, c in np.argwhere(counts == top)])
 
     def _find_near_move(self, board: Board) -> Tuple[int, int]:
         near = board.get_near_empty_cells()
-        return random.choice(near) if near else random.choice(board.get_empty_cells())
+        return self.rng.choice(near) if near else self.rng.choice(board.get_empty_cells())
 
-    def _evaluate_position(self, board: Board, r: int, c: int, symbol: int) -> int:
+    def _evaluate_position(self, board: Board, r: int, c: int, symbol: int, pattern_scores: np.ndarray,
+                           learned: bool = True) -> int:
         key = (r, c, symbol)
         if key in self.eval_cache:
             return self.eval_cache[key]
 
-        if not board.make_move(r, c, symbol):
+        if board.get(r, c) != EMPTY:
             return -999999
 
-        score = 0
-        directions = [(0, 1), (1, 0), (1, 1), (1, -1)]
-        for dr, dc in directions:
-            stones = 1
-            open_ends = 0
-            for sign in (1, -1):
-                nr, nc = r + dr * sign, c + dc * sign
-                while 0 <= nr < BOARD_SIZE and 0 <= nc < BOARD_SIZE:
-                    if board.grid[nr, nc] == symbol:
-                        stones += 1
-                    elif board.grid[nr, nc] == EMPTY:
-                        open_ends += 1
-                        break
-                    else:
-                        break
-                    nr += dr * sign
-                    nc += dc * sign
-            if stones >= 5:
-                score += 1000000
-            elif stones == 4:
-                score += 60000 if open_ends >= 2 else 12000
-            elif stones == 3:
-                score += 10000 if open_ends >= 2 else 1200
-            elif stones == 2:
-                score += 600 if open_ends == 2 else 80
-
-        board.undo_move(r, c)
-
-        current_hash = board.get_hash()
-        move_key = f"{r},{c}"
+        score = int(pattern_scores[r, c])
+        if not learned or board.size != BOARD_SIZE:
+            self.eval_cache[key] = score
+            return score
+
+        if self.stats is not None:
+            start = time.perf_counter()
+        current_hash, transform = board.canonical_key()
+        move_key = self._move_key(transform, r, c)
         bonus = 0
-        if current_hash in self.good_moves and move_key in self.good_moves[current_hash]:
-            bonus += min(self.good_moves[current_hash][move_key], 100)
-        if current_hash in self.bad_moves and move_key in self.bad_moves[current_hash]:
-            bonus += max(self.bad_moves[current_hash][move_key], -100)
+        good = self.good_moves.get(current_hash)
+        if move_key in good:
+            bonus += min(good[move_key], 100)
+        bad = self.bad_moves.get(current_hash)
+        if move_key in bad:
+            bonus += max(bad[move_key], -100)
         score += bonus
+        if self.stats is not None:
+            self.stats.add("learned_lookup", time.perf_counter() - start)
 
         self.eval_cache[key] = score
         return score
 
 
+class SearchStrategy(AIStrategy):
+    PHASES = ("book", "threat_search", "search")
+
+    def __init__(self, budget_ms: int = AI_THINK_TIME_MS, tt_size_mb: float = AI_TT_SIZE_MB,
+                 book: Optional[OpeningBook] = None, workers: int = 1, mode: str = AI_SEARCH_MODE):
+        self.budget_ms = budget_ms
+        self.book = book
+        if workers == 1:
+            self.engine = AlphaBetaSearch(tt=TranspositionTable(tt_size_mb))
+        else:
+            self.engine = ParallelSearch(workers, mode, tt_size_mb)
+        self.solver = ThreatSolver(time_ms=budget_ms // 5)
+
+    def new_game(self) -> None:
+        self.engine.clear()
+
+    def close(self) -> None:
+        if isinstance(self.engine, ParallelSearch):
+            self.engine.close()
+
+    def supports(self, board: Board) -> bool:
+        return board.size == BOARD_SIZE
+
+    def progress(self) -> Dict[str, int]:
+        return {"depth": self.engine.completed_depth, "nodes": self.solver.nodes + self.engine.nodes}
+
+    def counters(self) -> Dict[str, int]:
+        tt = getattr(self.engine, "tt", None)
+        return {"tt_hits": tt.hits, "tt_misses": tt.probes - tt.hits} if tt is not None else {}
+
+    def find_move(self, board: Board, symbol: int, opponent: int) -> Tuple[int, int]:
+        if board.stones == 0:
+            return (BOARD_SIZE // 2, BOARD_SIZE // 2)
+        if self.book is not None and (move := self.book.lookup(board)):
+            return move
+        self._mark("book")
+        snapshot = BitBoard.from_board(board)
+        solver = self.solver
+        solver.stop = self.engine.stop = self.stop_event
+        self.engine.nodes = self.engine.completed_depth = 0
+        start = time.perf_counter()
+        if line := solver.solve_vcf(snapshot, symbol) or solver.solve_vct(snapshot, symbol):
+            return line[0]
+        self._mark("threat_search")
+        remaining = self.budget_ms - int((time.perf_counter() - start) * 1000)
+        move = self.engine.search(snapshot, symbol, max(remaining, self.budget_ms // 5))
+        if self.stats is not None:
+            self.stats.mark("search")
+            self.stats.note(len(self.engine.root_moves(snapshot, symbol)), self.engine.best_score)
+        return move
+
+
+class MCTSStrategy(AIStrategy):
+    PHASES = ("win_check", "search")
+
+    def __init__(self, budget_ms: int = AI_THINK_TIME_MS, playouts: int = 0, exploration: float = 1.4,
+                 seed: Optional[int] = None):
+        self.budget_ms = budget_ms
+        self.playouts = playouts
+        self.engine = MCTS(exploration, seed=random.getrandbits(64) if seed is None else seed)
+
+    def new_game(self) -> None:
+        self.engine.root = None
+
+    def supports(self, board: Board) -> bool:
+        return board.size == BOARD_SIZE
+
+    def progress(self) -> Dict[str, int]:
+        return {"nodes": self.engine.playouts, "playouts_per_second": int(self.engine.playouts_per_second)}
+
+    def find_move(self, board: Board, symbol: int, opponent: int) -> Tuple[int, int]:
+        if board.stones == 0:
+            return (BOARD_SIZE // 2, BOARD_SIZE // 2)
+        if cells := board.winning_cells(symbol):
+            return cells[0]
+        if cells := board.winning_cells(opponent):
+            return cells[0]
+        self._mark("win_check")
+        self.engine.stop = self.stop_event
+        budget_ms = 0 if self.playouts else self.budget_ms
+        move = self.engine.search(board, symbol, budget_ms, self.playouts)
+        if self.stats is not None:
+            self.stats.mark("search")
+            self.stats.note(len(self.engine.root.children))
+        return move
+
+
 class AIPlayer(Player):
-    def __init__(self, symbol: int, difficulty: Difficulty):
+    def __init__(self, symbol: int, difficulty: Difficulty, strategy: Optional[AIStrategy] = None,
+                 rng: Optional[random.Random] = None):
         self.symbol = symbol
         self.opponent = HUMAN if symbol == AI_PLAYER else AI_PLAYER
-        self.strategy = self._get_strategy(difficulty)
+        self.difficulty = difficulty
+        self.rng = rng or random.Random()
+        self.strategy = strategy or self._get_strategy(difficulty)
+        self.fallback = MediumStrategy()
+        self._fallbacks: Dict[Difficulty, AIStrategy] = {Difficulty.MEDIUM: self.fallback}
 
     def _get_strategy(self, difficulty: Difficulty) -> AIStrategy:
         match difficulty:
@@ -278,12 +458,44 @@ class AIPlayer(Player):
             case Difficulty.MEDIUM:
                 return MediumStrategy()
             case Difficulty.HARD:
-                return HardStrategy()
+                return HardStrategy(book=load_book())
+            case Difficulty.EXPERT:
+                return SearchStrategy(book=load_book(), workers=AI_SEARCH_WORKERS)
             case _:
                 return EasyStrategy()
 
-    def get_move(self, board: Board) -> Optional[Tuple[int, int]]:
-        empties = board.get_empty_cells()
-        if not empties:
+    def new_game(self) -> None:
+        self.strategy.new_game()
+        for strategy in self._fallbacks.values():
+            strategy.new_game()
+
+    def close(self) -> None:
+        self.strategy.close()
+        for strategy in self._fallbacks.values():
+            strategy.close()
+
+    def strategy_for(self, board: Board) -> Tuple[AIStrategy, Difficulty]:
+        if self.strategy.supports(board):
+            return self.strategy, self.difficulty
+        for difficulty in (Difficulty.HARD, Difficulty.MEDIUM):
+            if difficulty >= self.difficulty:
+                continue
+            strategy = self._fallbacks.get(difficulty)
+            if strategy is None:
+                strategy = self._fallbacks[difficulty] = self._get_strategy(difficulty)
+            if strategy.supports(board):
+                return strategy, difficulty
+        return self.fallback, Difficulty.MEDIUM
+
+    def playing_difficulty(self, board: Board) -> Difficulty:
+        return self.strategy_for(board)[1]
+
+    def get_move(self, board: Board, stop_event: Optional[threading.Event] = None) -> Optional[Tuple[int, int]]:
+        if board.is_full():
             return None
-        return self.strategy.find_move(board, self.symbol, self.opponent)
+        strategy = self.strategy_for(board)[0]
+        strategy.stop_event = stop_event
+        strategy.rng = self.rng
+        if strategy.stats_sink is None and strategy.profiler is None:
+            return strategy.find_move(board, self.symbol, self.opponent)
+        return instrumented_move(strategy, board, self.symbol, self.opponent)
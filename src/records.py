@@ -0,0 +1,147 @@
+from __future__ import annotations
+import argparse
+import mmap
+import os
+import struct
+from array import array
+from typing import Iterator, List, Optional, Sequence, Tuple
+from src.constants import BOARD_SIZE, EMPTY, HUMAN, AI_PLAYER
+
+MAGIC = b"GMKR"
+VERSION = 1
+FILE_HEADER = struct.Struct("<4sB")
+RECORD_HEADER = struct.Struct("<BBBBQH")
+SEGMENT_BYTES = 64 * 1024 * 1024
+SEGMENT_PATTERN = "games-{:05d}.gmk"
+HUMAN_CODE = 0
+MAX_THINK_MS = 0xFFFF
+
+
+class GameRecord:
+    __slots__ = ("board_size", "players", "result", "seed", "cells", "think_ms")
+
+    def __init__(self, board_size: int, players: Tuple[int, int], result: int, seed: int, cells: bytes,
+                 think_ms: Sequence[int]):
+        self.board_size = board_size
+        self.players = players
+        self.result = result
+        self.seed = seed
+        self.cells = cells
+        self.think_ms = think_ms
+
+    def __len__(self) -> int:
+        return len(self.cells)
+
+    def moves(self) -> List[Tuple[int, int, int]]:
+        return [(*divmod(cell, self.board_size), HUMAN if i % 2 == 0 else AI_PLAYER)
+                for i, cell in enumerate(self.cells)]
+
+    @classmethod
+    def from_moves(cls, moves: Sequence[Tuple[int, int, int]], result: int, players: Tuple[int, int],
+                   seed: int = 0, think_ms: Optional[Sequence[float]] = None,
+                   board_size: int = BOARD_SIZE) -> GameRecord:
+        for i, (_, _, player) in enumerate(moves):
+            if player != (HUMAN if i % 2 == 0 else AI_PLAYER):
+                raise ValueError("moves must alternate, starting with the first player")
+        cells = bytes(r * board_size + c for r, c, _ in moves)
+        times = [min(int(ms), MAX_THINK_MS) for ms in think_ms] if think_ms is not None else [0] * len(moves)
+        return cls(board_size, players, result, seed, cells, times)
+
+    def encode(self) -> bytes:
+        if self.board_size * self.board_size > 256:
+            raise ValueError("one byte per move only covers boards up to 16x16")
+        header = RECORD_HEADER.pack(self.board_size, self.players[0], self.players[1], self.result,
+                                    self.seed, len(self.cells))
+        return header + self.cells + array("H", self.think_ms).tobytes()
+
+
+class RecordWriter:
+    def __init__(self, directory: str, segment_bytes: int = SEGMENT_BYTES):
+        self.directory = directory
+        self.segment_bytes = segment_bytes
+        os.makedirs(directory, exist_ok=True)
+        segments = list_segments(directory)
+        self._index = len(segments) - 1 if segments else 0
+        self._file = None
+
+    def _open(self) -> None:
+        path = os.path.join(self.directory, SEGMENT_PATTERN.format(self._index))
+        self._file = open(path, "ab")
+        if self._file.tell() == 0:
+            self._file.write(FILE_HEADER.pack(MAGIC, VERSION))
+
+    def append(self, record: GameRecord) -> None:
+        data = record.encode()
+        if self._file is None:
+            self._open()
+        if self._file.tell() > FILE_HEADER.size and self._file.tell() + len(data) > self.segment_bytes:
+            self._file.close()
+            self._index += 1
+            self._open()
+        self._file.write(data)
+        self._file.flush()
+
+    def close(self) -> None:
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def __enter__(self) -> RecordWriter:
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+def list_segments(directory: str) -> List[str]:
+    return sorted(os.path.join(directory, name) for name in os.listdir(directory)
+                  if name.startswith("games-") and name.endswith(".gmk"))
+
+
+def read_segment(path: str) -> Iterator[GameRecord]:
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size <= FILE_HEADER.size:
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            magic, version = FILE_HEADER.unpack_from(data, 0)
+            if magic != MAGIC or version != VERSION:
+                raise ValueError(f"{path}: not a game record segment")
+            offset = FILE_HEADER.size
+            end = len(data)
+            while offset + RECORD_HEADER.size <= end:
+                board_size, first, second, result, seed, count = RECORD_HEADER.unpack_from(data, offset)
+                start = offset + RECORD_HEADER.size
+                offset = start + 3 * count
+                if offset > end:
+                    break
+                think_ms = array("H")
+                think_ms.frombytes(data[start + count:offset])
+                yield GameRecord(board_size, (first, second), result, seed, data[start:start + count], think_ms)
+
+
+def read_records(path: str) -> Iterator[GameRecord]:
+    paths = list_segments(path) if os.path.isdir(path) else [path]
+    for segment in paths:
+        yield from read_segment(segment)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Summarise binary game records")
+    parser.add_argument("path", help="segment file or directory of segments")
+    args = parser.parse_args()
+
+    games = moves = think = 0
+    results = {EMPTY: 0, HUMAN: 0, AI_PLAYER: 0}
+    for record in read_records(args.path):
+        games += 1
+        moves += len(record)
+        think += sum(record.think_ms)
+        results[record.result] = results.get(record.result, 0) + 1
+    print(f"games      {games}")
+    print(f"results    first {results[HUMAN]}, second {results[AI_PLAYER]}, draw {results[EMPTY]}")
+    print(f"moves      {moves} ({moves / games if games else 0.0:.1f} per game)")
+    print(f"think      {think / moves if moves else 0.0:.1f} ms per move")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,118 +1,335 @@
 from __future__ import annotations
 import pygame
+from collections import OrderedDict
+from functools import cached_property
 from pygame import Surface, Rect
-from typing import Optional, Tuple
+from typing import Optional, Tuple, List, Dict, Any
 from src.constants import *
 from src.board import Board
 
+TEXT_CACHE_SIZE = 256
+MIN_WINDOW_WIDTH = 420
+WIN_COLOR = (255, 255, 0)
+
+
+def window_size(board_size: int = BOARD_SIZE) -> Tuple[int, int]:
+    span = min(board_size or VIEWPORT_CELLS, VIEWPORT_CELLS) * CELL_SIZE
+    return max(span + GRID_OFFSET_X * 2, MIN_WINDOW_WIDTH), span + GRID_OFFSET_Y + UI_PANEL_HEIGHT
+
 
 class Renderer:
-    def __init__(self):
-        pygame.init()
-        pygame.display.set_caption("Пять в ряд")
-        self.screen = pygame.display.set_mode((WINDOW_WIDTH, WINDOW_HEIGHT))
-        self.font_status = pygame.font.SysFont("Arial", FONT_SIZE_STATUS)
-        self.font_btn = pygame.font.SysFont("Arial", FONT_SIZE_BTN)
-        self.clock = pygame.time.Clock()
-        self.current_style = STYLES[VisualStyle.CLASSIC]
+    def __init__(self, board_size: int = BOARD_SIZE):
+        self.board_size = board_size
+        self.cells = min(board_size or VIEWPORT_CELLS, VIEWPORT_CELLS)
+        start = (board_size - self.cells) // 2 if board_size else -(self.cells // 2)
+        self.origin = (start, start)
+        self.width, self.height = window_size(board_size)
+        span = self.cells * CELL_SIZE
+        self.panel_rect = Rect(0, GRID_OFFSET_Y + span + 10, self.width, self.height - GRID_OFFSET_Y - span - 10)
+        self.menu_button_rect = Rect(self.width // 2 - 70, GRID_OFFSET_Y + span + 70, 140, 40)
+        self.screen: Optional[Surface] = None
+        self.clock: Optional[pygame.time.Clock] = None
+        self.style = VisualStyle.CLASSIC
+        self.current_style = STYLES[self.style]
+        self._backgrounds: Dict[VisualStyle, Surface] = {}
+        self._sprites: Dict[Tuple[VisualStyle, int], Surface] = {}
+        self._overlays: Dict[int, Surface] = {}
+        self._texts: OrderedDict = OrderedDict()
+        self._board: Optional[Board] = None
+        self._hovered: Optional[Tuple[int, int]] = None
+        self._panel: Optional[Tuple] = None
+        self._overlay: Optional[Tuple[str, Dict[str, Any]]] = None
+        self._shown_cells = [EMPTY] * (self.cells * self.cells)
+        self._shown_marks: Dict[int, Tuple[bool, bool, bool]] = {}
+        self._shown_panel: Optional[Tuple] = None
+        self._shown_overlay: Optional[Tuple] = None
+        self._full = True
+
+    def open(self) -> None:
+        if self.screen is None:
+            pygame.display.init()
+            pygame.display.set_caption("Пять в ряд")
+            self.screen = pygame.display.set_mode((self.width, self.height))
+            self.clock = pygame.time.Clock()
+
+    @staticmethod
+    def _font(size: int) -> pygame.font.Font:
+        if not pygame.font.get_init():
+            pygame.font.init()
+        return pygame.font.SysFont("Arial", size)
+
+    @cached_property
+    def font_status(self) -> pygame.font.Font:
+        return self._font(FONT_SIZE_STATUS)
+
+    @cached_property
+    def font_btn(self) -> pygame.font.Font:
+        return self._font(FONT_SIZE_BTN)
+
+    @cached_property
+    def font_detail(self) -> pygame.font.Font:
+        return self._font(FONT_SIZE_DETAIL)
 
     def set_style(self, style: VisualStyle):
-        self.current_style = STYLES[style]
+        if style != self.style:
+            self.style = style
+            self.current_style = STYLES[style]
+            self._full = True
+
+    def pan(self, rows: int, cols: int) -> None:
+        row, col = self.origin[0] + rows, self.origin[1] + cols
+        if self.board_size:
+            limit = self.board_size - self.cells
+            row, col = min(max(row, 0), limit), min(max(col, 0), limit)
+        if (row, col) != self.origin:
+            self.origin = (row, col)
+            self._full = True
+
+    def reveal(self, row: int, col: int) -> None:
+        last = self.cells - 1
+        r0, c0 = self.origin
+        self.pan(min(row - r0, 0) + max(row - r0 - last, 0), min(col - c0, 0) + max(col - c0 - last, 0))
+
+    def cell_at(self, pos: Tuple[int, int]) -> Optional[Tuple[int, int]]:
+        col, row = (pos[0] - GRID_OFFSET_X) // CELL_SIZE, (pos[1] - GRID_OFFSET_Y) // CELL_SIZE
+        if 0 <= row < self.cells and 0 <= col < self.cells:
+            return self.origin[0] + row, self.origin[1] + col
+        return None
+
+    def _cell_rect(self, idx: int) -> Rect:
+        r, c = divmod(idx, self.cells)
+        return Rect(GRID_OFFSET_X + c * CELL_SIZE, GRID_OFFSET_Y + r * CELL_SIZE, CELL_SIZE, CELL_SIZE)
+
+    def _view_index(self, row: int, col: int) -> Optional[int]:
+        row, col = row - self.origin[0], col - self.origin[1]
+        if 0 <= row < self.cells and 0 <= col < self.cells:
+            return row * self.cells + col
+        return None
+
+    def _view(self, board: Board) -> List[int]:
+        n = self.cells
+        r0, c0 = self.origin
+        if board.size is None:
+            view = [EMPTY] * (n * n)
+            for (r, c), player in board.stones_at.items():
+                if 0 <= r - r0 < n and 0 <= c - c0 < n:
+                    view[(r - r0) * n + c - c0] = player
+            return view
+        if board.size == n:
+            return board.cells
+        return board.grid[r0:r0 + n, c0:c0 + n].ravel().tolist()
+
+    def _background(self) -> Surface:
+        surface = self._backgrounds.get(self.style)
+        if surface is None:
+            span = self.cells * CELL_SIZE
+            surface = Surface((self.width, self.height)).convert()
+            surface.fill(self.current_style["COLOR_BG"])
+            for i in range(self.cells + 1):
+                pygame.draw.line(surface, self.current_style["COLOR_GRID"],
+                                 (GRID_OFFSET_X + i * CELL_SIZE, GRID_OFFSET_Y),
+                                 (GRID_OFFSET_X + i * CELL_SIZE, GRID_OFFSET_Y + span), 2)
+                pygame.draw.line(surface, self.current_style["COLOR_GRID"],
+                                 (GRID_OFFSET_X, GRID_OFFSET_Y + i * CELL_SIZE),
+                                 (GRID_OFFSET_X + span, GRID_OFFSET_Y + i * CELL_SIZE), 2)
+            self._backgrounds[self.style] = surface
+        return surface
+
+    def _sprite(self, player: int) -> Surface:
+        key = (self.style, player)
+        surface = self._sprites.get(key)
+        if surface is None:
+            surface = Surface((CELL_SIZE, CELL_SIZE), pygame.SRCALPHA).convert_alpha()
+            surface.fill((0, 0, 0, 0))
+            if player == EMPTY:
+                surface.fill(self.current_style["COLOR_HOVER"])
+            else:
+                color = self.current_style["COLOR_HUMAN" if player == HUMAN else "COLOR_AI"]
+                pygame.draw.circle(surface, color, (CELL_SIZE // 2, CELL_SIZE // 2), CELL_SIZE // 2 - 4)
+            self._sprites[key] = surface
+        return surface
+
+    def _overlay_surface(self, alpha: int) -> Surface:
+        surface = self._overlays.get(alpha)
+        if surface is None:
+            surface = Surface((self.width, self.height), pygame.SRCALPHA).convert_alpha()
+            surface.fill((0, 0, 0, alpha))
+            self._overlays[alpha] = surface
+        return surface
+
+    def _text(self, text: str, font: pygame.font.Font, color: Tuple[int, int, int]) -> Surface:
+        key = (text, font, color)
+        surface = self._texts.get(key)
+        if surface is None:
+            surface = self._texts[key] = font.render(text, True, color)
+            if len(self._texts) > TEXT_CACHE_SIZE:
+                self._texts.popitem(last=False)
+        else:
+            self._texts.move_to_end(key)
+        return surface
 
     def draw_board(self, board: Board, hovered: Optional[Tuple[int, int]]) -> None:
-        self.screen.fill(self.current_style["COLOR_BG"])
-        for i in range(BOARD_SIZE + 1):
-            pygame.draw.line(self.screen, self.current_style["COLOR_GRID"],
-                             (GRID_OFFSET_X + i * CELL_SIZE, GRID_OFFSET_Y),
-                             (GRID_OFFSET_X + i * CELL_SIZE, GRID_OFFSET_Y + BOARD_SIZE * CELL_SIZE), 2)
-            pygame.draw.line(self.screen, self.current_style["COLOR_GRID"],
-                             (GRID_OFFSET_X, GRID_OFFSET_Y + i * CELL_SIZE),
-                             (GRID_OFFSET_X + BOARD_SIZE * CELL_SIZE, GRID_OFFSET_Y + i * CELL_SIZE), 2)
-        for r in range(BOARD_SIZE):
-            for c in range(BOARD_SIZE):
-                x = GRID_OFFSET_X + c * CELL_SIZE + CELL_SIZE // 2
-                y = GRID_OFFSET_Y + r * CELL_SIZE + CELL_SIZE // 2
-                if board.grid[r, c] == HUMAN:
-                    pygame.draw.circle(self.screen, self.current_style["COLOR_HUMAN"], (x, y), CELL_SIZE // 2 - 4)
-                elif board.grid[r, c] == AI_PLAYER:
-                    pygame.draw.circle(self.screen, self.current_style["COLOR_AI"], (x, y), CELL_SIZE // 2 - 4)
-        if board.last_move:
-            lr, lc, _ = board.last_move
-            lx = GRID_OFFSET_X + lc * CELL_SIZE + CELL_SIZE // 2
-            ly = GRID_OFFSET_Y + lr * CELL_SIZE + CELL_SIZE // 2
-            pygame.draw.circle(self.screen, self.current_style["COLOR_LAST_MOVE"], (lx, ly), CELL_SIZE // 2 - 2, 3)
+        self._board = board
+        self._hovered = hovered
+
+    def draw_menu(self, menu_state):
+        self._overlay = ("menu", menu_state)
+
+    def draw_settings(self, settings_state):
+        self._overlay = ("settings", settings_state)
+
+    def draw_ui(self, status_text: str, difficulty: Difficulty, mouse_pos: Tuple[int, int], game_over: bool,
+                detail_text: str = "", playing: Optional[Difficulty] = None) -> None:
+        label = difficulty.name if playing in (None, difficulty) else f"{difficulty.name} → {playing.name}"
+        self._panel = (status_text, detail_text, label, self.menu_button_rect.collidepoint(mouse_pos))
+
+    def _marks(self, board: Board) -> Dict[int, Tuple[bool, bool, bool]]:
+        marks = {}
+        if board.last_move and (idx := self._view_index(*board.last_move[:2])) is not None:
+            marks[idx] = (True, False, False)
         if board.win_line:
             for r, c in board.win_line:
-                x = GRID_OFFSET_X + c * CELL_SIZE + CELL_SIZE // 2
-                y = GRID_OFFSET_Y + r * CELL_SIZE + CELL_SIZE // 2
-                pygame.draw.circle(self.screen, (255, 255, 0), (x, y), CELL_SIZE // 2 - 1, 3)
-        if hovered and board.grid[hovered[0], hovered[1]] == EMPTY:
-            hr, hc = hovered
-            hx = GRID_OFFSET_X + hc * CELL_SIZE
-            hy = GRID_OFFSET_Y + hr * CELL_SIZE
-            hover_surf = Surface((CELL_SIZE, CELL_SIZE), pygame.SRCALPHA)
-            hover_surf.fill(self.current_style["COLOR_HOVER"])
-            self.screen.blit(hover_surf, (hx, hy))
+                if (idx := self._view_index(r, c)) is not None:
+                    marks[idx] = (marks.get(idx, (False,))[0], True, False)
+        if self._hovered and board.get(*self._hovered) == EMPTY:
+            if (idx := self._view_index(*self._hovered)) is not None:
+                last, win = marks.get(idx, (False, False, False))[:2]
+                marks[idx] = (last, win, True)
+        return marks
 
-    def draw_menu(self, menu_state):
-        overlay = Surface((WINDOW_WIDTH, WINDOW_HEIGHT), pygame.SRCALPHA)
-        overlay.fill((0, 0, 0, 180))
-        self.screen.blit(overlay, (0, 0))
-        title = self.font_status.render("ПЯТЬ В РЯД", True, (255, 255, 255))
-        self.screen.blit(title, (WINDOW_WIDTH // 2 - title.get_width() // 2, 80))
-        buttons = menu_state["buttons"]
-        for btn in buttons.values():
-            rect = pygame.Rect(btn["pos"][0], btn["pos"][1], 220, 50)
+    def _paint_cell(self, idx: int, player: int, mark: Tuple[bool, bool, bool]) -> Rect:
+        rect = self._cell_rect(idx)
+        self.screen.blit(self._background(), rect, rect)
+        if player != EMPTY:
+            self.screen.blit(self._sprite(player), rect)
+        last, win, hover = mark
+        if last:
+            pygame.draw.circle(self.screen, self.current_style["COLOR_LAST_MOVE"], rect.center, CELL_SIZE // 2 - 2, 3)
+        if win:
+            pygame.draw.circle(self.screen, WIN_COLOR, rect.center, CELL_SIZE // 2 - 1, 3)
+        if hover:
+            self.screen.blit(self._sprite(EMPTY), rect)
+        return rect
+
+    def _paint_board(self, view: List[int], marks: Dict[int, Tuple[bool, bool, bool]]) -> None:
+        self.screen.blit(self._background(), (0, 0))
+        none = (False, False, False)
+        for idx, player in enumerate(view):
+            if player != EMPTY or idx in marks:
+                self._paint_cell(idx, player, marks.get(idx, none))
+
+    def _update_board(self, view: List[int], marks: Dict[int, Tuple[bool, bool, bool]]) -> List[Rect]:
+        shown = self._shown_cells
+        changed = set()
+        if view != shown:
+            changed.update(idx for idx, (old, new) in enumerate(zip(shown, view)) if old != new)
+        if marks != self._shown_marks:
+            changed.update(idx for idx in marks.keys() | self._shown_marks.keys()
+                           if marks.get(idx) != self._shown_marks.get(idx))
+        none = (False, False, False)
+        return [self._paint_cell(idx, view[idx], marks.get(idx, none)) for idx in changed]
+
+    def _paint_panel(self, panel: Tuple) -> Rect:
+        status_text, detail_text, label, hover = panel
+        self.screen.blit(self._background(), self.panel_rect, self.panel_rect)
+        y_base = GRID_OFFSET_Y + self.cells * CELL_SIZE + 20
+        status_surf = self._text(status_text, self.font_status, (30, 30, 30))
+        self.screen.blit(status_surf, (GRID_OFFSET_X, y_base))
+        if detail_text:
+            detail_surf = self._text(detail_text, self.font_detail, (90, 90, 90))
+            self.screen.blit(detail_surf, (GRID_OFFSET_X, y_base + status_surf.get_height()))
+        diff_surf = self._text(f"Сложность: {label}", self.font_status, (50, 50, 100))
+        self.screen.blit(diff_surf, (self.width - diff_surf.get_width() - GRID_OFFSET_X, y_base))
+        btn_rect = self.menu_button_rect
+        pygame.draw.rect(self.screen, (80, 120, 200), btn_rect, border_radius=6)
+        pygame.draw.rect(self.screen, (255, 255, 255), btn_rect, 2, border_radius=6)
+        btn_text = self._text("МЕНЮ", self.font_btn, (255, 255, 255))
+        self.screen.blit(btn_text,
+                         (btn_rect.centerx - btn_text.get_width() // 2, btn_rect.centery - btn_text.get_height() // 2))
+        if hover:
+            pygame.draw.rect(self.screen, (255, 255, 255, 80), btn_rect, 3, border_radius=6)
+        return self.panel_rect
+
+    def _button(self, rect: Rect, color: Tuple[int, int, int], text: str, radius: int) -> None:
+        pygame.draw.rect(self.screen, color, rect, border_radius=radius)
+        pygame.draw.rect(self.screen, (255, 255, 255), rect, 2, border_radius=radius)
+        label = self._text(text, self.font_btn, (255, 255, 255))
+        self.screen.blit(label, (rect.centerx - label.get_width() // 2, rect.centery - label.get_height() // 2))
+
+    def _paint_menu(self, menu_state) -> None:
+        self.screen.blit(self._overlay_surface(180), (0, 0))
+        title = self._text("ПЯТЬ В РЯД", self.font_status, (255, 255, 255))
+        self.screen.blit(title, (self.width // 2 - title.get_width() // 2, 80))
+        for btn in menu_state["buttons"].values():
             color = (100, 100, 200) if btn.get("hover", False) else (70, 70, 160)
-            pygame.draw.rect(self.screen, color, rect, border_radius=8)
-            pygame.draw.rect(self.screen, (255, 255, 255), rect, 2, border_radius=8)
-            text = self.font_btn.render(btn["text"], True, (255, 255, 255))
-            self.screen.blit(text, (rect.centerx - text.get_width() // 2, rect.centery - text.get_height() // 2))
+            self._button(Rect(btn["pos"][0], btn["pos"][1], 220, 50), color, btn["text"], 8)
 
-    def draw_settings(self, settings_state):
-        overlay = Surface((WINDOW_WIDTH, WINDOW_HEIGHT), pygame.SRCALPHA)
-        overlay.fill((0, 0, 0, 200))
-        self.screen.blit(overlay, (0, 0))
-        title = self.font_status.render("НАСТРОЙКИ", True, (255, 255, 255))
-        self.screen.blit(title, (WINDOW_WIDTH // 2 - title.get_width() // 2, 60))
+    def _paint_settings(self, settings_state) -> None:
+        self.screen.blit(self._overlay_surface(200), (0, 0))
+        title = self._text("НАСТРОЙКИ", self.font_status, (255, 255, 255))
+        self.screen.blit(title, (self.width // 2 - title.get_width() // 2, 60))
         for section in ["difficulty", "visual"]:
             for key, btn in settings_state[section].items():
-                rect = pygame.Rect(btn["pos"][0], btn["pos"][1], 180, 42)
-                is_active = btn.get("active", False)
-                color = (90, 180, 90) if is_active else (80, 80, 150)
+                color = (90, 180, 90) if btn.get("active", False) else (80, 80, 150)
                 if btn.get("hover", False):
                     color = tuple(min(c + 30, 255) for c in color)
-                pygame.draw.rect(self.screen, color, rect, border_radius=6)
-                pygame.draw.rect(self.screen, (255, 255, 255), rect, 2, border_radius=6)
-                text = self.font_btn.render(btn["text"], True, (255, 255, 255))
-                self.screen.blit(text, (rect.centerx - text.get_width() // 2, rect.centery - text.get_height() // 2))
+                self._button(Rect(btn["pos"][0], btn["pos"][1], 180, 42), color, btn["text"], 6)
         back_btn = settings_state["back_button"]
-        back_rect = pygame.Rect(back_btn["pos"][0], back_btn["pos"][1], 120, 40)
         back_color = (180, 80, 80) if back_btn.get("hover", False) else (150, 60, 60)
-        pygame.draw.rect(self.screen, back_color, back_rect, border_radius=6)
-        pygame.draw.rect(self.screen, (255, 255, 255), back_rect, 2, border_radius=6)
-        text = self.font_btn.render(back_btn["text"], True, (255, 255, 255))
-        self.screen.blit(text, (back_rect.centerx - text.get_width() // 2, back_rect.centery - text.get_height() // 2))
-
-    def draw_ui(self, status_text: str, difficulty: Difficulty, mouse_pos: Tuple[int, int], game_over: bool) -> None:
-        y_base = GRID_OFFSET_Y + BOARD_SIZE * CELL_SIZE + 20
-        status_surf = self.font_status.render(status_text, True, (30, 30, 30))
-        self.screen.blit(status_surf, (GRID_OFFSET_X, y_base))
-        diff_text = f"Сложность: {difficulty.name}"
-        diff_surf = self.font_status.render(diff_text, True, (50, 50, 100))
-        self.screen.blit(diff_surf, (WINDOW_WIDTH - diff_surf.get_width() - GRID_OFFSET_X, y_base))
-        btn_rect = pygame.Rect(WINDOW_WIDTH // 2 - 70, y_base + 50, 140, 40)
-        pygame.draw.rect(self.screen, (80, 120, 200), btn_rect, border_radius=6)
-        pygame.draw.rect(self.screen, (255, 255, 255), btn_rect, 2, border_radius=6)
-        btn_text = self.font_btn.render("МЕНЮ", True, (255, 255, 255))
-        self.screen.blit(btn_text,
-                         (btn_rect.centerx - btn_text.get_width() // 2, btn_rect.centery - btn_text.get_height() // 2))
-        if btn_rect.collidepoint(mouse_pos):
-            pygame.draw.rect(self.screen, (255, 255, 255, 80), btn_rect, 3, border_radius=6)
+        self._button(Rect(back_btn["pos"][0], back_btn["pos"][1], 120, 40), back_color, back_btn["text"], 6)
+
+    @staticmethod
+    def _overlay_key(overlay: Optional[Tuple[str, Dict[str, Any]]]) -> Optional[Tuple]:
+        if overlay is None:
+            return None
+        kind, state = overlay
+        if kind == "menu":
+            buttons = state["buttons"].values()
+        else:
+            buttons = [*state["difficulty"].values(), *state["visual"].values(), state["back_button"]]
+        return (kind, *((btn["text"], btn["pos"], btn.get("hover", False), btn.get("active", False))
+                        for btn in buttons))
 
-    def update(self):
-        pygame.display.flip()
+    def update(self) -> bool:
+        board = self._board
+        view = self._view(board) if board is not None else None
+        marks = self._marks(board) if board is not None else {}
+        overlay = self._overlay_key(self._overlay)
+        full = self._full or overlay != self._shown_overlay
+        if not full and overlay is not None:
+            full = view is not None and (view != self._shown_cells or marks != self._shown_marks)
+        dirty: List[Rect] = []
+        if full:
+            if view is not None:
+                self._paint_board(view, marks)
+            else:
+                self.screen.blit(self._background(), (0, 0))
+            if self._overlay is not None:
+                kind, state = self._overlay
+                if kind == "menu":
+                    self._paint_menu(state)
+                else:
+                    self._paint_settings(state)
+            elif self._panel is not None:
+                self._paint_panel(self._panel)
+        else:
+            if view is not None:
+                dirty = self._update_board(view, marks)
+            if self._panel is not None and self._panel != self._shown_panel:
+                dirty.append(self._paint_panel(self._panel))
+        if view is not None:
+            self._shown_cells[:] = view
+        self._shown_marks = marks
+        self._shown_panel = self._panel if overlay is None else None
+        self._shown_overlay = overlay
+        self._overlay = self._panel = None
+        self._full = False
+        if full:
+            pygame.display.flip()
+        elif dirty:
+            pygame.display.update(dirty)
         self.clock.tick(60)
+        return full or bool(dirty)
 
     def close(self):
         pygame.quit()
@@ -0,0 +1,218 @@
+from __future__ import annotations
+import random
+import threading
+import time
+from typing import Tuple, Optional, List
+from src.constants import BOARD_SIZE, EMPTY, HUMAN, AI_PLAYER
+from src.bitboard import BitBoard
+from src.evaluation import pattern_score, evaluate, FIVE_SCORE
+from src.transposition import TranspositionTable, EXACT, LOWER, UPPER
+
+WIN_SCORE = 100000000
+INFINITY = WIN_SCORE + 1
+
+_side_rng = random.Random(0x51DE)
+SIDE_TO_MOVE = {HUMAN: _side_rng.getrandbits(64), AI_PLAYER: _side_rng.getrandbits(64)}
+
+
+def _to_tt(score: int, ply: int) -> int:
+    if score >= WIN_SCORE - AlphaBetaSearch.MAX_PLY:
+        return score + ply
+    if score <= -WIN_SCORE + AlphaBetaSearch.MAX_PLY:
+        return score - ply
+    return score
+
+
+def _from_tt(score: int, ply: int) -> int:
+    if score >= WIN_SCORE - AlphaBetaSearch.MAX_PLY:
+        return score - ply
+    if score <= -WIN_SCORE + AlphaBetaSearch.MAX_PLY:
+        return score + ply
+    return score
+
+
+class SearchTimeout(Exception):
+    pass
+
+
+def is_mate(score: int) -> bool:
+    return abs(score) >= WIN_SCORE - AlphaBetaSearch.MAX_PLY
+
+
+class AlphaBetaSearch:
+    MAX_PLY = 64
+    CHECK_INTERVAL = 256
+
+    def __init__(self, max_depth: int = 12, beam_width: int = 12, tt: Optional[TranspositionTable] = None,
+                 stop: Optional[threading.Event] = None):
+        self.max_depth = max_depth
+        self.beam_width = beam_width
+        self.tt = tt if tt is not None else TranspositionTable()
+        self.stop = stop
+        self.killers = [[None, None] for _ in range(self.MAX_PLY)]
+        self.history = {HUMAN: [0] * (BOARD_SIZE * BOARD_SIZE), AI_PLAYER: [0] * (BOARD_SIZE * BOARD_SIZE)}
+        self.nodes = 0
+        self.completed_depth = 0
+        self.best_score = 0
+        self.iterations: List[Tuple[int, int, int]] = []
+        self._deadline = 0.0
+
+    def clear(self) -> None:
+        self.tt.clear()
+
+    def search(self, board: BitBoard, player: int, budget_ms: int, moves: Optional[List[int]] = None,
+               start_depth: int = 1) -> Optional[Tuple[int, int]]:
+        opponent = HUMAN if player == AI_PLAYER else AI_PLAYER
+        self._deadline = time.perf_counter() + budget_ms / 1000
+        self.nodes = 0
+        self.completed_depth = 0
+        self.best_score = 0
+        self.iterations = []
+        self.tt.new_search()
+        self.killers = [[None, None] for _ in range(self.MAX_PLY)]
+        for table in self.history.values():
+            for i in range(len(table)):
+                table[i] >>= 2
+
+        moves = self._ordered_moves(board, player, opponent, 0, root=True) if moves is None else list(moves)
+        if not moves:
+            return None
+        best_move = moves[0]
+        for depth in range(min(start_depth, self.max_depth), self.max_depth + 1):
+            try:
+                score, move = self._search_root(board, player, opponent, depth, moves)
+            except SearchTimeout:
+                break
+            best_move = move
+            self.best_score = score
+            self.completed_depth = depth
+            self.iterations.append((depth, move, score))
+            moves.remove(move)
+            moves.insert(0, move)
+            if is_mate(score):
+                break
+        return divmod(best_move, BOARD_SIZE)
+
+    def _search_root(self, board: BitBoard, player: int, opponent: int, depth: int,
+                     moves: List[int]) -> Tuple[int, int]:
+        alpha = -INFINITY
+        best_move = moves[0]
+        for idx in moves:
+            score = self._probe(board, idx, player, opponent, depth, alpha, INFINITY, 0)
+            if score > alpha:
+                alpha = score
+                best_move = idx
+        return alpha, best_move
+
+    def _probe(self, board: BitBoard, idx: int, player: int, opponent: int, depth: int,
+               alpha: int, beta: int, ply: int) -> int:
+        r, c = divmod(idx, BOARD_SIZE)
+        board.make_move(r, c, player)
+        try:
+            if board.check_win(player):
+                return WIN_SCORE - ply
+            if board.is_full():
+                return 0
+            return -self._negamax(board, opponent, player, depth - 1, -beta, -alpha, ply + 1)
+        finally:
+            board.undo_move(r, c)
+
+    def _negamax(self, board: BitBoard, player: int, opponent: int, depth: int,
+                 alpha: int, beta: int, ply: int) -> int:
+        self.nodes += 1
+        if self.nodes % self.CHECK_INTERVAL == 0 and (time.perf_counter() > self._deadline
+                                                      or self.stop is not None and self.stop.is_set()):
+            raise SearchTimeout()
+        if depth <= 0:
+            return evaluate(board, player, opponent)
+
+        key = board.hash ^ SIDE_TO_MOVE[player]
+        tt_move = None
+        entry = self.tt.probe(key)
+        if entry is not None:
+            tt_depth, flag, tt_score, tt_move = entry
+            if tt_depth >= depth:
+                tt_score = _from_tt(tt_score, ply)
+                if flag == EXACT:
+                    return tt_score
+                if flag == LOWER:
+                    alpha = max(alpha, tt_score)
+                elif flag == UPPER:
+                    beta = min(beta, tt_score)
+                if alpha >= beta:
+                    return tt_score
+
+        original_alpha = alpha
+        best = -INFINITY
+        best_move = None
+        for idx in self._ordered_moves(board, player, opponent, ply, tt_move=tt_move):
+            score = self._probe(board, idx, player, opponent, depth, alpha, beta, ply)
+            if score > best:
+                best = score
+                best_move = idx
+            if score > alpha:
+                alpha = score
+            if alpha >= beta:
+                killers = self.killers[ply]
+                if killers[0] != idx:
+                    killers[1] = killers[0]
+                    killers[0] = idx
+                self.history[player][idx] += depth * depth
+                break
+
+        if best <= original_alpha:
+            flag = UPPER
+        elif best >= beta:
+            flag = LOWER
+        else:
+            flag = EXACT
+        self.tt.store(key, depth, flag, _to_tt(best, ply), best_move)
+        return best
+
+    def principal_variation(self, board: BitBoard, player: int, move: int) -> List[int]:
+        line = []
+        opponent = HUMAN if player == AI_PLAYER else AI_PLAYER
+        while move is not None and len(line) < self.MAX_PLY and board.cells[move] == EMPTY:
+            board.make_move(*divmod(move, BOARD_SIZE), player)
+            line.append(move)
+            if board.check_win(player):
+                break
+            entry = self.tt.probe(board.hash ^ SIDE_TO_MOVE[opponent])
+            move = entry[3] if entry is not None else None
+            player, opponent = opponent, player
+        for idx in reversed(line):
+            board.undo_move(*divmod(idx, BOARD_SIZE))
+        return line
+
+    def root_moves(self, board: BitBoard, player: int) -> List[int]:
+        opponent = HUMAN if player == AI_PLAYER else AI_PLAYER
+        return self._ordered_moves(board, player, opponent, 0, root=True)
+
+    def _ordered_moves(self, board: BitBoard, player: int, opponent: int, ply: int,
+                       root: bool = False, tt_move: Optional[int] = None) -> List[int]:
+        wins = board.five_cells[player]
+        if wins:
+            return [min(wins)]
+        threats = board.five_cells[opponent]
+        if threats:
+            return sorted(threats)
+        killers = self.killers[ply]
+        history = self.history[player]
+        scored = []
+        for r, c in board.get_near_empty_cells():
+            idx = r * BOARD_SIZE + c
+            attack = pattern_score(board, r, c, player)
+            defence = pattern_score(board, r, c, opponent)
+            if idx == tt_move:
+                bonus = 2 * FIVE_SCORE
+            elif idx == killers[0]:
+                bonus = 5000
+            elif idx == killers[1]:
+                bonus = 4000
+            else:
+                bonus = 0
+            scored.append((attack + defence + bonus, history[idx], idx))
+        scored.sort(reverse=True)
+        if not root:
+            scored = scored[:self.beam_width]
+        return [idx for _, _, idx in scored]
@@ -0,0 +1,408 @@
+from __future__ import annotations
+import argparse
+import asyncio
+import itertools
+import json
+import math
+import multiprocessing
+import os
+import random
+import threading
+import time
+from collections import deque
+from concurrent.futures import BrokenExecutor, ProcessPoolExecutor
+from typing import Any, Dict, List, Optional, Set, Tuple
+from src.constants import BOARD_SIZE, INFINITE_BOARD, HUMAN, AI_PLAYER, Difficulty
+from src.board import Board
+from src.bitboard import BitBoard
+from src.sparse import SparseBoard
+from src.players import AIPlayer, MediumStrategy
+
+MAX_LINE = 64 * 1024
+MAX_DENSE_SIZE = 64
+STOP_MARGIN = 0.05
+RESULTS = {HUMAN: "human", AI_PLAYER: "ai"}
+
+_players: Dict[int, AIPlayer] = {}
+
+
+class ProtocolError(Exception):
+    pass
+
+
+def new_board(size: int, fast: bool = False):
+    if size == INFINITE_BOARD:
+        return SparseBoard()
+    if fast and size == BOARD_SIZE:
+        return BitBoard()
+    return Board(size)
+
+
+def _init_worker() -> None:
+    random.seed(os.getpid() ^ time.time_ns())
+
+
+def _ai_move(job: Tuple[int, int, List[Tuple[int, int, int]], float]) -> Tuple[Optional[Tuple[int, int]], float, int]:
+    difficulty, size, moves, deadline = job
+    board = new_board(size, fast=True)
+    for row, col, player in moves:
+        board.make_move(row, col, player)
+    ai = _players.get(difficulty)
+    if ai is None:
+        ai = _players[difficulty] = AIPlayer(AI_PLAYER, Difficulty(difficulty))
+    stop = threading.Event()
+    timer = threading.Timer(deadline - time.time(), stop.set)
+    timer.start()
+    start = time.perf_counter()
+    try:
+        move = ai.get_move(board, stop)
+    finally:
+        timer.cancel()
+    return move, (time.perf_counter() - start) * 1000, int(ai.playing_difficulty(board))
+
+
+def percentile(samples: List[float], p: float) -> float:
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    return ordered[max(0, math.ceil(p / 100 * len(ordered)) - 1)]
+
+
+class Session:
+    __slots__ = ("id", "board", "difficulty", "size", "moves", "result", "busy")
+
+    def __init__(self, session_id: int, difficulty: Difficulty, size: int):
+        self.id = session_id
+        self.board = new_board(size)
+        self.difficulty = difficulty
+        self.size = size
+        self.moves: List[Tuple[int, int, int]] = []
+        self.result: Optional[str] = None
+        self.busy = False
+
+
+class ServerMetrics:
+    RATE_WINDOW = 10.0
+
+    def __init__(self, samples: int = 4096):
+        self.started = time.perf_counter()
+        self.games_started = 0
+        self.games_finished = 0
+        self.ai_moves = 0
+        self.timeouts = 0
+        self.failures = 0
+        self.rejected = 0
+        self.latency_ms: deque = deque(maxlen=samples)
+        self.think_ms: deque = deque(maxlen=samples)
+        self._finished_at: deque = deque(maxlen=samples)
+
+    def game_finished(self) -> None:
+        self.games_finished += 1
+        self._finished_at.append(time.perf_counter())
+
+    def move(self, latency_ms: float, think_ms: float) -> None:
+        self.ai_moves += 1
+        self.latency_ms.append(latency_ms)
+        self.think_ms.append(think_ms)
+
+    def snapshot(self, sessions: int, pending: int) -> Dict[str, Any]:
+        now = time.perf_counter()
+        uptime = now - self.started
+        recent = sum(1 for t in self._finished_at if now - t <= self.RATE_WINDOW)
+        latency, think = list(self.latency_ms), list(self.think_ms)
+        return {
+            "uptime_s": uptime,
+            "sessions": sessions,
+            "pending_moves": pending,
+            "games_started": self.games_started,
+            "games_finished": self.games_finished,
+            "games_per_second": self.games_finished / uptime if uptime else 0.0,
+            "recent_games_per_second": recent / min(uptime, self.RATE_WINDOW) if uptime else 0.0,
+            "ai_moves": self.ai_moves,
+            "timeouts": self.timeouts,
+            "failures": self.failures,
+            "rejected": self.rejected,
+            "move_latency_ms": {"p50": percentile(latency, 50), "p95": percentile(latency, 95),
+                                "p99": percentile(latency, 99)},
+            "think_ms": {"p50": percentile(think, 50), "p95": percentile(think, 95), "p99": percentile(think, 99)},
+        }
+
+
+class GameServer:
+    def __init__(self, workers: int = 0, max_sessions: int = 10000, max_queue: int = 1024,
+                 move_timeout: float = 5.0, idle_timeout: float = 300.0, max_inflight: int = 16):
+        self.workers = workers or os.cpu_count() or 1
+        self.max_sessions = max_sessions
+        self.max_queue = max_queue
+        self.move_timeout = move_timeout
+        self.idle_timeout = idle_timeout
+        self.max_inflight = max_inflight
+        self.sessions: Dict[int, Session] = {}
+        self.metrics = ServerMetrics()
+        self._ids = itertools.count(1)
+        self._pool = self._new_pool()
+        self._slots = asyncio.Semaphore(self.workers * 2)
+        self._waiting = 0
+        self._running = 0
+        self._fallback = MediumStrategy()
+        self._servers: List[asyncio.AbstractServer] = []
+        self._clients: Dict[asyncio.Task, asyncio.StreamWriter] = {}
+
+    def _new_pool(self) -> ProcessPoolExecutor:
+        return ProcessPoolExecutor(self.workers, mp_context=multiprocessing.get_context("spawn"),
+                                   initializer=_init_worker)
+
+    async def start_tcp(self, host: str, port: int) -> asyncio.AbstractServer:
+        server = await asyncio.start_server(self.handle, host, port, limit=MAX_LINE)
+        self._servers.append(server)
+        return server
+
+    async def start_unix(self, path: str) -> asyncio.AbstractServer:
+        server = await asyncio.start_unix_server(self.handle, path, limit=MAX_LINE)
+        self._servers.append(server)
+        return server
+
+    async def close(self) -> None:
+        for server in self._servers:
+            server.close()
+        for writer in self._clients.values():
+            writer.close()
+        await asyncio.gather(*self._clients, return_exceptions=True)
+        for server in self._servers:
+            await server.wait_closed()
+        self._pool.shutdown(wait=True, cancel_futures=True)
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        owned: Set[int] = set()
+        inflight = asyncio.Semaphore(self.max_inflight)
+        tasks: Set[asyncio.Task] = set()
+        handler = asyncio.current_task()
+        self._clients[handler] = writer
+        try:
+            while True:
+                try:
+                    line = await asyncio.wait_for(reader.readline(), self.idle_timeout)
+                except (asyncio.TimeoutError, ValueError, ConnectionError):
+                    break
+                if not line:
+                    break
+                await inflight.acquire()
+                task = asyncio.create_task(self._respond(line, owned, writer, inflight))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+            if tasks:
+                await asyncio.gather(*tasks, return_exceptions=True)
+        finally:
+            del self._clients[handler]
+            for session_id in owned:
+                self.sessions.pop(session_id, None)
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except ConnectionError:
+                pass
+
+    async def _respond(self, line: bytes, owned: Set[int], writer: asyncio.StreamWriter,
+                       inflight: asyncio.Semaphore) -> None:
+        try:
+            writer.write(json.dumps(await self._reply(line, owned)).encode() + b"\n")
+            await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            inflight.release()
+
+    async def _reply(self, line: bytes, owned: Set[int]) -> Dict[str, Any]:
+        request: Any = None
+        try:
+            request = json.loads(line)
+            if not isinstance(request, dict):
+                raise ProtocolError("request must be a JSON object")
+            reply = await self.dispatch(request, owned)
+            reply["ok"] = True
+        except (ProtocolError, ValueError, KeyError, TypeError) as e:
+            reply = {"ok": False, "error": str(e) or type(e).__name__}
+        except Exception as e:
+            reply = {"ok": False, "error": f"internal error: {type(e).__name__}: {e}"}
+        if isinstance(request, dict) and "id" in request:
+            reply["id"] = request["id"]
+        return reply
+
+    async def dispatch(self, request: Dict[str, Any], owned: Set[int]) -> Dict[str, Any]:
+        op = request.get("op")
+        if op == "new":
+            return await self._new_game(request, owned)
+        if op == "move":
+            return await self._move(self._session(request, owned), int(request["row"]), int(request["col"]))
+        if op == "close":
+            session = self._session(request, owned)
+            owned.discard(session.id)
+            self.sessions.pop(session.id, None)
+            return {"game": session.id}
+        if op == "metrics":
+            return {"metrics": self.snapshot()}
+        raise ProtocolError(f"unknown op: {op!r}")
+
+    def snapshot(self) -> Dict[str, Any]:
+        return self.metrics.snapshot(len(self.sessions), self._waiting + self._running)
+
+    def _session(self, request: Dict[str, Any], owned: Set[int]) -> Session:
+        session_id = request["game"]
+        if session_id not in owned or session_id not in self.sessions:
+            raise ProtocolError(f"no such game: {session_id!r}")
+        return self.sessions[session_id]
+
+    async def _new_game(self, request: Dict[str, Any], owned: Set[int]) -> Dict[str, Any]:
+        if len(self.sessions) >= self.max_sessions:
+            self.metrics.rejected += 1
+            raise ProtocolError("too many sessions")
+        name = str(request.get("difficulty", "medium"))
+        if name.upper() not in Difficulty.__members__:
+            raise ProtocolError(f"unknown difficulty: {name!r}")
+        difficulty = Difficulty[name.upper()]
+        size = int(request.get("size", BOARD_SIZE))
+        if size != INFINITE_BOARD and not 5 <= size <= MAX_DENSE_SIZE:
+            raise ProtocolError(f"board size must be 0 or between 5 and {MAX_DENSE_SIZE}")
+        session = Session(next(self._ids), difficulty, size)
+        reply: Dict[str, Any] = {"game": session.id, "size": size, "difficulty": difficulty.name.lower()}
+        if request.get("first") == "ai":
+            session.busy = True
+            try:
+                reply.update(await self._ai_turn(session))
+            finally:
+                session.busy = False
+        self.sessions[session.id] = session
+        owned.add(session.id)
+        self.metrics.games_started += 1
+        return reply
+
+    async def _move(self, session: Session, row: int, col: int) -> Dict[str, Any]:
+        if session.result is not None:
+            raise ProtocolError("game is over")
+        if session.busy:
+            raise ProtocolError("waiting for the AI move")
+        if not session.board.make_move(row, col, HUMAN):
+            raise ProtocolError(f"illegal move: {row},{col}")
+        session.moves.append((row, col, HUMAN))
+        if self._finished(session, HUMAN):
+            return {"game": session.id, "move": None, "result": session.result}
+        session.busy = True
+        try:
+            return {"game": session.id, **await self._ai_turn(session)}
+        except Exception:
+            session.moves.pop()
+            session.board.undo_move(row, col)
+            raise
+        finally:
+            session.busy = False
+
+    def _finished(self, session: Session, player: int) -> bool:
+        if session.board.check_win(player):
+            session.result = RESULTS[player]
+        elif session.board.is_full():
+            session.result = "draw"
+        else:
+            return False
+        self.metrics.game_finished()
+        return True
+
+    async def _ai_turn(self, session: Session) -> Dict[str, Any]:
+        start = time.perf_counter()
+        move, think_ms, playing = await self._compute(session)
+        if move is None or not session.board.make_move(move[0], move[1], AI_PLAYER):
+            raise ProtocolError("AI produced no legal move")
+        session.moves.append((move[0], move[1], AI_PLAYER))
+        self.metrics.move((time.perf_counter() - start) * 1000, think_ms)
+        self._finished(session, AI_PLAYER)
+        return {"move": list(move), "result": session.result, "playing": Difficulty(playing).name.lower()}
+
+    async def _compute(self, session: Session) -> Tuple[Optional[Tuple[int, int]], float, int]:
+        if self._waiting >= self.max_queue:
+            self.metrics.rejected += 1
+            raise ProtocolError("server overloaded")
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.move_timeout
+        self._waiting += 1
+        try:
+            await asyncio.wait_for(self._slots.acquire(), self.move_timeout)
+        except asyncio.TimeoutError:
+            return self._timed_out(session)
+        finally:
+            self._waiting -= 1
+        self._running += 1
+        remaining = deadline - loop.time()
+        job = (int(session.difficulty), session.size, list(session.moves), time.time() + remaining - STOP_MARGIN)
+        pool = self._pool
+
+        def release(_) -> None:
+            self._running -= 1
+            self._slots.release()
+
+        try:
+            future = pool.submit(_ai_move, job)
+        except Exception as e:
+            release(None)
+            return self._failed(session, pool, e)
+        future.add_done_callback(lambda f: loop.call_soon_threadsafe(release, f))
+        try:
+            return await asyncio.wait_for(asyncio.wrap_future(future), max(remaining, 0))
+        except asyncio.TimeoutError:
+            return self._timed_out(session)
+        except Exception as e:
+            return self._failed(session, pool, e)
+
+    def _timed_out(self, session: Session) -> Tuple[Optional[Tuple[int, int]], float, int]:
+        self.metrics.timeouts += 1
+        return self._fallback_move(session)
+
+    def _failed(self, session: Session, pool: ProcessPoolExecutor,
+                error: Exception) -> Tuple[Optional[Tuple[int, int]], float, int]:
+        self.metrics.failures += 1
+        if isinstance(error, BrokenExecutor) and pool is self._pool:
+            self._pool = self._new_pool()
+            pool.shutdown(wait=False, cancel_futures=True)
+        return self._fallback_move(session)
+
+    def _fallback_move(self, session: Session) -> Tuple[Optional[Tuple[int, int]], float, int]:
+        start = time.perf_counter()
+        move = self._fallback.find_move(session.board, AI_PLAYER, HUMAN)
+        return move, (time.perf_counter() - start) * 1000, int(min(session.difficulty, Difficulty.MEDIUM))
+
+
+async def serve(args: argparse.Namespace) -> None:
+    server = GameServer(args.workers, args.max_sessions, args.max_queue, args.move_timeout, args.idle_timeout)
+    if args.unix:
+        await server.start_unix(args.unix)
+        print(f"listening on {args.unix}")
+    else:
+        listener = await server.start_tcp(args.host, args.port)
+        print(f"listening on {', '.join(str(sock.getsockname()) for sock in listener.sockets)}")
+    try:
+        while True:
+            await asyncio.sleep(args.stats_interval or 3600)
+            if args.stats_interval:
+                print(json.dumps(server.snapshot()))
+    finally:
+        await server.close()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Headless game server speaking line-delimited JSON")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=7015)
+    parser.add_argument("--unix", metavar="PATH", help="listen on a Unix socket instead of TCP")
+    parser.add_argument("--workers", type=int, default=0, help="AI process count (0 = one per CPU)")
+    parser.add_argument("--max-sessions", type=int, default=10000)
+    parser.add_argument("--max-queue", type=int, default=1024, help="AI moves allowed to wait for a worker")
+    parser.add_argument("--move-timeout", type=float, default=5.0, help="seconds before falling back to Medium")
+    parser.add_argument("--idle-timeout", type=float, default=300.0, help="seconds before idle clients are dropped")
+    parser.add_argument("--stats-interval", type=float, default=0.0, help="print metrics every N seconds")
+    args = parser.parse_args()
+    try:
+        asyncio.run(serve(args))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -1,23 +1,24 @@
 from __future__ import annotations
 import pygame
 from typing import Dict, Any
-from src.constants import WINDOW_WIDTH, WINDOW_HEIGHT, Difficulty, VisualStyle
+from src.constants import WINDOW_WIDTH, Difficulty, VisualStyle
 
 
 class Settings:
-    def __init__(self, initial_difficulty: Difficulty, initial_style: VisualStyle):
+    def __init__(self, initial_difficulty: Difficulty, initial_style: VisualStyle, width: int = WINDOW_WIDTH):
         self.state = {
             "active": False,
             "difficulty": {
-                "easy": {"text": "ЛЁГКИЙ", "pos": (WINDOW_WIDTH // 2 - 270, 150), "value": Difficulty.EASY},
-                "medium": {"text": "СРЕДНИЙ", "pos": (WINDOW_WIDTH // 2 - 90, 150), "value": Difficulty.MEDIUM},
-                "hard": {"text": "СЛОЖНЫЙ", "pos": (WINDOW_WIDTH // 2 + 90, 150), "value": Difficulty.HARD}
+                "easy": {"text": "ЛЁГКИЙ", "pos": (width // 2 - 190, 120), "value": Difficulty.EASY},
+                "medium": {"text": "СРЕДНИЙ", "pos": (width // 2 + 10, 120), "value": Difficulty.MEDIUM},
+                "hard": {"text": "СЛОЖНЫЙ", "pos": (width // 2 - 190, 172), "value": Difficulty.HARD},
+                "expert": {"text": "ЭКСПЕРТ", "pos": (width // 2 + 10, 172), "value": Difficulty.EXPERT}
             },
             "visual": {
-                "classic": {"text": "КЛАССИКА", "pos": (WINDOW_WIDTH // 2 - 190, 230), "value": VisualStyle.CLASSIC},
-                "modern": {"text": "СОВРЕМЕННЫЙ", "pos": (WINDOW_WIDTH // 2 + 10, 230), "value": VisualStyle.MODERN}
+                "classic": {"text": "КЛАССИКА", "pos": (width // 2 - 190, 250), "value": VisualStyle.CLASSIC},
+                "modern": {"text": "СОВРЕМЕННЫЙ", "pos": (width // 2 + 10, 250), "value": VisualStyle.MODERN}
             },
-            "back_button": {"text": "НАЗАД", "pos": (WINDOW_WIDTH // 2 - 60, 320)}
+            "back_button": {"text": "НАЗАД", "pos": (width // 2 - 60, 330)}
         }
         self.selected_difficulty = initial_difficulty
         self.selected_style = initial_style
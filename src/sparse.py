@@ -0,0 +1,142 @@
+from __future__ import annotations
+from typing import Dict, List, Optional, Tuple
+from src.constants import EMPTY
+from src.board import NEAR_RADIUS
+
+_MASK = (1 << 64) - 1
+_OFFSETS = tuple((dr, dc) for dr in range(-NEAR_RADIUS, NEAR_RADIUS + 1) for dc in range(-NEAR_RADIUS, NEAR_RADIUS + 1)
+                 if dr or dc)
+
+
+def _splitmix(value: int) -> int:
+    value = (value + 0x9E3779B97F4A7C15) & _MASK
+    value = ((value ^ (value >> 30)) * 0xBF58476D1CE4E5B9) & _MASK
+    value = ((value ^ (value >> 27)) * 0x94D049BB133111EB) & _MASK
+    return value ^ (value >> 31)
+
+
+def zobrist_key(row: int, col: int, player: int) -> int:
+    return _splitmix(((row & 0xFFFFFF) << 26) | ((col & 0xFFFFFF) << 2) | player)
+
+
+class SparseBoard:
+    size = None
+    move_counter: Optional[List[int]] = None
+
+    def __init__(self) -> None:
+        self.stones_at: Dict[Tuple[int, int], int] = {}
+        self.last_move = None
+        self.win_line = None
+        self.hash = 0
+        self.stones = 0
+        self._near_count: Dict[Tuple[int, int], int] = {}
+        self._frontier_order: Optional[List[Tuple[int, int]]] = None
+
+    def make_move(self, row: int, col: int, player: int) -> bool:
+        cell = (row, col)
+        if cell in self.stones_at:
+            return False
+        if self.move_counter is not None:
+            self.move_counter[0] += 1
+        self.stones_at[cell] = player
+        self.hash ^= zobrist_key(row, col, player)
+        self.stones += 1
+        counts = self._near_count
+        for dr, dc in _OFFSETS:
+            near = (row + dr, col + dc)
+            counts[near] = counts.get(near, 0) + 1
+        self._frontier_order = None
+        self.last_move = (row, col, player)
+        return True
+
+    def undo_move(self, row: int, col: int) -> None:
+        cell = (row, col)
+        player = self.stones_at.pop(cell, EMPTY)
+        if player == EMPTY:
+            return
+        if self.move_counter is not None:
+            self.move_counter[1] += 1
+        self.hash ^= zobrist_key(row, col, player)
+        self.stones -= 1
+        counts = self._near_count
+        for dr, dc in _OFFSETS:
+            near = (row + dr, col + dc)
+            if counts[near] == 1:
+                del counts[near]
+            else:
+                counts[near] -= 1
+        self._frontier_order = None
+        self.win_line = None
+
+    def copy(self) -> SparseBoard:
+        board = SparseBoard()
+        board.stones_at = dict(self.stones_at)
+        board.hash = self.hash
+        board.stones = self.stones
+        board._near_count = dict(self._near_count)
+        board.last_move = self.last_move
+        board.move_counter = self.move_counter
+        return board
+
+    def is_full(self) -> bool:
+        return False
+
+    def check_win(self, player: int) -> bool:
+        if self.last_move is None:
+            return False
+        r, c, last_player = self.last_move
+        if last_player != player:
+            return False
+        stones = self.stones_at
+        self.win_line = [(r, c)]
+        for dr, dc in ((0, 1), (1, 0), (1, 1), (1, -1)):
+            line = [(r, c)]
+            for sign in (1, -1):
+                nr, nc = r + dr * sign, c + dc * sign
+                while stones.get((nr, nc)) == player:
+                    line.append((nr, nc))
+                    nr += dr * sign
+                    nc += dc * sign
+            if len(line) >= 5:
+                self.win_line = line
+                return True
+        self.win_line = None
+        return False
+
+    def get_empty_cells(self) -> List[Tuple[int, int]]:
+        return self.get_near_empty_cells()
+
+    def get_near_empty_cells(self) -> List[Tuple[int, int]]:
+        if self._frontier_order is None:
+            stones = self.stones_at
+            self._frontier_order = sorted(cell for cell in self._near_count if cell not in stones)
+        return self._frontier_order if self._frontier_order else [(0, 0)]
+
+    def winning_cells(self, player: int) -> List[Tuple[int, int]]:
+        cells = []
+        last_move = self.last_move
+        order = self.get_near_empty_cells()
+        for r, c in order:
+            if self.make_move(r, c, player):
+                if self.check_win(player):
+                    cells.append((r, c))
+                self.undo_move(r, c)
+        self.last_move = last_move
+        self._frontier_order = order if self.stones else None
+        return cells
+
+    def get(self, row: int, col: int) -> int:
+        return self.stones_at.get((row, col), EMPTY)
+
+    def near_count(self, row: int, col: int) -> int:
+        return self._near_count.get((row, col), 0)
+
+    def bounds(self) -> Optional[Tuple[int, int, int, int]]:
+        if not self.stones_at:
+            return None
+        rows = [r for r, _ in self.stones_at]
+        cols = [c for _, c in self.stones_at]
+        return min(rows), min(cols), max(rows), max(cols)
+
+    def get_hash(self) -> int:
+        return self.hash
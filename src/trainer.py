@@ -0,0 +1,163 @@
+from __future__ import annotations
+import argparse
+import heapq
+import json
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from itertools import islice
+from typing import Any, Dict, Iterable, Iterator, List, Tuple
+from src.constants import HUMAN, AI_PLAYER, AI_LEARNING_MAX_ENTRIES
+from src.players import HardStrategy
+from src.learning import SQLiteStore
+from src.arena import STRATEGIES, play_game
+from src.records import read_records
+
+GameRecord = Tuple[List[Tuple[int, int, int]], int]
+TABLES = {AI_PLAYER: "good_moves", HUMAN: "bad_moves"}
+
+
+def empty_partial() -> Dict[str, Any]:
+    return {"games": 0, "tables": {name: {} for name in TABLES.values()},
+            "visits": {name: {} for name in TABLES.values()}}
+
+
+def accumulate(partial: Dict[str, Any], moves: List[Tuple[int, int, int]], winner: int) -> None:
+    partial["games"] += 1
+    if winner not in TABLES:
+        return
+    table = partial["tables"][TABLES[winner]]
+    visits = partial["visits"][TABLES[winner]]
+    for key, changes in HardStrategy.game_deltas(moves, winner).items():
+        moves_table = table.setdefault(key, {})
+        for move_key, delta in changes.items():
+            moves_table[move_key] = moves_table.get(move_key, 0) + delta
+        visits[key] = visits.get(key, 0) + 1
+
+
+def merge(into: Dict[str, Any], partial: Dict[str, Any]) -> Dict[str, Any]:
+    into["games"] += partial["games"]
+    for name, table in partial["tables"].items():
+        target = into["tables"][name]
+        visits = into["visits"][name]
+        for key, changes in table.items():
+            moves = target.get(key)
+            if moves is None:
+                target[key] = changes
+            else:
+                for move_key, delta in changes.items():
+                    moves[move_key] = moves.get(move_key, 0) + delta
+        for key, count in partial["visits"][name].items():
+            visits[key] = visits.get(key, 0) + count
+    return into
+
+
+def replay_batch(batch: List[GameRecord]) -> Dict[str, Any]:
+    partial = empty_partial()
+    for moves, winner in batch:
+        accumulate(partial, moves, winner)
+    return partial
+
+
+def self_play_batch(job: Tuple[str, str, List[int]]) -> Dict[str, Any]:
+    first, second, seeds = job
+    partial = empty_partial()
+    for seed in seeds:
+        result = play_game((first, second, seed, seed % 2 == 1))
+        accumulate(partial, result["moves"], result["result"])
+    return partial
+
+
+def read_games(path: str) -> Iterator[GameRecord]:
+    with open(path, "r") as f:
+        for line in f:
+            if line.strip():
+                record = json.loads(line)
+                yield [tuple(move) for move in record["moves"]], record["winner"]
+
+
+def batched(items: Iterable, size: int) -> Iterator[List]:
+    iterator = iter(items)
+    while batch := list(islice(iterator, size)):
+        yield batch
+
+
+def reduce_partials(function, jobs: Iterable, workers: int) -> Dict[str, Any]:
+    total = empty_partial()
+    if workers == 1:
+        for job in jobs:
+            merge(total, function(job))
+        return total
+    workers = workers or os.cpu_count() or 1
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = set()
+        for job in jobs:
+            if len(pending) >= 2 * workers:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    merge(total, future.result())
+            pending.add(pool.submit(function, job))
+        for future in wait(pending).done:
+            merge(total, future.result())
+    return total
+
+
+def write_tables(total: Dict[str, Any], db_path: str, max_entries: int) -> Dict[str, int]:
+    written = {}
+    for name, table in total["tables"].items():
+        if max_entries and len(table) > max_entries:
+            visits = total["visits"][name]
+            table = {key: table[key] for key in heapq.nlargest(max_entries, table, key=visits.__getitem__)}
+        store = SQLiteStore(db_path, name, max_entries)
+        try:
+            store.update(table)
+        finally:
+            store.close()
+        written[name] = len(table)
+    return written
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Offline trainer for the Hard strategy's learned positions")
+    parser.add_argument("--games-file", action="append", default=[],
+                        help="recorded games, one JSON object per line: {\"moves\": [[r, c, player], ...], "
+                             "\"winner\": player}")
+    parser.add_argument("--records", action="append", default=[],
+                        help="binary game-record segment or directory of segments")
+    parser.add_argument("--self-play", nargs=2, metavar=("FIRST", "SECOND"), choices=sorted(STRATEGIES))
+    parser.add_argument("--games", type=int, default=1000, help="number of self-play games")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--batch-size", type=int, default=500)
+    parser.add_argument("--workers", type=int, default=0, help="process count (0 = one per CPU, 1 = in-process)")
+    parser.add_argument("--db", default=HardStrategy.LEARNING_DB)
+    parser.add_argument("--max-entries", type=int, default=AI_LEARNING_MAX_ENTRIES,
+                        help="positions kept per table, most visited first (0 = unbounded)")
+    args = parser.parse_args()
+    if not args.games_file and not args.records and not args.self_play:
+        parser.error("nothing to train on: pass --games-file, --records and/or --self-play")
+
+    start = time.perf_counter()
+    total = empty_partial()
+    for path in args.games_file:
+        merge(total, reduce_partials(replay_batch, batched(read_games(path), args.batch_size), args.workers))
+    for path in args.records:
+        games = ((record.moves(), record.result) for record in read_records(path))
+        merge(total, reduce_partials(replay_batch, batched(games, args.batch_size), args.workers))
+    if args.self_play:
+        first, second = args.self_play
+        seeds = range(args.seed, args.seed + args.games)
+        jobs = ((first, second, batch) for batch in batched(seeds, args.batch_size))
+        merge(total, reduce_partials(self_play_batch, jobs, args.workers))
+    played = time.perf_counter() - start
+
+    os.makedirs(os.path.dirname(args.db) or ".", exist_ok=True)
+    written = write_tables(total, args.db, args.max_entries)
+    elapsed = time.perf_counter() - start
+    print(f"games      {total['games']} ({total['games'] / played if played else 0.0:.1f} games/s)")
+    for name, count in written.items():
+        print(f"{name:<10} {count} positions written ({len(total['tables'][name])} seen)")
+    print(f"elapsed    {elapsed:.1f} s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+from __future__ import annotations
+from typing import Optional, Tuple, Dict
+
+EXACT, LOWER, UPPER = 1, 2, 3
+
+ENTRY_BYTES = 16
+_SCORE_OFFSET = 1 << 31
+_MASK_32 = (1 << 32) - 1
+_MASK_16 = (1 << 16) - 1
+
+
+def _pack(depth: int, flag: int, score: int, move: Optional[int], generation: int) -> int:
+    move_code = 0 if move is None else move + 1
+    return ((score + _SCORE_OFFSET) | move_code << 32 | depth << 48 | flag << 56 | generation << 58)
+
+
+class TranspositionTable:
+    def __init__(self, size_mb: float = 32, buffer=None):
+        self.buckets = self.buffer_size(size_mb) // (2 * ENTRY_BYTES)
+        if buffer is None:
+            buffer = bytearray(self.buckets * 2 * ENTRY_BYTES)
+        self._buffer = buffer
+        self._words = memoryview(buffer).cast('B').cast('Q')[:self.buckets * 4]
+        self.generation = 0
+        self.probes = 0
+        self.hits = 0
+        self.collisions = 0
+        self.stores = 0
+        self.replacements = 0
+
+    @staticmethod
+    def buffer_size(size_mb: float) -> int:
+        entries = max(2, int(size_mb * 1024 * 1024) // ENTRY_BYTES)
+        return entries // 2 * 2 * ENTRY_BYTES
+
+    @property
+    def size_bytes(self) -> int:
+        return self.buckets * 2 * ENTRY_BYTES
+
+    def new_search(self) -> None:
+        self.generation = (self.generation + 1) & 0x3F
+
+    def clear(self) -> None:
+        self._words[:] = memoryview(bytes(self.size_bytes)).cast('Q')
+        self.generation = 0
+        self.probes = self.hits = self.collisions = self.stores = self.replacements = 0
+
+    def probe(self, key: int) -> Optional[Tuple[int, int, int, Optional[int]]]:
+        self.probes += 1
+        words = self._words
+        base = (key % self.buckets) << 2
+        occupied = False
+        for slot in (base, base + 2):
+            data = words[slot + 1]
+            if not data:
+                continue
+            if words[slot] ^ data == key:
+                self.hits += 1
+                move_code = data >> 32 & _MASK_16
+                return (data >> 48 & 0xFF, data >> 56 & 0x3, (data & _MASK_32) - _SCORE_OFFSET,
+                        move_code - 1 if move_code else None)
+            occupied = True
+        if occupied:
+            self.collisions += 1
+        return None
+
+    def store(self, key: int, depth: int, flag: int, score: int, move: Optional[int]) -> None:
+        self.stores += 1
+        words = self._words
+        base = (key % self.buckets) << 2
+        data = _pack(depth, flag, score, move, self.generation)
+        old = words[base + 1]
+        if (not old or words[base] ^ old == key or depth >= (old >> 48 & 0xFF)
+                or (old >> 58) != self.generation):
+            slot = base
+        else:
+            slot = base + 2
+            old = words[slot + 1]
+        if old and words[slot] ^ old != key:
+            self.replacements += 1
+        words[slot] = key ^ data
+        words[slot + 1] = data
+
+    def stats(self) -> Dict[str, float]:
+        return {
+            "size_mb": self.size_bytes / (1024 * 1024),
+            "probes": self.probes,
+            "hits": self.hits,
+            "hit_rate": self.hits / self.probes if self.probes else 0.0,
+            "collisions": self.collisions,
+            "stores": self.stores,
+            "replacements": self.replacements,
+        }
@@ -0,0 +1,214 @@
+from __future__ import annotations
+import argparse
+import threading
+import time
+from typing import Tuple, Optional, List, Set, Dict
+from src.constants import BOARD_SIZE, EMPTY, HUMAN, AI_PLAYER
+from src.board import Board
+from src.bitboard import BitBoard, CELL_LINES, LINE_CELLS, LINE_SPANS, completion_mask, line_threats, three_mask
+
+SYMBOLS = {".": EMPTY, "X": HUMAN, "O": AI_PLAYER}
+
+
+class SolverLimit(Exception):
+    pass
+
+
+class ThreatSolver:
+    CHECK_INTERVAL = 64
+
+    def __init__(self, max_nodes: int = 20000, time_ms: int = 200, max_depth: int = 12,
+                 stop: Optional[threading.Event] = None):
+        self.max_nodes = max_nodes
+        self.time_ms = time_ms
+        self.max_depth = max_depth
+        self.stop = stop
+        self.nodes = 0
+        self.aborted = False
+        self._deadline = 0.0
+        self._failed: Dict[int, int] = {}
+
+    def solve_vcf(self, board: Board, player: int) -> Optional[List[Tuple[int, int]]]:
+        return self._solve(board, player, threes=False)
+
+    def solve_vct(self, board: Board, player: int) -> Optional[List[Tuple[int, int]]]:
+        return self._solve(board, player, threes=True)
+
+    def _solve(self, board: Board, player: int, threes: bool) -> Optional[List[Tuple[int, int]]]:
+        board = board if isinstance(board, BitBoard) else BitBoard.from_board(board)
+        opponent = HUMAN if player == AI_PLAYER else AI_PLAYER
+        self.nodes = 0
+        self.aborted = False
+        self._failed = {}
+        self._deadline = time.perf_counter() + self.time_ms / 1000
+        try:
+            line = self._attack(board, player, opponent, self.max_depth, threes)
+        except SolverLimit:
+            self.aborted = True
+            return None
+        return [divmod(idx, BOARD_SIZE) for idx in line] if line is not None else None
+
+    def _attack(self, board: BitBoard, player: int, opponent: int, depth: int,
+                threes: bool) -> Optional[List[int]]:
+        self.nodes += 1
+        if self.nodes > self.max_nodes:
+            raise SolverLimit()
+        if self.nodes % self.CHECK_INTERVAL == 0 and (time.perf_counter() > self._deadline
+                                                      or self.stop is not None and self.stop.is_set()):
+            raise SolverLimit()
+
+        fives = board.five_cells[player]
+        if fives:
+            return [min(fives)]
+        their_fives = board.five_cells[opponent]
+        if len(their_fives) > 1:
+            return None
+        fours, straight_fours, three_moves = self._scan(board, player, opponent, threes)
+        if straight_fours and not their_fives:
+            return [min(straight_fours)]
+        if depth <= 0:
+            return None
+        key = board.hash
+        if self._failed.get(key, -1) >= depth:
+            return None
+
+        candidates = sorted(fours) + sorted(three_moves - fours)
+        if their_fives:
+            candidates = [idx for idx in candidates if idx in their_fives]
+        their_fours = threes and bool(self._scan(board, opponent, player, False)[0])
+
+        for move in candidates:
+            r, c = divmod(move, BOARD_SIZE)
+            board.make_move(r, c, player)
+            try:
+                gains = self._gains(board, move, player, opponent)
+                if len(gains) > 1:
+                    return [move]
+                if gains:
+                    line = self._defend(board, gains, player, opponent, depth, threes)
+                elif not their_fours:
+                    line = self._defend(board, self._defences(board, move, player, opponent),
+                                        player, opponent, depth, threes)
+                else:
+                    line = None
+            finally:
+                board.undo_move(r, c)
+            if line is not None:
+                return [move] + line
+        self._failed[key] = depth
+        return None
+
+    def _defend(self, board: BitBoard, defences: List[int], player: int, opponent: int, depth: int,
+                threes: bool) -> Optional[List[int]]:
+        if not defences:
+            return None
+        principal = None
+        for reply in defences:
+            r, c = divmod(reply, BOARD_SIZE)
+            board.make_move(r, c, opponent)
+            try:
+                if board.check_win(opponent):
+                    return None
+                line = self._attack(board, player, opponent, depth - 1, threes)
+            finally:
+                board.undo_move(r, c)
+            if line is None:
+                return None
+            if principal is None:
+                principal = [reply] + line
+        return principal
+
+    def _scan(self, board: BitBoard, player: int, opponent: int,
+              threes: bool) -> Tuple[Set[int], Set[int], Set[int]]:
+        mine_lines = board.lines[player]
+        their_lines = board.lines[opponent]
+        fours, straight_fours, three_moves = set(), set(), set()
+        for lid, (lo, hi) in enumerate(LINE_SPANS):
+            mine = mine_lines[lid] >> lo
+            if not mine:
+                continue
+            theirs = their_lines[lid] >> lo
+            length = hi - lo + 1
+            _, four_bits, straight_bits = line_threats(mine, theirs, length)
+            three_bits = three_mask(mine, theirs, length) if threes else 0
+            cells = LINE_CELLS[lid]
+            for bits, target in ((four_bits, fours),
+                                 (straight_bits, straight_fours), (three_bits, three_moves)):
+                while bits:
+                    bit = bits & -bits
+                    bits ^= bit
+                    target.add(cells[lo + bit.bit_length() - 1])
+        return fours, straight_fours, three_moves
+
+    def _gains(self, board: BitBoard, idx: int, player: int, opponent: int) -> List[int]:
+        gains = set()
+        for lid, _, _ in CELL_LINES[idx]:
+            lo, hi = LINE_SPANS[lid]
+            bits = completion_mask(board.lines[player][lid] >> lo, board.lines[opponent][lid] >> lo, hi - lo + 1)
+            while bits:
+                bit = bits & -bits
+                bits ^= bit
+                gains.add(LINE_CELLS[lid][lo + bit.bit_length() - 1])
+        return sorted(gains)
+
+    def _defences(self, board: BitBoard, idx: int, player: int, opponent: int) -> List[int]:
+        defences = []
+        candidates = {LINE_CELLS[lid][pos] for lid, _, _ in CELL_LINES[idx]
+                      for pos in range(LINE_SPANS[lid][0], LINE_SPANS[lid][1] + 1)}
+        for cell in sorted(candidates):
+            if board.cells[cell] != EMPTY:
+                continue
+            r, c = divmod(cell, BOARD_SIZE)
+            board.make_move(r, c, opponent)
+            if not self._straight_threat(board, idx, player, opponent):
+                defences.append(cell)
+            board.undo_move(r, c)
+        return defences
+
+    def _straight_threat(self, board: BitBoard, idx: int, player: int, opponent: int) -> bool:
+        for lid, _, _ in CELL_LINES[idx]:
+            lo, hi = LINE_SPANS[lid]
+            if line_threats(board.lines[player][lid] >> lo, board.lines[opponent][lid] >> lo, hi - lo + 1)[2]:
+                return True
+        return False
+
+
+def parse_position(text: str) -> BitBoard:
+    board = BitBoard()
+    rows = [line.split() if " " in line.strip() else list(line.strip())
+            for line in text.strip().splitlines() if line.strip()]
+    for r, row in enumerate(rows[:BOARD_SIZE]):
+        for c, symbol in enumerate(row[:BOARD_SIZE]):
+            player = SYMBOLS.get(symbol.upper(), EMPTY)
+            if player != EMPTY:
+                board.make_move(r, c, player)
+    return board
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="VCF / threat-space puzzle solver")
+    parser.add_argument("position", help="text file with 15 rows of '.', 'X' (human) and 'O' (computer)")
+    parser.add_argument("--player", choices=("X", "O"), default="X")
+    parser.add_argument("--vct", action="store_true", help="also allow open-three threats")
+    parser.add_argument("--nodes", type=int, default=200000)
+    parser.add_argument("--time-ms", type=int, default=10000)
+    args = parser.parse_args()
+
+    with open(args.position, "r") as f:
+        board = parse_position(f.read())
+    player = SYMBOLS[args.player]
+    solver = ThreatSolver(max_nodes=args.nodes, time_ms=args.time_ms, max_depth=BOARD_SIZE * BOARD_SIZE)
+    start = time.perf_counter()
+    line = solver.solve_vct(board, player) if args.vct else solver.solve_vcf(board, player)
+    elapsed = (time.perf_counter() - start) * 1000
+    if line is not None:
+        print("win:", " ".join(f"{r},{c}" for r, c in line))
+    elif solver.aborted:
+        print("unknown: search limit reached")
+    else:
+        print("no forced win")
+    print(f"{solver.nodes} nodes, {elapsed:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
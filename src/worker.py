@@ -0,0 +1,54 @@
+from __future__ import annotations
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Optional, Tuple, Dict
+from src.board import Board
+from src.players import AIPlayer
+
+
+class MoveWorker:
+    def __init__(self):
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="ai-move")
+        self._future: Optional[Future] = None
+        self._stop: Optional[threading.Event] = None
+        self._ai: Optional[AIPlayer] = None
+        self._started = 0.0
+
+    @property
+    def busy(self) -> bool:
+        return self._future is not None
+
+    @property
+    def elapsed(self) -> float:
+        return time.perf_counter() - self._started if self.busy else 0.0
+
+    def start(self, ai: AIPlayer, board: Board) -> None:
+        self.cancel()
+        self._ai = ai
+        self._stop = threading.Event()
+        self._started = time.perf_counter()
+        self._future = self._executor.submit(ai.get_move, board.copy(), self._stop)
+
+    def done(self) -> bool:
+        return self._future is not None and self._future.done()
+
+    def result(self) -> Optional[Tuple[int, int]]:
+        future = self._future
+        self._future = self._ai = self._stop = None
+        return future.result() if future is not None else None
+
+    def progress(self) -> Dict[str, int]:
+        ai = self._ai
+        return ai.strategy.progress() if ai is not None else {}
+
+    def cancel(self) -> None:
+        if self._future is None:
+            return
+        self._stop.set()
+        self._future.cancel()
+        self._future = self._ai = self._stop = None
+
+    def shutdown(self) -> None:
+        self.cancel()
+        self._executor.shutdown(wait=True)
@@ -0,0 +1,56 @@
+import random
+import pytest
+from src.constants import BOARD_SIZE, HUMAN, AI_PLAYER
+from src.board import Board, TRANSFORMS, transform_cell
+from src.book import OpeningBook, SCORE_LIMIT, write_book, load_book
+
+STONES = [(7, 7, HUMAN), (6, 8, AI_PLAYER), (8, 8, HUMAN), (5, 9, AI_PLAYER)]
+BOOK_MOVE = (9, 9)
+
+
+def _board(stones, transform=0):
+    board = Board()
+    for row, col, player in stones:
+        board.make_move(*transform_cell(transform, row, col), player)
+    return board
+
+
+@pytest.fixture
+def book(tmp_path):
+    key, transform = _board(STONES).canonical_key()
+    path = str(tmp_path / "book.bin")
+    write_book(path, {key: (TRANSFORMS[transform][BOOK_MOVE[0] * BOARD_SIZE + BOOK_MOVE[1]], 12)})
+    book = OpeningBook(path)
+    yield book
+    book.close()
+
+
+@pytest.mark.parametrize("transform", range(8))
+def test_lookup_maps_the_book_move_onto_every_symmetric_position(book, transform):
+    assert book.lookup(_board(STONES, transform)) == transform_cell(transform, *BOOK_MOVE)
+
+
+def test_lookup_misses_unknown_positions_and_occupied_book_moves(book):
+    assert book.lookup(_board(STONES[:3])) is None
+    assert book.lookup(_board(STONES + [(*BOOK_MOVE, HUMAN)])) is None
+
+
+def test_probe_finds_every_written_key_and_no_others(tmp_path):
+    rng = random.Random(3)
+    entries = {rng.getrandbits(64): (rng.randrange(BOARD_SIZE * BOARD_SIZE), rng.randrange(-40000, 40000))
+               for _ in range(1000)}
+    path = str(tmp_path / "book.bin")
+    write_book(path, entries)
+    book = OpeningBook(path)
+    assert len(book) == len(entries)
+    for key, (cell, score) in entries.items():
+        assert book.probe(key) == (cell, max(-SCORE_LIMIT, min(SCORE_LIMIT, score)))
+    assert book.probe(0) is None and book.probe((1 << 64) - 1) is None
+    book.close()
+
+
+def test_load_book_returns_none_for_missing_or_foreign_files(tmp_path):
+    assert load_book(str(tmp_path / "missing.bin")) is None
+    foreign = tmp_path / "foreign.bin"
+    foreign.write_bytes(b"GMKR" + bytes(60))
+    assert load_book(str(foreign)) is None
@@ -0,0 +1,155 @@
+import hashlib
+import json
+import os
+import random
+import sqlite3
+import pytest
+from src.constants import HUMAN, AI_PLAYER
+from src.board import Board
+from src.learning import MemoryStore, SQLiteStore, LRU, LFU, SCHEMA_VERSION, _KEY_OFFSET
+from src.players import HardStrategy
+
+KEYS = [0x0123456789ABCDEF, 0xFEDCBA9876543210]
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def make_store(request, tmp_path):
+    stores = []
+
+    def make(max_entries=0, max_bytes=0, policy=LRU):
+        if request.param == "memory":
+            store = MemoryStore(max_entries, max_bytes, policy)
+        else:
+            store = SQLiteStore(str(tmp_path / "learning.db"), "good_moves", max_entries, max_bytes, policy)
+        stores.append(store)
+        return store
+
+    yield make
+    for store in stores:
+        store.close()
+
+
+def test_sqlite_store_persists_updates_across_reopen(tmp_path):
+    path = str(tmp_path / "learning.db")
+    store = SQLiteStore(path, "good_moves")
+    store.update({KEYS[0]: {"7,7": 10}, KEYS[1]: {"3,4": -10}})
+    store.update({KEYS[0]: {"7,7": 10, "7,8": 10}})
+    store.close()
+    store = SQLiteStore(path, "good_moves")
+    assert store.get(KEYS[0]) == {"7,7": 20, "7,8": 10}
+    assert store.get(KEYS[1]) == {"3,4": -10}
+    assert store.get(0) == {}
+    assert len(store) == 2 and store.hits == 2 and store.misses == 1
+    store.close()
+
+
+def test_sqlite_store_upgrades_a_version_zero_table(tmp_path):
+    path = str(tmp_path / "learning.db")
+    conn = sqlite3.connect(path)
+    with conn:
+        conn.execute("CREATE TABLE good_moves (key INTEGER PRIMARY KEY, moves TEXT NOT NULL)")
+        conn.executemany("INSERT INTO good_moves (key, moves) VALUES (?, ?)",
+                         [(key - _KEY_OFFSET, '{"7,7": 10}') for key in KEYS])
+    conn.close()
+    store = SQLiteStore(path, "good_moves")
+    assert store.has_legacy and len(store) == 0
+    assert store.legacy_keys() == {f"{key:016x}" for key in KEYS}
+    store.update({KEYS[0]: {"7,8": 10}})
+    store.close()
+    conn = sqlite3.connect(path)
+    assert conn.execute("SELECT version FROM learning_schema WHERE name = 'good_moves'").fetchone() == (SCHEMA_VERSION,)
+    assert conn.execute("SELECT visits, used FROM good_moves").fetchall() == [(1, 1)]
+    conn.close()
+
+
+def test_sqlite_store_imports_json_into_the_legacy_table(tmp_path):
+    source = tmp_path / "good_moves.json"
+    source.write_text('{"ABCDEF": {"7,7": 10}}')
+    store = SQLiteStore(str(tmp_path / "learning.db"), "good_moves")
+    assert store.import_json(str(source)) == 1
+    assert store.legacy_keys() == {"abcdef"}
+    assert not source.exists() and (tmp_path / "good_moves.json.bak").exists()
+    store.close()
+
+
+def test_lru_eviction_drops_the_least_recently_used_position(make_store):
+    store = make_store(max_entries=3, policy=LRU)
+    for key in (1, 2, 3):
+        store.update({key: {"7,7": 10}})
+    store.get(1)
+    store.update({4: {"7,7": 10}})
+    assert [key for key in (1, 2, 3, 4) if store.get(key)] == [1, 3, 4]
+    assert store.evicted_entries == 1 and len(store) == 3
+
+
+def test_lfu_eviction_drops_the_least_visited_position(make_store):
+    store = make_store(max_entries=3, policy=LFU)
+    for key in (1, 2, 3):
+        store.update({key: {"7,7": 10}})
+    store.get(1)
+    store.get(1)
+    store.get(3)
+    store.update({3: {"7,8": 10}, 4: {"7,7": 10}})
+    assert [key for key in (1, 2, 3, 4) if store.get(key)] == [1, 3, 4]
+    assert store.evicted_entries == 1
+
+
+def test_byte_budget_keeps_the_store_within_its_limit(make_store):
+    store = make_store(max_bytes=100)
+    for key in range(20):
+        store.update({key: {f"{key},{key}": 10}})
+        assert store.bytes <= 100
+    assert store.evicted_entries == 20 - len(store)
+    assert store.evicted_bytes > 0 and store.get(19)
+
+
+def _legacy_tables(games):
+    tables = {AI_PLAYER: {}, HUMAN: {}}
+    for moves, winner in games:
+        table = tables[winner]
+        bonus = 10 if winner == AI_PLAYER else -10
+        board = Board()
+        seen = set()
+        for row, col, player in moves:
+            key = hashlib.sha256(json.dumps(board.grid.tolist()).encode()).hexdigest()
+            if key in seen:
+                continue
+            seen.add(key)
+            if player == AI_PLAYER:
+                learned = table.setdefault(key, {})
+                learned[f"{row},{col}"] = learned.get(f"{row},{col}", 0) + bonus
+            board.make_move(row, col, player)
+    return tables
+
+
+def test_legacy_positions_migrate_to_canonical_keys(tmp_path, monkeypatch):
+    rng = random.Random(5)
+    games = []
+    for _ in range(40):
+        board = Board()
+        moves = []
+        player = HUMAN
+        for _ in range(rng.randrange(6, 20)):
+            row, col = rng.choice(sorted(board.get_near_empty_cells()) or [(rng.randrange(15), rng.randrange(15))])
+            board.make_move(row, col, player)
+            moves.append((row, col, player))
+            player = AI_PLAYER if player == HUMAN else HUMAN
+        games.append((moves, rng.choice((HUMAN, AI_PLAYER))))
+    monkeypatch.chdir(tmp_path)
+    os.makedirs("data")
+    tables = _legacy_tables(games)
+    for name, winner in (("good_moves", AI_PLAYER), ("bad_moves", HUMAN)):
+        with open(f"data/{name}.json", "w") as f:
+            json.dump(tables[winner], f)
+
+    hard = HardStrategy()
+    expected = {AI_PLAYER: MemoryStore(), HUMAN: MemoryStore()}
+    for moves, winner in games:
+        expected[winner].update(HardStrategy.game_deltas(moves, winner))
+    try:
+        for store, winner in ((hard.good_moves, AI_PLAYER), (hard.bad_moves, HUMAN)):
+            assert not store.has_legacy and not store.legacy_keys()
+            assert len(store) == len(expected[winner])
+            assert {key: store.get(key) for key in expected[winner].data} == expected[winner].data
+    finally:
+        hard.close()
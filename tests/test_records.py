@@ -0,0 +1,41 @@
+import random
+import pytest
+from src.constants import HUMAN, AI_PLAYER, Difficulty
+from src.records import GameRecord, RecordWriter, HUMAN_CODE, MAX_THINK_MS, list_segments, read_records
+
+
+def _game(rng, board_size):
+    cells = rng.sample(range(board_size * board_size), rng.randrange(1, board_size * board_size))
+    moves = [(*divmod(cell, board_size), HUMAN if i % 2 == 0 else AI_PLAYER) for i, cell in enumerate(cells)]
+    think_ms = [rng.uniform(0, 2 * MAX_THINK_MS) for _ in moves]
+    return GameRecord.from_moves(moves, rng.choice((HUMAN, AI_PLAYER, 0)), (HUMAN_CODE, int(Difficulty.HARD)),
+                                 rng.getrandbits(64), think_ms, board_size)
+
+
+def _fields(record):
+    return (record.board_size, tuple(record.players), record.result, record.seed, bytes(record.cells),
+            list(record.think_ms), record.moves())
+
+
+@pytest.mark.parametrize("segment_bytes", [1 << 20, 512])
+def test_records_read_back_equal_to_what_was_written(tmp_path, segment_bytes):
+    rng = random.Random(7)
+    games = [_game(rng, board_size) for board_size in (15, 16, 9, 5) * 5]
+    with RecordWriter(str(tmp_path), segment_bytes) as writer:
+        for record in games:
+            writer.append(record)
+    with RecordWriter(str(tmp_path), segment_bytes) as writer:
+        writer.append(games[0])
+    assert [_fields(record) for record in read_records(str(tmp_path))] == [_fields(r) for r in games + games[:1]]
+    assert (len(list_segments(str(tmp_path))) > 1) == (segment_bytes == 512)
+
+
+def test_think_times_are_clamped_to_the_record_field():
+    record = GameRecord.from_moves([(7, 7, HUMAN)], HUMAN, (HUMAN_CODE, HUMAN_CODE), think_ms=[1e9])
+    assert list(record.think_ms) == [MAX_THINK_MS]
+
+
+def test_records_reject_boards_larger_than_one_byte_per_move():
+    record = GameRecord.from_moves([(0, 0, HUMAN)], HUMAN, (HUMAN_CODE, HUMAN_CODE), board_size=17)
+    with pytest.raises(ValueError):
+        record.encode()
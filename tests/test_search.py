@@ -0,0 +1,101 @@
+import pytest
+from src.constants import BOARD_SIZE, HUMAN, AI_PLAYER
+from src.bitboard import BitBoard
+from src.evaluation import evaluate
+from src.search import AlphaBetaSearch, WIN_SCORE
+from src.parallel import ParallelSearch, ROOT_SPLIT, LAZY_SMP, merge_results
+
+POSITIONS = [
+    [(7, 7, HUMAN), (7, 8, AI_PLAYER), (8, 8, HUMAN)],
+    [(7, 7, HUMAN), (8, 8, AI_PLAYER), (7, 8, HUMAN), (6, 6, AI_PLAYER), (7, 9, HUMAN)],
+    [(7, 7, HUMAN), (7, 8, AI_PLAYER), (8, 7, HUMAN), (6, 7, AI_PLAYER), (8, 8, HUMAN), (9, 9, AI_PLAYER)],
+    [(3, 3, HUMAN), (3, 4, AI_PLAYER), (4, 4, HUMAN), (5, 5, HUMAN), (2, 2, AI_PLAYER)],
+    [(7, 6, AI_PLAYER), (7, 7, AI_PLAYER), (7, 8, AI_PLAYER), (6, 6, HUMAN), (8, 8, HUMAN)],
+]
+
+
+def _moves(board, player, opponent):
+    wins = board.five_cells[player]
+    if wins:
+        return [min(wins)]
+    threats = board.five_cells[opponent]
+    if threats:
+        return sorted(threats)
+    return [r * BOARD_SIZE + c for r, c in board.get_near_empty_cells()]
+
+
+def _negamax(board, player, opponent, depth, ply):
+    if depth <= 0:
+        return evaluate(board, player, opponent)
+    best = None
+    for idx in _moves(board, player, opponent):
+        r, c = divmod(idx, BOARD_SIZE)
+        board.make_move(r, c, player)
+        if board.check_win(player):
+            score = WIN_SCORE - ply
+        elif board.is_full():
+            score = 0
+        else:
+            score = -_negamax(board, opponent, player, depth - 1, ply + 1)
+        board.undo_move(r, c)
+        best = score if best is None else max(best, score)
+    return best
+
+
+def _root_scores(board, player, depth):
+    opponent = HUMAN if player == AI_PLAYER else AI_PLAYER
+    scores = {}
+    for idx in _moves(board, player, opponent):
+        r, c = divmod(idx, BOARD_SIZE)
+        board.make_move(r, c, player)
+        if board.check_win(player):
+            scores[idx] = WIN_SCORE
+        else:
+            scores[idx] = -_negamax(board, opponent, player, depth - 1, 1)
+        board.undo_move(r, c)
+    return scores
+
+
+@pytest.mark.parametrize("moves", POSITIONS)
+@pytest.mark.parametrize("depth", [2, 3])
+def test_search_matches_full_width_negamax(moves, depth):
+    board = BitBoard()
+    for row, col, player in moves:
+        board.make_move(row, col, player)
+    engine = AlphaBetaSearch(max_depth=depth, beam_width=BOARD_SIZE * BOARD_SIZE)
+    move = engine.search(board, AI_PLAYER, budget_ms=600000)
+    scores = _root_scores(board, AI_PLAYER, depth)
+    assert engine.best_score == max(scores.values())
+    assert scores[move[0] * BOARD_SIZE + move[1]] == engine.best_score
+
+
+def test_root_split_keeps_a_proven_win_from_a_shallower_worker():
+    win = {"move": 7 * BOARD_SIZE + 8, "score": WIN_SCORE - 2, "depth": 3, "nodes": 0, "pv": [],
+           "iterations": [(1, 7 * BOARD_SIZE + 8, 2400), (2, 7 * BOARD_SIZE + 8, 2400),
+                          (3, 7 * BOARD_SIZE + 8, WIN_SCORE - 2)]}
+    deeper = {"move": 8 * BOARD_SIZE + 7, "score": 2480, "depth": 4, "nodes": 0, "pv": [],
+              "iterations": [(1, 8 * BOARD_SIZE + 7, 2000), (2, 8 * BOARD_SIZE + 7, 2300),
+                             (3, 8 * BOARD_SIZE + 7, 2600), (4, 8 * BOARD_SIZE + 7, 2480)]}
+    assert merge_results([win, deeper], ROOT_SPLIT)[0] is win
+    assert merge_results([deeper, win], LAZY_SMP)[0] is win
+
+
+def test_root_split_compares_scores_at_the_common_depth():
+    shallow = {"move": 1, "score": 900, "depth": 2, "iterations": [(1, 1, 100), (2, 1, 900)]}
+    deep = {"move": 2, "score": 500, "depth": 3, "iterations": [(1, 2, 100), (2, 2, 1000), (3, 2, 500)]}
+    best, depth = merge_results([shallow, deep], ROOT_SPLIT)
+    assert best is deep and depth == 2
+
+
+def test_parallel_root_split_plays_the_forced_win():
+    board = BitBoard()
+    for row, col in ((7, 6), (7, 7), (7, 9)):
+        board.make_move(row, col, AI_PLAYER)
+    for row, col in ((3, 3), (3, 12), (11, 3)):
+        board.make_move(row, col, HUMAN)
+    search = ParallelSearch(workers=2, mode=ROOT_SPLIT)
+    try:
+        assert search.search(board, AI_PLAYER, budget_ms=1000) == (7, 8)
+        assert search.best_score >= WIN_SCORE - AlphaBetaSearch.MAX_PLY
+    finally:
+        search.close()
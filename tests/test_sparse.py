@@ -0,0 +1,72 @@
+import random
+from src.constants import HUMAN, AI_PLAYER, Difficulty
+from src.board import NEAR_RADIUS
+from src.sparse import SparseBoard
+from src.players import AIPlayer
+
+
+def _random_stones(seed, count=40):
+    rng = random.Random(seed)
+    stones = {}
+    while len(stones) < count:
+        stones[(rng.randrange(-10 ** 6, -10 ** 6 + 20), rng.randrange(10 ** 6, 10 ** 6 + 20))] = rng.choice(
+            (HUMAN, AI_PLAYER))
+    return list(stones.items())
+
+
+def _frontier(stones):
+    return sorted({(r + dr, c + dc) for r, c in stones
+                   for dr in range(-NEAR_RADIUS, NEAR_RADIUS + 1) for dc in range(-NEAR_RADIUS, NEAR_RADIUS + 1)}
+                  - set(stones))
+
+
+def test_five_in_a_row_wins_far_from_the_origin():
+    board = SparseBoard()
+    for i in range(4):
+        assert board.make_move(-10 ** 9 + i, 10 ** 9 - i, HUMAN)
+        assert not board.check_win(HUMAN)
+    assert board.winning_cells(HUMAN) == [(-10 ** 9 - 1, 10 ** 9 + 1), (-10 ** 9 + 4, 10 ** 9 - 4)]
+    assert board.make_move(-10 ** 9 + 4, 10 ** 9 - 4, HUMAN)
+    assert board.check_win(HUMAN) and len(board.win_line) == 5
+    assert not board.make_move(-10 ** 9, 10 ** 9, AI_PLAYER)
+
+
+def test_undo_restores_hash_and_frontier():
+    stones = _random_stones(1)
+    board = SparseBoard()
+    for (r, c), player in stones:
+        board.make_move(r, c, player)
+    fresh_hash, fresh_frontier = board.hash, board.get_near_empty_cells()
+    for (r, c), player in stones[20:]:
+        board.undo_move(r, c)
+    assert board.stones == 20
+    assert board.get_near_empty_cells() == _frontier(dict(stones[:20]))
+    for (r, c), player in reversed(stones[20:]):
+        board.make_move(r, c, player)
+    assert board.hash == fresh_hash and board.get_near_empty_cells() == fresh_frontier
+    assert fresh_frontier == _frontier(dict(stones))
+
+
+def test_hash_does_not_depend_on_move_order():
+    stones = _random_stones(2)
+    boards = []
+    for order in (stones, list(reversed(stones)), random.Random(3).sample(stones, len(stones))):
+        board = SparseBoard()
+        for (r, c), player in order:
+            board.make_move(r, c, player)
+        boards.append(board)
+    assert len({board.hash for board in boards}) == 1
+    assert boards[0].copy().hash == boards[0].hash
+
+
+def test_ai_falls_back_to_a_strategy_that_supports_the_unbounded_board(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    board = SparseBoard()
+    for (r, c), player in _random_stones(4, 10):
+        board.make_move(r, c, player)
+    ai = AIPlayer(AI_PLAYER, Difficulty.EXPERT)
+    try:
+        assert ai.playing_difficulty(board) == Difficulty.MEDIUM
+        assert ai.get_move(board) in board.get_near_empty_cells()
+    finally:
+        ai.close()
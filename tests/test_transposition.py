@@ -0,0 +1,29 @@
+from src.transposition import TranspositionTable, EXACT, LOWER, UPPER
+
+KEY = 0x9E3779B97F4A7C15
+
+
+def test_store_then_probe_round_trips_every_field():
+    tt = TranspositionTable(0.01)
+    tt.store(KEY, 12, LOWER, -987654, 224)
+    tt.store(KEY + 1, 0, UPPER, 1 << 20, None)
+    assert tt.probe(KEY) == (12, LOWER, -987654, 224)
+    assert tt.probe(KEY + 1) == (0, UPPER, 1 << 20, None)
+
+
+def test_probe_misses_after_a_colliding_store_evicts_the_entry():
+    tt = TranspositionTable(0.01)
+    other = KEY + tt.buckets
+    tt.store(KEY, 3, EXACT, 10, 5)
+    tt.store(other, 4, EXACT, 20, 6)
+    assert tt.probe(KEY) is None
+    assert tt.probe(other) == (4, EXACT, 20, 6)
+    assert tt.collisions == 1 and tt.replacements == 1
+
+
+def test_probe_rejects_a_torn_entry():
+    tt = TranspositionTable(0.01)
+    tt.store(KEY, 3, EXACT, 10, 5)
+    slot = (KEY % tt.buckets) << 2
+    tt._words[slot + 1] ^= 1
+    assert tt.probe(KEY) is None
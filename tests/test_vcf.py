@@ -0,0 +1,67 @@
+import random
+import pytest
+from src.constants import BOARD_SIZE, HUMAN, AI_PLAYER
+from src.bitboard import BitBoard
+from src.vcf import ThreatSolver
+
+
+def _random_position(seed):
+    rng = random.Random(seed)
+    board = BitBoard()
+    player = HUMAN
+    for _ in range(rng.randrange(10, 30)):
+        r, c = rng.choice(board.get_near_empty_cells() or [(7, 7)])
+        board.make_move(r, c, player)
+        if board.check_win(player):
+            board.undo_move(r, c)
+            break
+        player = AI_PLAYER if player == HUMAN else HUMAN
+    return board
+
+
+def _assert_forced_win(board, line, player, opponent):
+    for i in range(0, len(line), 2):
+        r, c = line[i]
+        assert board.make_move(r, c, player)
+        if board.check_win(player):
+            assert i == len(line) - 1
+            return
+        assert not board.five_cells[opponent]
+        fives = set(board.five_cells[player])
+        if i == len(line) - 1:
+            assert len(fives) >= 2
+            return
+        reply = line[i + 1]
+        assert fives == {reply[0] * BOARD_SIZE + reply[1]}
+        assert board.make_move(reply[0], reply[1], opponent)
+        assert not board.check_win(opponent)
+    pytest.fail("VCF line ended on a defender move")
+
+
+@pytest.mark.parametrize("seed", range(0, 120, 8))
+def test_vcf_lines_replay_as_forced_wins(seed):
+    lines = 0
+    for offset in range(8):
+        board = _random_position(seed + offset)
+        for player in (HUMAN, AI_PLAYER):
+            opponent = HUMAN if player == AI_PLAYER else AI_PLAYER
+            line = ThreatSolver(time_ms=10000).solve_vcf(board, player)
+            if line is None:
+                continue
+            lines += 1
+            replay = BitBoard.from_board(board)
+            _assert_forced_win(replay, line, player, opponent)
+    assert lines
+
+
+def test_vcf_finds_a_multi_move_line():
+    board = BitBoard()
+    for r, c in [(2, 12), (2, 14), (4, 12), (6, 8), (6, 9), (6, 12), (7, 6), (9, 6), (9, 9), (9, 10),
+                 (10, 11), (12, 11), (13, 7), (13, 11)]:
+        board.make_move(r, c, HUMAN)
+    for r, c in [(1, 11), (1, 14), (3, 12), (4, 11), (6, 14), (7, 8), (8, 11), (8, 13), (9, 11), (10, 9),
+                 (10, 14), (11, 11), (13, 9), (13, 12)]:
+        board.make_move(r, c, AI_PLAYER)
+    line = ThreatSolver(time_ms=10000).solve_vcf(board, HUMAN)
+    assert line is not None and len(line) >= 5
+    _assert_forced_win(board, line, HUMAN, AI_PLAYER)